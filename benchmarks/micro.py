@@ -0,0 +1,229 @@
+from array import array
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+import json
+import random
+import time
+
+from src.instrument import Instrument
+from src.order import Order, OrderSide, OrderType, OrderTIF
+from src.orderbook.limit_orderbook import LimitOrderBook
+from src.orderbook.stop_orderbook import StopOrderBook
+from src.orderlogger import OrderLogger
+
+
+INSTRUMENT = Instrument(tick_size=Decimal('0.01'), lot_size=Decimal('1'))
+MID = 10_000 # mid price in ticks
+
+
+class BenchmarkResult(NamedTuple):
+    '''Throughput of one workload and its per-operation latencies in ns.'''
+
+    name: str
+    ops: int
+    ops_per_second: float
+    p50: int
+    p90: int
+    p99: int
+    max: int
+
+
+def measure(name: str, ops: Iterable[Callable[[], object]]) -> BenchmarkResult:
+    '''Time every operation separately with `perf_counter_ns`.'''
+    clock = time.perf_counter_ns
+    latencies = array('q')
+    for op in ops:
+        start = clock()
+        op()
+        latencies.append(clock() - start)
+
+    ordered = sorted(latencies)
+    count = len(ordered)
+    total = sum(ordered)
+
+    def percentile(p: float) -> int:
+        return ordered[min(count - 1, int(count * p / 100))] if count else 0
+
+    return BenchmarkResult(
+        name=name,
+        ops=count,
+        ops_per_second=count / total * 1e9 if total else 0.0,
+        p50=percentile(50),
+        p90=percentile(90),
+        p99=percentile(99),
+        max=ordered[-1] if count else 0
+    )
+
+
+def _order(logger: OrderLogger,
+           side: OrderSide,
+           ticks: Optional[int],
+           lots: int,
+           order_type: OrderType=OrderType.LIMIT,
+           time_in_force: OrderTIF=OrderTIF.GTC,
+           stop_ticks: Optional[int]=None) -> Order:
+    return Order(
+        side=side,
+        price=INSTRUMENT.to_price(ticks),
+        volume=lots,
+        order_type=order_type,
+        stop_price=INSTRUMENT.to_price(stop_ticks),
+        time_in_force=time_in_force,
+        logger=logger,
+        instrument=INSTRUMENT
+    )
+
+
+def _resting_orders(logger: OrderLogger, rng: random.Random, size: int, spread: int=500) -> List[Order]:
+    '''Non-crossing limit orders on both sides of `MID`.'''
+    orders = []
+    for _ in range(size):
+        if rng.random() < 0.5:
+            orders.append(_order(logger, OrderSide.BID, MID - rng.randint(1, spread), rng.randint(1, 100)))
+        else:
+            orders.append(_order(logger, OrderSide.ASK, MID + rng.randint(1, spread), rng.randint(1, 100)))
+    return orders
+
+
+def insert_heavy(size: int, seed: int) -> BenchmarkResult:
+    '''Resting limit orders added to a growing book.'''
+    logger, ob = OrderLogger(), LimitOrderBook(INSTRUMENT)
+    orders = _resting_orders(logger, random.Random(seed), size)
+    return measure('insert', (lambda o=o: ob.add(o) for o in orders))
+
+
+def cancel_heavy(size: int, seed: int) -> BenchmarkResult:
+    '''Resting orders cancelled in random order.'''
+    rng = random.Random(seed)
+    logger, ob = OrderLogger(), LimitOrderBook(INSTRUMENT)
+    orders = _resting_orders(logger, rng, size)
+    for o in orders:
+        ob.add(o)
+
+    ids = [o.id for o in orders]
+    rng.shuffle(ids)
+    return measure('cancel', (lambda i=i: ob.cancel(i) for i in ids))
+
+
+def aggressive_sweeps(size: int, seed: int, orders_per_level: int=10) -> BenchmarkResult:
+    '''IOC bids each taking a whole ask level of `orders_per_level` orders.'''
+    rng = random.Random(seed)
+    logger, ob = OrderLogger(), LimitOrderBook(INSTRUMENT)
+    levels = max(1, size // orders_per_level)
+
+    lots = [[rng.randint(1, 10) for _ in range(orders_per_level)] for _ in range(levels)]
+    for level, level_lots in enumerate(lots):
+        for l in level_lots:
+            ob.add(_order(logger, OrderSide.ASK, MID + level, l))
+
+    sweeps = [
+        _order(logger, OrderSide.BID, MID + level, sum(level_lots), time_in_force=OrderTIF.IOC)
+        for level, level_lots in enumerate(lots)
+    ]
+    return measure('sweep', (lambda o=o: ob.add(o) for o in sweeps))
+
+
+def stop_cascade(size: int, seed: int, orders_per_level: int=10) -> BenchmarkResult:
+    '''Rising prices activating one level of bid stops at a time.'''
+    rng = random.Random(seed)
+    logger, ob = OrderLogger(), StopOrderBook(INSTRUMENT)
+    levels = max(1, size // orders_per_level)
+
+    for level in range(levels):
+        for _ in range(orders_per_level):
+            ob.add_to_storage(_order(logger, OrderSide.BID, MID + level + rng.randint(0, 5), rng.randint(1, 10),
+                                     OrderType.STOP, stop_ticks=MID + level))
+
+    prices = [INSTRUMENT.to_price(MID + level) for level in range(levels)]
+    return measure('stop_cascade', (lambda p=p: ob.get_activated(p) for p in prices))
+
+
+def depth_polling(size: int, seed: int, depth: int=10) -> BenchmarkResult:
+    '''Top `depth` levels of both sides read from a full book.'''
+    logger, ob = OrderLogger(), LimitOrderBook(INSTRUMENT)
+    for o in _resting_orders(logger, random.Random(seed), size):
+        ob.add(o)
+
+    def poll():
+        ob.get_bid_levels(depth, orders_count=True)
+        ob.get_ask_levels(depth, orders_count=True)
+
+    return measure('depth', (poll for _ in range(size)))
+
+
+WORKLOADS: Tuple[Callable[[int, int], BenchmarkResult], ...] = (
+    insert_heavy,
+    cancel_heavy,
+    aggressive_sweeps,
+    stop_cascade,
+    depth_polling,
+)
+
+
+def run(size: int=10_000, seed: int=42) -> List[BenchmarkResult]:
+    return [workload(size, seed) for workload in WORKLOADS]
+
+
+def save_baseline(results: List[BenchmarkResult], path: str) -> None:
+    with open(path, 'w') as f:
+        json.dump({r.name: r._asdict() for r in results}, f, indent=2)
+
+
+def load_baseline(path: str) -> Dict[str, BenchmarkResult]:
+    with open(path) as f:
+        return {name: BenchmarkResult(**fields) for name, fields in json.load(f).items()}
+
+
+def compare(results: List[BenchmarkResult],
+            baseline: Dict[str, BenchmarkResult],
+            threshold: float=0.1) -> List[Tuple[str, float, bool]]:
+    '''Speed of every result relative to the baseline, flagged as a
+    regression when it is more than `threshold` slower.
+
+    Speed is compared by median latency, which unlike the throughput is not
+    moved by a few outliers such as garbage collection pauses.
+    '''
+    rows = []
+    for result in results:
+        base = baseline.get(result.name)
+        if base is None or not result.p50:
+            continue
+
+        ratio = base.p50 / result.p50
+        rows.append((result.name, ratio, ratio < 1 - threshold))
+
+    return rows
+
+
+def format_results(results: List[BenchmarkResult]) -> str:
+    lines = [f'{"workload":<14}{"ops":>10}{"ops/s":>14}{"p50 ns":>10}{"p90 ns":>10}{"p99 ns":>10}{"max ns":>12}']
+    for r in results:
+        lines.append(f'{r.name:<14}{r.ops:>10}{r.ops_per_second:>14.0f}{r.p50:>10}{r.p90:>10}{r.p99:>10}{r.max:>12}')
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description='Microbenchmarks of the matching hot paths.')
+    parser.add_argument('-n', '--size', type=int, default=10_000)
+    parser.add_argument('-s', '--seed', type=int, default=42)
+    parser.add_argument('--save', metavar='PATH', help='write the results as a baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare with a saved baseline')
+    parser.add_argument('--threshold', type=float, default=0.1, help='slowdown reported as a regression')
+    ns = parser.parse_args()
+
+    results = run(ns.size, ns.seed)
+    print(format_results(results))
+
+    if ns.save:
+        save_baseline(results, ns.save)
+
+    if ns.compare:
+        rows = compare(results, load_baseline(ns.compare), ns.threshold)
+        print()
+        for name, ratio, regressed in rows:
+            print(f'{name:<14}{ratio:>8.2f}x{"  REGRESSION" if regressed else ""}')
+        if any(regressed for _, _, regressed in rows):
+            sys.exit(1)
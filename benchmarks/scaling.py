@@ -0,0 +1,164 @@
+from typing import Iterable, List, NamedTuple, Sequence, Tuple
+import csv
+import random
+import tracemalloc
+
+from benchmarks.micro import INSTRUMENT, MID, measure, _order, _resting_orders
+from src.order import Order, OrderSide, OrderTIF
+from src.orderbook.limit_orderbook import LimitOrderBook
+from src.orderlogger import OrderLogger
+
+
+SIZES = (1_000, 100_000, 1_000_000)
+LEVELS = (10, 1_000)
+
+
+class ScalingRow(NamedTuple):
+    '''Latencies in ns and bytes per resting order of one book size.'''
+
+    orders: int
+    levels: int
+    insert_p50: int
+    insert_p99: int
+    match_p50: int
+    match_p99: int
+    depth_p50: int
+    depth_p99: int
+    order_bytes: float
+    snapshot_bytes: float
+    book_bytes: float
+
+
+class _NullLogger(OrderLogger):
+    '''Logger keeping no snapshots, to tell their memory from the orders'.'''
+
+    def add(self, order: Order):
+        pass
+
+
+def latencies(size: int, levels: int, seed: int=42, samples: int=1_000) -> Tuple[Tuple[int, int], ...]:
+    '''p50 and p99 of inserts, single fills and depth reads on a book of
+    `size` resting orders.'''
+    rng = random.Random(seed)
+    logger, ob = OrderLogger(), LimitOrderBook(INSTRUMENT)
+    for o in _resting_orders(logger, rng, size, levels):
+        ob.add(o)
+
+    inserts = _resting_orders(logger, rng, samples, levels)
+    insert = measure('insert', (lambda o=o: ob.add(o) for o in inserts))
+
+    takers = [
+        _order(logger, side, MID + levels + 1 if side is OrderSide.BID else MID - levels - 1, 1,
+               time_in_force=OrderTIF.IOC)
+        for side in (rng.choice((OrderSide.BID, OrderSide.ASK)) for _ in range(samples))
+    ]
+    match = measure('match', (lambda o=o: ob.add(o) for o in takers))
+
+    def poll():
+        ob.get_bid_levels(10, orders_count=True)
+        ob.get_ask_levels(10, orders_count=True)
+
+    depth = measure('depth', (poll for _ in range(samples)))
+
+    return (insert.p50, insert.p99), (match.p50, match.p99), (depth.p50, depth.p99)
+
+
+def memory_per_order(size: int, levels: int, seed: int=42) -> Tuple[float, float, float]:
+    '''Bytes per resting order traced with `tracemalloc`: the order itself,
+    its `OrderLogger` snapshot and its share of the book structures.'''
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        unlogged = _resting_orders(_NullLogger(), random.Random(seed), size, levels)
+        orders_end = tracemalloc.get_traced_memory()[0]
+
+        logged = _resting_orders(OrderLogger(), random.Random(seed), size, levels)
+        logged_end = tracemalloc.get_traced_memory()[0]
+        del logged
+
+        ob = LimitOrderBook(INSTRUMENT)
+        book_start = tracemalloc.get_traced_memory()[0]
+        for o in unlogged:
+            ob.add(o)
+        book_end = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    order_bytes = (orders_end - start) / size
+    snapshot_bytes = (logged_end - orders_end) / size - order_bytes
+    return order_bytes, snapshot_bytes, (book_end - book_start) / size
+
+
+def run(sizes: Iterable[int]=SIZES,
+        levels: Iterable[int]=LEVELS,
+        seed: int=42,
+        samples: int=1_000,
+        memory: bool=True) -> List[ScalingRow]:
+    rows = []
+    for level_count in levels:
+        for size in sizes:
+            insert, match, depth = latencies(size, level_count, seed, samples)
+            order_bytes, snapshot_bytes, book_bytes = \
+                memory_per_order(size, level_count, seed) if memory else (0.0, 0.0, 0.0)
+            rows.append(ScalingRow(size, level_count, *insert, *match, *depth,
+                                   order_bytes, snapshot_bytes, book_bytes))
+    return rows
+
+
+def growth(rows: Sequence[ScalingRow], field: str='insert_p50') -> List[Tuple[int, float]]:
+    '''Ratio of `field` at the largest size to the smallest, per level count.
+
+    A price-level book should keep it close to one, a ratio growing with
+    the book size points to a regression in asymptotic behaviour.
+    '''
+    ratios = []
+    for level_count in sorted({r.levels for r in rows}):
+        by_size = sorted((r for r in rows if r.levels == level_count), key=lambda r: r.orders)
+        first, last = getattr(by_size[0], field), getattr(by_size[-1], field)
+        ratios.append((level_count, last / first if first else 0.0))
+    return ratios
+
+
+def write_csv(rows: Sequence[ScalingRow], path: str) -> None:
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(ScalingRow._fields)
+        writer.writerows(rows)
+
+
+def format_rows(rows: Sequence[ScalingRow]) -> str:
+    lines = [''.join(f'{name:>15}' for name in ScalingRow._fields)]
+    for r in rows:
+        lines.append(''.join(f'{v:>15.1f}' if isinstance(v, float) else f'{v:>15}' for v in r))
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description='Book depth scaling and memory per order.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES))
+    parser.add_argument('--levels', type=int, nargs='+', default=list(LEVELS))
+    parser.add_argument('-s', '--seed', type=int, default=42)
+    parser.add_argument('--samples', type=int, default=1_000)
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc runs')
+    parser.add_argument('--csv', metavar='PATH', help='write the table as CSV')
+    parser.add_argument('--max-growth', type=float, help='fail when a p50 grows more than this from the '
+                                                          'smallest to the largest book')
+    ns = parser.parse_args()
+
+    rows = run(ns.sizes, ns.levels, ns.seed, ns.samples, not ns.no_memory)
+    print(format_rows(rows))
+
+    if ns.csv:
+        write_csv(rows, ns.csv)
+
+    if ns.max_growth is not None:
+        failed = False
+        for field in ('insert_p50', 'match_p50', 'depth_p50'):
+            for level_count, ratio in growth(rows, field):
+                print(f'{field} growth over {level_count} levels: {ratio:.2f}x')
+                failed = failed or ratio > ns.max_growth
+        if failed:
+            sys.exit(1)
@@ -120,12 +120,12 @@ def demo_orderbook():
         )
         
     print(ob.storage_len)
-    print(*ob.ask_storage._orders, sep='\n')
-    print(*ob.bid_storage._orders, sep='\n')
+    print(*ob.ask_storage, sep='\n')
+    print(*ob.bid_storage, sep='\n')
     unexec = ob.get_activated(Decimal('100.00'))
     print(ob.storage_len)
-    print(*ob.ask_storage._orders, sep='\n')
-    print(*ob.bid_storage._orders, sep='\n')
+    print(*ob.ask_storage, sep='\n')
+    print(*ob.bid_storage, sep='\n')
     print(unexec)
     
     
@@ -0,0 +1,236 @@
+from decimal import Decimal
+from enum import Enum
+from typing import Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence
+import csv
+import time
+
+from src.exchange import Exchange
+from src.instrument import Instrument, DEFAULT_INSTRUMENT
+from src.order import (
+    Order, OrderErrorMessages, OrderStatus, OrderType, OrderTIF,
+    SIDES, ORDER_TYPES, TIFS, NO_PRICE
+)
+
+
+_SIDE_VALUES = {v.value: i for i, v in enumerate(SIDES)}
+_TYPE_VALUES = {v.value: i for i, v in enumerate(ORDER_TYPES)}
+_TIF_VALUES = {v.value: i for i, v in enumerate(TIFS)}
+
+
+COLUMNS = ('side', 'order_type', 'time_in_force', 'price_ticks', 'stop_ticks', 'volume_lots')
+
+
+class BacktestErrorMessages(Enum):
+    NUMPY_REQUIRED = 'numpy is required to load {path}'
+    MISSING_COLUMN = 'Order flow has no {column} column'
+    INVALID_ROW = 'Invalid order in row {row}: {reason}'
+    UNKNOWN_CODE = 'Unknown {column} code {code}'
+
+    def format(self, **kwargs) -> str:
+        return self.value.format(**kwargs)
+
+
+class OrderColumns(NamedTuple):
+    '''Chunk of order flow as columns of ints.
+
+    Enums are given as their position in the enum, prices in ticks and
+    volumes in lots, missing prices as `NO_PRICE`.
+    '''
+
+    side: List[int]
+    order_type: List[int]
+    time_in_force: List[int]
+    price_ticks: List[int]
+    stop_ticks: List[int]
+    volume_lots: List[int]
+
+
+class BacktestReport(NamedTuple):
+    '''Totals of a backtest run.
+
+    Order counts by status are taken right after each push, `resting` is
+    the number of orders left in the limit book at the end of the run.
+    '''
+
+    orders: int
+    trades: int
+    filled: int
+    partially_filled: int
+    cancelled: int
+    resting: int
+    volume: Decimal
+    vwap: Optional[Decimal]
+    elapsed: float
+    orders_per_second: float
+
+
+def csv_chunks(path: str,
+               instrument: Instrument=DEFAULT_INSTRUMENT,
+               chunk_size: int=100_000) -> Iterator[OrderColumns]:
+    '''Order flow from a CSV file with a header row.
+
+    Columns are `side`, `order_type`, `time_in_force`, `price`,
+    `stop_price` and `volume`, enums by value (`bid`, `limit`, `GTC`) and
+    an empty field for a missing price.
+    '''
+    to_ticks, to_lots = instrument.to_ticks, instrument.to_lots
+
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f)
+        for column in ('side', 'order_type', 'time_in_force', 'price', 'stop_price', 'volume'):
+            if column not in (reader.fieldnames or ()):
+                raise ValueError(BacktestErrorMessages.MISSING_COLUMN.format(column=column))
+
+        chunk = OrderColumns([], [], [], [], [], [])
+        for row in reader:
+            price, stop_price = row['price'], row['stop_price']
+            chunk.side.append(_SIDE_VALUES[row['side']])
+            chunk.order_type.append(_TYPE_VALUES[row['order_type']])
+            chunk.time_in_force.append(_TIF_VALUES[row['time_in_force']])
+            chunk.price_ticks.append(to_ticks(Decimal(price)) if price else NO_PRICE)
+            chunk.stop_ticks.append(to_ticks(Decimal(stop_price)) if stop_price else NO_PRICE)
+            chunk.volume_lots.append(to_lots(Decimal(row['volume'])))
+
+            if len(chunk.side) == chunk_size:
+                yield chunk
+                chunk = OrderColumns([], [], [], [], [], [])
+
+        if chunk.side:
+            yield chunk
+
+
+def array_chunks(columns: Mapping[str, Sequence[int]], chunk_size: int=100_000) -> Iterator[OrderColumns]:
+    '''Order flow from integer arrays named as the `OrderColumns` fields.
+
+    NumPy arrays are sliced and converted a chunk at a time, plain
+    sequences work as well.
+    '''
+    for column in COLUMNS:
+        if column not in columns:
+            raise ValueError(BacktestErrorMessages.MISSING_COLUMN.format(column=column))
+
+    total = len(columns['side'])
+    for start in range(0, total, chunk_size):
+        yield OrderColumns(*(_to_list(columns[c][start:start+chunk_size]) for c in COLUMNS))
+
+
+def npz_chunks(path: str, chunk_size: int=100_000) -> Iterator[OrderColumns]:
+    '''Order flow from a NumPy `.npz` archive, see `array_chunks()`.'''
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(BacktestErrorMessages.NUMPY_REQUIRED.format(path=path)) from None
+
+    with numpy.load(path) as archive:
+        yield from array_chunks({c: archive[c] for c in COLUMNS if c in archive.files}, chunk_size)
+
+
+def _to_list(values: Sequence[int]) -> List[int]:
+    return values.tolist() if hasattr(values, 'tolist') else list(values)
+
+
+def _check(side: int, order_type: int, tif: int, price: int, stop_price: int, volume: int) -> Optional[str]:
+    '''Why a row is not a valid order, None for a valid one.'''
+    for column, code, values in (('side', side, SIDES), ('order_type', order_type, ORDER_TYPES),
+                                 ('time_in_force', tif, TIFS)):
+        if not 0 <= code < len(values):
+            return BacktestErrorMessages.UNKNOWN_CODE.format(column=column, code=code)
+
+    if volume <= 0:
+        return OrderErrorMessages.VOLUME_MUST_BE_POSITIVE.format(volume=volume)
+
+    kind = ORDER_TYPES[order_type]
+    if kind is OrderType.MARKET and TIFS[tif] is OrderTIF.GTC:
+        return OrderErrorMessages.MARKET_GTC_INVALID.format()
+    if kind is OrderType.LIMIT and price == NO_PRICE:
+        return OrderErrorMessages.PRICE_REQUIRED.format(order_type=kind)
+    if kind is OrderType.STOP and stop_price == NO_PRICE:
+        return OrderErrorMessages.STOP_PRICE_REQUIRED.format()
+    if kind is not OrderType.STOP and stop_price != NO_PRICE:
+        return OrderErrorMessages.STOP_PRICE_ONLY_FOR_STOP.format()
+    return None
+
+
+class Backtest:
+    '''Replays historical order flow through an exchange.
+
+    Orders of every chunk are built with `Order.restore`, taking ids and
+    timestamps from the exchange logger, and pushed with one `push_many`
+    call. Rows are checked with the rules of `Order` while restoring, an
+    invalid row raises `ValueError` with its index in the order flow
+    before its chunk is pushed. Orders go to the default market.
+    '''
+
+    def __init__(self, exchange: Optional[Exchange]=None):
+        self.exchange = Exchange() if exchange is None else exchange
+
+    def run(self, chunks: Iterable[OrderColumns]) -> BacktestReport:
+        exchange, tradesbook = self.exchange, self.exchange.tradesbook
+        counts = {status: 0 for status in OrderStatus}
+        orders = trades = lots = notional = 0
+
+        start = time.perf_counter()
+        for chunk in chunks:
+            before = len(tradesbook)
+            for result in exchange.push_many(self._orders(chunk, orders)):
+                counts[result.status] += 1
+                trades += result.trades
+            orders += len(chunk.side)
+
+            for trade in tradesbook.last(len(tradesbook) - before):
+                lots += trade.volume_lots
+                notional += trade.price_ticks * trade.volume_lots
+        elapsed = time.perf_counter() - start
+
+        instrument = exchange.instrument
+        return BacktestReport(
+            orders=orders,
+            trades=trades,
+            filled=counts[OrderStatus.FILLED],
+            partially_filled=counts[OrderStatus.PARTIALLY_FILLED],
+            cancelled=counts[OrderStatus.CANCELLED],
+            resting=len(exchange.limit_orderbook),
+            volume=instrument.to_volume(lots),
+            vwap=Decimal(notional) / lots * instrument.tick_size if lots else None,
+            elapsed=elapsed,
+            orders_per_second=orders / elapsed if elapsed else 0.0
+        )
+
+    def _orders(self, chunk: OrderColumns, offset: int) -> List[Order]:
+        logger, instrument = self.exchange.logger, self.exchange.instrument
+        next_id, now, log = logger.sequencer.next_id, logger.sequencer.now, logger.add
+        restore = Order.restore
+
+        orders = []
+        for row, (side, order_type, tif, price, stop_price, volume) in enumerate(zip(*chunk), offset):
+            reason = _check(side, order_type, tif, price, stop_price, volume)
+            if reason is not None:
+                raise ValueError(BacktestErrorMessages.INVALID_ROW.format(row=row, reason=reason))
+
+            order = restore(
+                next_id(), now(), SIDES[side], volume,
+                None if price == NO_PRICE else price, ORDER_TYPES[order_type],
+                None if stop_price == NO_PRICE else stop_price, TIFS[tif],
+                logger, instrument
+            )
+            log(order)
+            orders.append(order)
+
+        return orders
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Replay order flow through the exchange.')
+    parser.add_argument('path', help='CSV file or NumPy .npz archive')
+    parser.add_argument('-c', '--chunk-size', type=int, default=100_000)
+    ns = parser.parse_args()
+
+    if ns.path.endswith('.npz'):
+        chunks = npz_chunks(ns.path, ns.chunk_size)
+    else:
+        chunks = csv_chunks(ns.path, chunk_size=ns.chunk_size)
+
+    for field, value in Backtest().run(chunks)._asdict().items():
+        print(f'{field}: {value}')
@@ -0,0 +1,149 @@
+from collections import deque
+from decimal import Decimal
+from typing import Deque, List, NamedTuple, Optional, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.tradesbook import Trade
+    from src.tradejournal import TradeRecord
+
+from src.instrument import Instrument, InstrumentErrorMessages, DEFAULT_INSTRUMENT
+
+
+class Bar(NamedTuple):
+    '''OHLCV bar with the volume weighted average price of its trades.'''
+
+    start: int
+    open: Decimal
+    high: Decimal
+    low: Decimal
+    close: Decimal
+    volume: Decimal
+    vwap: Decimal
+    trades: int
+
+
+class _BarState:
+    '''Bar under construction, prices in ticks and volumes in lots.'''
+
+    __slots__ = ('start', 'open', 'high', 'low', 'close', 'lots', 'notional', 'trades')
+
+    def __init__(self, start: int, ticks: int):
+        self.start = start
+        self.open = self.high = self.low = self.close = ticks
+        self.lots = 0
+        self.notional = 0
+        self.trades = 0
+
+    def add(self, ticks: int, lots: int) -> None:
+        if ticks > self.high:
+            self.high = ticks
+        elif ticks < self.low:
+            self.low = ticks
+        self.close = ticks
+        self.lots += lots
+        self.notional += ticks * lots
+        self.trades += 1
+
+
+class BarBuilder:
+    '''Base class for incremental bar aggregation over the trade stream.
+
+    Every trade updates the current bar in O(1). Closed bars are kept in a
+    ring of the last `retention` bars. Without an `instrument` builders
+    take the one of the trades book they are attached to.
+    '''
+
+    def __init__(self, retention: int=1000, instrument: Optional[Instrument]=None):
+        self.instrument = DEFAULT_INSTRUMENT if instrument is None else instrument
+        self._instrument = instrument # given explicitly
+        self._closed: Deque[_BarState] = deque(maxlen=retention)
+        self._current: Optional[_BarState] = None
+
+    def bind(self, instrument: Instrument) -> None:
+        '''Use the instrument of the trades book the builder is attached
+        to, unless another one was given explicitly.'''
+        if self._instrument is not None and instrument != self._instrument:
+            raise ValueError(InstrumentErrorMessages.MISMATCH.format(instrument=instrument, other=self._instrument))
+        self.instrument = instrument
+
+    def _bar_start(self, trade: Union['Trade', 'TradeRecord']) -> int:
+        raise NotImplementedError('Subclasses must implement _bar_start()')
+
+    def _is_full(self, bar: _BarState) -> bool:
+        return False
+
+    def add(self, trade: Union['Trade', 'TradeRecord']) -> None:
+        current = self._current
+        start = self._bar_start(trade)
+        if current is None or current.start != start:
+            if current is not None:
+                self._closed.append(current)
+            current = self._current = _BarState(start, trade.price_ticks)
+
+        current.add(trade.price_ticks, trade.volume_lots)
+
+        if self._is_full(current):
+            self._closed.append(current)
+            self._current = None
+
+    @property
+    def current(self) -> Optional[Bar]:
+        return self._to_bar(self._current) if self._current is not None else None
+
+    def bars(self) -> List[Bar]:
+        '''Closed bars, oldest first, followed by the current one.'''
+        bars = [self._to_bar(b) for b in self._closed]
+        if self._current is not None:
+            bars.append(self._to_bar(self._current))
+        return bars
+
+    def _to_bar(self, bar: _BarState) -> Bar:
+        to_price = self.instrument.to_price
+        return Bar(
+            start=bar.start,
+            open=to_price(bar.open),
+            high=to_price(bar.high),
+            low=to_price(bar.low),
+            close=to_price(bar.close),
+            volume=self.instrument.to_volume(bar.lots),
+            vwap=Decimal(bar.notional) / bar.lots * self.instrument.tick_size,
+            trades=bar.trades
+        )
+
+
+class TimeBarBuilder(BarBuilder):
+    '''Bars over fixed intervals of trade timestamps, intervals without
+    trades produce no bar.'''
+
+    def __init__(self,
+                 interval: int,
+                 retention: int=1000,
+                 instrument: Optional[Instrument]=None):
+        super().__init__(retention, instrument)
+        self.interval = interval
+
+    def _bar_start(self, trade: Union['Trade', 'TradeRecord']) -> int:
+        return trade.timestamp - trade.timestamp % self.interval
+
+
+class VolumeBarBuilder(BarBuilder):
+    '''Bars closed once they reach `volume`. The trade crossing the
+    threshold is not split, it stays whole in the bar it closes.'''
+
+    def __init__(self,
+                 volume: Decimal,
+                 retention: int=1000,
+                 instrument: Optional[Instrument]=None):
+        super().__init__(retention, instrument)
+        self.volume = volume
+        self.volume_lots = self.instrument.to_lots(volume)
+
+    def bind(self, instrument: Instrument) -> None:
+        super().bind(instrument)
+        self.volume_lots = instrument.to_lots(self.volume)
+
+    def _bar_start(self, trade: Union['Trade', 'TradeRecord']) -> int:
+        return self._current.start if self._current is not None else trade.timestamp
+
+    def _is_full(self, bar: _BarState) -> bool:
+        return bar.lots >= self.volume_lots
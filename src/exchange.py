@@ -1,43 +1,253 @@
+from collections import defaultdict
+from concurrent.futures import Executor
+from contextlib import nullcontext
 from decimal import Decimal
-from typing import List, Optional, TYPE_CHECKING
+from enum import Enum
+from typing import DefaultDict, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+import threading
 
 if TYPE_CHECKING:
     from .order import Order
+    from .tradesbook import Trade
+
+from src.instrument import Instrument, DEFAULT_INSTRUMENT
+from src.market import Market
+from src.order import OrderResult, DEFAULT_SYMBOL
+from src.sequencer import Sequencer, DEFAULT_SEQUENCER
 
-from src.order import OrderType  
-    
 from src.orderbook.limit_orderbook import LimitOrderBook
 from src.orderbook.stop_orderbook import StopOrderBook
 
 from src.orderlogger import OrderLogger
+from src.replay import CommandJournal
 from src.tradesbook import TradesBook
 
 
+class ExchangeErrorMessages(Enum):
+    INSTRUMENT_MISMATCH = 'Order instrument {instrument} differs from {market_instrument} of market {symbol!r}'
+
+    def format(self, **kwargs) -> str:
+        return self.value.format(**kwargs)
+
+
 class Exchange:
-    def __init__(self):
-        self.tradesbook = TradesBook()
-        
-        self.limit_orderbook = LimitOrderBook()
-        self.stop_orderbook = StopOrderBook()
-        
-        self.logger = OrderLogger()
-    
-    def push(self, order: 'Order') -> None:
-        trades = []
-        if order.order_type in [OrderType.LIMIT, OrderType.MARKET]:
-            trades = self.limit_orderbook.add(order, exchange=self)
-        elif order.order_type == OrderType.STOP:
-            self.stop_orderbook.add_to_storage(order)
-        
-        if trades:
-            for trade in trades:
-                self.tradesbook.add(trade)
-                
-    def check_stop_orders(self, trade):
-        orders = self.stop_orderbook.get_activated(trade.price)
-        if orders:
-            for o in orders:
-                self.push(o)
-                
+    '''Routes orders to the market of their symbol.
+
+    A market is created on the first order of its symbol, with the
+    instrument of that order, later orders must have the same instrument.
+    Every market has its own lock, so different symbols can be pushed from
+    several threads at once. The exchange keeps the symbol of every resting
+    order, so orders are cancelled and amended by id alone. The books and
+    counters of the default symbol are also available on the exchange.
+
+    With a `journal` every inbound command is recorded before it is
+    processed, see `CommandJournal`. The journal clock is shared by all
+    markets, so journaled commands are processed one at a time, holding
+    an exchange-wide lock from recording to the end of matching. Threads
+    and executors still work but no longer run markets in parallel.
+    '''
+
+    def __init__(self,
+                 instrument: Instrument=DEFAULT_INSTRUMENT,
+                 sequencer: Sequencer=DEFAULT_SEQUENCER,
+                 logger: Optional[OrderLogger]=None,
+                 tradesbook: Optional[TradesBook]=None,
+                 max_cascade_depth: int=100,
+                 journal: Optional[CommandJournal]=None):
+        self.instrument = instrument
+        self.sequencer = sequencer
+        self.logger = OrderLogger(sequencer) if logger is None else logger
+        self.max_cascade_depth = max_cascade_depth
+        self.journal = journal
+
+        self.markets: Dict[str, Market] = {}
+        self._symbols: Dict[str, str] = {} # order id -> symbol, for resting orders
+        self._lock = threading.Lock() # creation of markets
+        # taken after a market lock, keeps the journal clock on one command
+        self._journal_lock = nullcontext() if journal is None else threading.Lock()
+        self.default_market = self.market(DEFAULT_SYMBOL, instrument, tradesbook)
+
+    def market(self,
+               symbol: str,
+               instrument: Optional[Instrument]=None,
+               tradesbook: Optional[TradesBook]=None) -> Market:
+        '''Market of `symbol`, created with `instrument` when missing.'''
+        market = self.markets.get(symbol)
+        if market is None:
+            with self._lock:
+                market = self.markets.get(symbol)
+                if market is None:
+                    market = self.markets[symbol] = Market(
+                        symbol,
+                        self.instrument if instrument is None else instrument,
+                        self.sequencer,
+                        tradesbook,
+                        self.max_cascade_depth
+                    )
+        return market
+
+    def _market_of(self, order: 'Order') -> Market:
+        market = self.markets.get(order.symbol)
+        if market is None:
+            market = self.market(order.symbol, order.instrument)
+
+        if order.instrument != market.instrument:
+            raise ValueError(ExchangeErrorMessages.INSTRUMENT_MISMATCH.format(
+                instrument=order.instrument, market_instrument=market.instrument, symbol=market.symbol
+            ))
+        return market
+
+    def _track(self, market: Market, orders: Iterable['Order']) -> None:
+        '''Index the `orders` left resting in `market` and drop the orders
+        its last trades and stop activations took out.'''
+        symbols = self._symbols
+        for order in orders:
+            if order.id in market:
+                symbols[order.id] = market.symbol
+
+        for trade in market.trades:
+            for order_id in (trade.bid_order_id, trade.ask_order_id):
+                if order_id in symbols and order_id not in market:
+                    del symbols[order_id]
+
+        for order in market.activated:
+            if order.id in symbols and order.id not in market:
+                del symbols[order.id]
+
+    def reindex(self) -> None:
+        '''Rebuild the symbols of resting orders from the books, after
+        filling them directly.'''
+        self._symbols = {
+            order.id: symbol
+            for symbol, market in self.markets.items()
+            for stack in (market.limit_orderbook.asks, market.limit_orderbook.bids,
+                          market.stop_orderbook.ask_storage, market.stop_orderbook.bid_storage)
+            for order in stack
+        }
+
+    def push(self, order: 'Order') -> List['Trade']:
+        market = self._market_of(order)
+        with market.lock, self._journal_lock:
+            if self.journal is not None:
+                self.journal.record_push(order)
+            trades = market.push(order)
+            self._track(market, (order,))
+            return trades
+
+    def push_many(self,
+                  orders: Iterable['Order'],
+                  executor: Optional[Executor]=None) -> List[OrderResult]:
+        '''Push a batch of orders split into one sub-batch per symbol.
+
+        With an `executor` the sub-batches run as separate tasks. Results
+        follow the order of `orders`.
+        '''
+        batches: DefaultDict[Market, List[Tuple[int, 'Order']]] = defaultdict(list)
+        count = 0
+        for count, order in enumerate(orders, 1):
+            batches[self._market_of(order)].append((count-1, order))
+
+        results: List[Optional[OrderResult]] = [None] * count
+        if executor is None:
+            for market, batch in batches.items():
+                self._push_batch(market, batch, results)
+        else:
+            tasks = [executor.submit(self._push_batch, market, batch, results)
+                     for market, batch in batches.items()]
+            for task in tasks:
+                task.result()
+
+        return results
+
+    def _push_batch(self,
+                    market: Market,
+                    batch: List[Tuple[int, 'Order']],
+                    results: List[Optional[OrderResult]]) -> None:
+        with market.lock, self._journal_lock:
+            if self.journal is None:
+                batch_results = market.push_many(order for _, order in batch)
+                self._track(market, (order for _, order in batch))
+            else:
+                # One order at a time, so the journal clock matches a replay
+                batch_results = []
+                for _, order in batch:
+                    self.journal.record_push(order)
+                    batch_results += market.push_many((order,))
+                    self._track(market, (order,))
+
+        for (idx, _), result in zip(batch, batch_results):
+            results[idx] = result
+
+    def cancel(self, order_id: str, symbol: Optional[str]=None) -> Optional['Order']:
+        '''Cancel a resting order, in the market of `symbol` when given.'''
+        market = self._market_by_id(order_id, symbol)
+        if market is None:
+            return None
+
+        with market.lock, self._journal_lock:
+            if self.journal is not None:
+                self.journal.record_cancel(order_id, market.symbol)
+            order = market.cancel(order_id)
+            if order is not None:
+                self._symbols.pop(order_id, None)
+            return order
+
+    def amend(self,
+              order_id: str,
+              volume: Optional[Decimal]=None,
+              price: Optional[Decimal]=None,
+              stop_price: Optional[Decimal]=None,
+              symbol: Optional[str]=None) -> Optional['Order']:
+        '''Amend a resting order, in the market of `symbol` when given.'''
+        market = self._market_by_id(order_id, symbol)
+        if market is None:
+            return None
+
+        with market.lock, self._journal_lock:
+            if self.journal is not None:
+                instrument = market.instrument
+                self.journal.record_amend(
+                    order_id, market.symbol,
+                    None if volume is None else instrument.to_lots(volume),
+                    instrument.to_ticks(price),
+                    instrument.to_ticks(stop_price)
+                )
+            order = market.amend(order_id, volume=volume, price=price, stop_price=stop_price)
+            self._track(market, ())
+            return order
+
+    def _market_by_id(self, order_id: str, symbol: Optional[str]) -> Optional[Market]:
+        if symbol is None:
+            symbol = self._symbols.get(order_id)
+        return None if symbol is None else self.markets.get(symbol)
+
+    def __contains__(self, order_id: str) -> bool:
+        '''Whether the order rests in one of the books.'''
+        return order_id in self._symbols
+
+    @property
+    def limit_orderbook(self) -> LimitOrderBook:
+        return self.default_market.limit_orderbook
+
+    @property
+    def stop_orderbook(self) -> StopOrderBook:
+        return self.default_market.stop_orderbook
+
+    @property
+    def tradesbook(self) -> TradesBook:
+        return self.default_market.tradesbook
+
+    @property
+    def last_price(self) -> Optional[Decimal]:
+        return self.default_market.last_price
+
+    @property
+    def stops_fired(self) -> int:
+        return self.default_market.stops_fired
+
+    @property
+    def stops_fired_total(self) -> int:
+        return self.default_market.stops_fired_total
+
     def status(self):
-        return True
\ No newline at end of file
+        return True
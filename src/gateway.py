@@ -0,0 +1,140 @@
+from collections import deque
+from decimal import Decimal
+from typing import Deque, Dict, Hashable, List, NamedTuple, Optional, Tuple, TYPE_CHECKING
+import asyncio
+import time
+
+if TYPE_CHECKING:
+    from src.exchange import Exchange
+    from src.tradesbook import Trade
+
+from src.order import Order, OrderStatus
+
+
+class ExecutionReport(NamedTuple):
+    '''Order state sent to its client after a push.
+
+    Acks of submitted orders carry their trades and the latency from
+    enqueue to ack in nanoseconds. Reports of resting orders filled by
+    someone else's order carry those fills and no latency. Orders the
+    exchange rejected are acked with the exception it raised.
+    '''
+
+    order_id: int
+    status: OrderStatus
+    executed_volume: Decimal
+    trades: List['Trade']
+    latency: Optional[int]
+    error: Optional[Exception] = None
+
+
+class Gateway:
+    '''asyncio front-end serialising orders of many clients into an exchange.
+
+    Clients `submit` orders into a queue bounded by `maxsize`, so producers
+    wait while the exchange is behind. A single sequencer task drains up to
+    `batch_size` queued orders at a time, pushes them in queue order and
+    puts the reports into the queue of every client involved. Client queues
+    are bounded by `client_maxsize`, a client not reading its reports
+    eventually stalls the sequencer as well.
+    '''
+
+    def __init__(self,
+                 exchange: 'Exchange',
+                 maxsize: int=10_000,
+                 batch_size: int=256,
+                 client_maxsize: int=10_000,
+                 latency_window: int=100_000):
+        self.exchange = exchange
+        self.batch_size = batch_size
+        self.client_maxsize = client_maxsize
+        self.latencies: Deque[int] = deque(maxlen=latency_window)
+
+        self._queue: asyncio.Queue[Tuple[Hashable, Order, int]] = asyncio.Queue(maxsize)
+        self._clients: Dict[Hashable, asyncio.Queue[ExecutionReport]] = {}
+        self._resting: Dict[int, Tuple[Hashable, Order]] = {} # order id -> client, order
+        self._task: Optional[asyncio.Task] = None
+
+    def connect(self, client_id: Hashable) -> 'asyncio.Queue[ExecutionReport]':
+        '''Report queue of `client_id`, created on the first call.'''
+        reports = self._clients.get(client_id)
+        if reports is None:
+            reports = self._clients[client_id] = asyncio.Queue(self.client_maxsize)
+        return reports
+
+    async def submit(self, client_id: Hashable, order: Order) -> None:
+        self.connect(client_id)
+        await self._queue.put((client_id, order, time.perf_counter_ns()))
+
+    def start(self) -> asyncio.Task:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    async def stop(self) -> None:
+        '''Wait until every submitted order is acked and stop the sequencer.'''
+        await self._queue.join()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            for item in batch:
+                try:
+                    await self._process(*item)
+                finally:
+                    queue.task_done()
+
+    async def _process(self, client_id: Hashable, order: Order, enqueued: int) -> None:
+        try:
+            trades = self.exchange.push(order)
+        except Exception as error:
+            # One bad order must not stop the sequencer
+            await self._clients[client_id].put(
+                ExecutionReport(order.id, order.status, order.executed_volume, [],
+                                time.perf_counter_ns() - enqueued, error)
+            )
+            return
+
+        latency = time.perf_counter_ns() - enqueued
+        self.latencies.append(latency)
+
+        resting = self._resting
+        if order.id in self.exchange:
+            resting[order.id] = (client_id, order)
+
+        fills: Dict[int, List['Trade']] = {}
+        for trade in trades:
+            for order_id in (trade.bid_order_id, trade.ask_order_id):
+                if order_id != order.id and order_id in resting:
+                    fills.setdefault(order_id, []).append(trade)
+
+        await self._clients[client_id].put(
+            ExecutionReport(order.id, order.status, order.executed_volume, trades, latency)
+        )
+
+        for order_id, order_trades in fills.items():
+            owner, filled = resting[order_id]
+            if filled.status is OrderStatus.FILLED:
+                del resting[order_id]
+            await self._clients[owner].put(
+                ExecutionReport(order_id, filled.status, filled.executed_volume, order_trades, None)
+            )
+
+    def latency_percentile(self, percentile: float) -> Optional[int]:
+        '''Enqueue-to-ack latency in nanoseconds over the latency window.'''
+        if not self.latencies:
+            return None
+
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))]
@@ -0,0 +1,59 @@
+from dataclasses import dataclass
+from decimal import Decimal
+from enum import Enum
+from typing import Optional, Union
+
+
+class InstrumentErrorMessages(Enum):
+    PRICE_OFF_TICK = 'Price {value} is not a multiple of tick size {size}'
+    VOLUME_OFF_LOT = 'Volume {value} is not a multiple of lot size {size}'
+    MISMATCH = 'Instrument {instrument} differs from {other}'
+
+    def format(self, **kwargs) -> str:
+        return self.value.format(**kwargs)
+
+
+@dataclass(frozen=True)
+class Instrument:
+    '''Tick and lot sizes of a traded instrument.
+
+    Books and the matching engine work with integer ticks (price) and lots
+    (volume), the instrument converts them from and back to `Decimal`.
+    '''
+
+    tick_size: Decimal = Decimal('0.00000001')
+    lot_size: Decimal = Decimal('0.00000001')
+
+    def to_ticks(self, price: Optional[Union[int, float, Decimal]]) -> Optional[int]:
+        if price is None:
+            return None
+        return _to_units(price, self.tick_size, InstrumentErrorMessages.PRICE_OFF_TICK)
+
+    def to_lots(self, volume: Union[int, float, Decimal]) -> int:
+        return _to_units(volume, self.lot_size, InstrumentErrorMessages.VOLUME_OFF_LOT)
+
+    def to_price(self, ticks: Optional[int]) -> Optional[Decimal]:
+        if ticks is None:
+            return None
+        return _to_decimal(ticks, self.tick_size)
+
+    def to_volume(self, lots: int) -> Decimal:
+        return _to_decimal(lots, self.lot_size)
+
+
+def _to_units(value: Union[int, float, Decimal], size: Decimal, error: InstrumentErrorMessages) -> int:
+    number = Decimal(repr(value)) if isinstance(value, float) else Decimal(value)
+    units, rest = divmod(number, size)
+    if rest:
+        raise ValueError(error.format(value=value, size=size))
+    return int(units)
+
+
+def _to_decimal(units: int, size: Decimal) -> Decimal:
+    value = units * size
+    if value == value.to_integral_value():
+        return value.quantize(Decimal(1))
+    return value.normalize()
+
+
+DEFAULT_INSTRUMENT = Instrument()
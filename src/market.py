@@ -0,0 +1,173 @@
+from collections import deque
+from decimal import Decimal
+from typing import Deque, Iterable, List, Optional, Tuple, TYPE_CHECKING
+import threading
+
+if TYPE_CHECKING:
+    from .order import Order
+    from .tradesbook import Trade
+
+from src.instrument import Instrument, DEFAULT_INSTRUMENT
+from src.order import OrderType, OrderResult
+from src.sequencer import Sequencer, DEFAULT_SEQUENCER
+
+from src.orderbook.limit_orderbook import LimitOrderBook
+from src.orderbook.stop_orderbook import StopOrderBook
+
+from src.tradesbook import TradesBook
+
+
+class Market:
+    '''Books of a single instrument and the stop-order cascades run on them.
+
+    Every matching pass updates the last trade price once, the stop orders
+    it activates are queued and matched one after another. Stops activated
+    deeper than `max_cascade_depth` passes stay in storage until the next
+    trade reaches them.
+
+    The BBO of the limit book is refreshed once per inbound order, cancel
+    or amend, after its whole cascade.
+    '''
+
+    def __init__(self,
+                 symbol: str,
+                 instrument: Instrument=DEFAULT_INSTRUMENT,
+                 sequencer: Sequencer=DEFAULT_SEQUENCER,
+                 tradesbook: Optional[TradesBook]=None,
+                 max_cascade_depth: int=100):
+        self.symbol = symbol
+        self.instrument = instrument
+        if tradesbook is None:
+            tradesbook = TradesBook(instrument=instrument)
+        else:
+            tradesbook.bind(instrument)
+        self.tradesbook = tradesbook
+
+        self.limit_orderbook = LimitOrderBook(instrument, sequencer)
+        self.limit_orderbook.defer_bbo = True
+        self.stop_orderbook = StopOrderBook(instrument, sequencer)
+
+        self.max_cascade_depth = max_cascade_depth
+        self.last_price: Optional[Decimal] = None
+        self.stops_fired = 0 # by the last inbound order
+        self.stops_fired_total = 0
+        self.activated: List['Order'] = [] # stop orders activated by the last inbound order
+        self.trades: List['Trade'] = [] # trades of the last inbound order
+
+        self.lock = threading.Lock()
+
+    def push(self, order: 'Order') -> List['Trade']:
+        self.stops_fired = 0
+        self.activated, self.trades = [], []
+
+        if order.order_type == OrderType.STOP:
+            self.stop_orderbook.add_to_storage(order)
+            return []
+
+        trades = self.trades = self._run_cascade(order)
+        self.limit_orderbook.refresh_bbo()
+        self.tradesbook.add_many(trades)
+        return trades
+
+    def push_many(self, orders: Iterable['Order']) -> List[OrderResult]:
+        '''Push a batch of orders in one pass.
+        
+        Trades of the whole batch are recorded at once, `stops_fired`
+        counts the stop orders activated by the batch.
+        '''
+        self.stops_fired = 0
+        self.activated, self.trades = [], []
+        store_stop = self.stop_orderbook.add_to_storage
+        run_cascade = self._run_cascade
+        refresh_bbo = self.limit_orderbook.refresh_bbo
+        
+        batch_trades, results = [], []
+        for order in orders:
+            if order.order_type is OrderType.STOP:
+                store_stop(order)
+                results.append(OrderResult(order.id, order.status, order.executed_volume, 0))
+                continue
+            
+            trades = run_cascade(order)
+            refresh_bbo()
+            batch_trades.extend(trades)
+            results.append(OrderResult(order.id, order.status, order.executed_volume, len(trades)))
+        
+        self.tradesbook.add_many(batch_trades)
+        self.trades = batch_trades
+        return results
+
+    def cancel(self, order_id: str) -> Optional['Order']:
+        order = self.limit_orderbook.cancel(order_id)
+        if order is None:
+            return self.stop_orderbook.cancel(order_id)
+
+        self.limit_orderbook.refresh_bbo()
+        return order
+
+    def amend(self,
+              order_id: str,
+              volume: Optional[Decimal]=None,
+              price: Optional[Decimal]=None,
+              stop_price: Optional[Decimal]=None) -> Optional['Order']:
+        self.stops_fired = 0
+        self.activated, self.trades = [], []
+
+        if order_id in self.limit_orderbook:
+            order = self.limit_orderbook.get(order_id)
+            trades = self.limit_orderbook.amend(order_id, volume=volume, price=price)
+        elif order_id in self.stop_orderbook:
+            order = self.stop_orderbook.get(order_id)
+            trades = self.stop_orderbook.amend(order_id, volume=volume, price=price,
+                                               stop_price=stop_price)
+        else:
+            return None
+
+        if trades:
+            trades += self._run_cascade(activated=self.check_stop_orders(trades))
+        self.limit_orderbook.refresh_bbo()
+        self.tradesbook.add_many(trades)
+        self.trades = trades
+
+        return order
+
+    def check_stop_orders(self, trades: List['Trade']) -> List['Order']:
+        '''Activate stop orders reached by one matching pass.'''
+        self.last_price = trades[-1].price
+
+        prices = [t.price for t in trades]
+        orders = self.stop_orderbook.get_activated(min(prices), max(prices))
+
+        self.stops_fired += len(orders)
+        self.stops_fired_total += len(orders)
+        self.activated.extend(orders)
+        return orders
+
+    def __contains__(self, order_id: str) -> bool:
+        '''Whether the order rests in the limit book or waits in the stop book.'''
+        return order_id in self.limit_orderbook or order_id in self.stop_orderbook
+
+    def _run_cascade(self,
+                     order: Optional['Order']=None,
+                     activated: Optional[List['Order']]=None) -> List['Trade']:
+        queue: Deque[Tuple['Order', int]] = deque()
+        if order is not None:
+            queue.append((order, 0))
+        if activated:
+            queue.extend((o, 1) for o in activated)
+
+        all_trades = []
+        while queue:
+            order, depth = queue.popleft()
+            trades = self.limit_orderbook.add(order)
+            if not trades:
+                continue
+
+            all_trades.extend(trades)
+
+            if depth < self.max_cascade_depth:
+                queue.extend((o, depth+1) for o in self.check_stop_orders(trades))
+            else:
+                self.last_price = trades[-1].price
+
+        return all_trades
@@ -0,0 +1,175 @@
+from array import array
+from enum import Enum
+from decimal import Decimal
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.order import Order
+    from src.orderbook.price_level import PriceLevel
+
+from src.order import OrderSide, SIDES, SIDE_CODES
+
+
+class MarketDataErrorMessages(Enum):
+    EVENTS_OVERWRITTEN = 'Event {seq} was overwritten, the oldest kept is {oldest}'
+    
+    def format(self, **kwargs) -> str:
+        return self.value.format(**kwargs)
+
+
+class L3EventKind(Enum):
+    ADD = 0 # order rests in the book, lots it rests with
+    FILL = 1 # resting order partially filled, lots of the fill
+    DONE = 2 # resting order fully filled and out of the book, lots of the fill
+    REDUCE = 3 # volume of a resting order decreased in place, lots taken off
+    REMOVE = 4 # resting order taken out of the book, lots it still had
+
+
+class BBO(NamedTuple):
+    '''Best bid and offer, prices are None for an empty side.'''
+
+    bid_price: Optional[Decimal]
+    bid_size: Decimal
+    bid_orders: int
+    ask_price: Optional[Decimal]
+    ask_size: Decimal
+    ask_orders: int
+
+
+class LevelDelta(NamedTuple):
+    '''New aggregate of one price level, zero lots remove the level.'''
+
+    seq: int
+    side: OrderSide
+    price_ticks: int
+    volume_lots: int
+
+
+class L2Feed:
+    '''Stream of price level changes of a limit order book.
+
+    Levels publish their new lots every time an order is added, filled,
+    amended or taken out, each delta with the next sequence number.
+    '''
+
+    def __init__(self):
+        self.seq = 0
+        self._subscribers: List[Callable[[LevelDelta], None]] = []
+
+    def subscribe(self, callback: Callable[[LevelDelta], None]) -> None:
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[LevelDelta], None]) -> None:
+        self._subscribers.remove(callback)
+
+    def publish(self, side: OrderSide, level: 'PriceLevel') -> None:
+        self.seq += 1
+        delta = LevelDelta(self.seq, side, level.ticks, level.lots)
+        for callback in self._subscribers:
+            callback(delta)
+
+
+class L2Book:
+    '''Order book by price level kept up to date from an `L2Feed`.
+
+    Start it from the levels and the feed sequence number at subscription
+    time, deltas already included in them are skipped.
+    '''
+
+    def __init__(self, seq: int=0):
+        self.seq = seq
+        self.bids: Dict[int, int] = {}
+        self.asks: Dict[int, int] = {}
+
+    def apply(self, delta: LevelDelta) -> None:
+        if delta.seq <= self.seq:
+            return
+
+        self.seq = delta.seq
+        levels = self.bids if delta.side is OrderSide.BID else self.asks
+        if delta.volume_lots:
+            levels[delta.price_ticks] = delta.volume_lots
+        else:
+            levels.pop(delta.price_ticks, None)
+
+    def bid_levels(self, depth: int=5) -> List[Tuple[int, int]]:
+        return sorted(self.bids.items(), reverse=True)[:depth]
+
+    def ask_levels(self, depth: int=5) -> List[Tuple[int, int]]:
+        return sorted(self.asks.items())[:depth]
+
+
+class L3Event(NamedTuple):
+    seq: int
+    kind: L3EventKind
+    order_id: int
+    side: OrderSide
+    price_ticks: int
+    lots: int
+
+
+_KINDS = list(L3EventKind)
+
+
+class L3EventBuffer:
+    '''Sequenced order-by-order events of one or more books.
+
+    Events are rows of preallocated int columns forming a ring of
+    `capacity` rows, so orders need integer ids. Event `seq` is kept in row
+    `seq % capacity` until `capacity` newer events overwrite it. Readers
+    keep the sequence number they have read up to and take the new rows
+    with `read()` as memoryviews of the columns, without copying them.
+    '''
+
+    COLUMNS = ('kind', 'order_id', 'side', 'price', 'lots')
+
+    def __init__(self, capacity: int=65_536):
+        self.capacity = capacity
+        self.seq = 0 # sequence number of the next event
+
+        self.kind = array('b', bytes(capacity))
+        self.side = array('b', bytes(capacity))
+        self.order_id = array('q', bytes(8 * capacity))
+        self.price = array('q', bytes(8 * capacity))
+        self.lots = array('q', bytes(8 * capacity))
+
+    def publish(self, kind: L3EventKind, order: 'Order', lots: int) -> None:
+        slot = self.seq % self.capacity
+        self.kind[slot] = kind.value
+        self.order_id[slot] = order.id
+        self.side[slot] = SIDE_CODES[order.side]
+        self.price[slot] = order.price_ticks
+        self.lots[slot] = lots
+        self.seq += 1
+
+    def read(self, seq: int) -> List[Tuple[int, Dict[str, memoryview]]]:
+        '''Events from `seq` on, as at most two runs of rows that follow
+        each other in the ring. Every run is its first sequence number and
+        a view of each column.'''
+        self._check(seq)
+
+        runs = []
+        while seq < self.seq:
+            start = seq % self.capacity
+            end = min(self.capacity, start + self.seq - seq)
+            runs.append((seq, {name: memoryview(getattr(self, name))[start:end] for name in self.COLUMNS}))
+            seq += end - start
+
+        return runs
+
+    def _check(self, seq: int) -> None:
+        oldest = max(0, self.seq - self.capacity)
+        if not oldest <= seq <= self.seq:
+            raise IndexError(MarketDataErrorMessages.EVENTS_OVERWRITTEN.format(seq=seq, oldest=oldest))
+
+    def __getitem__(self, seq: int) -> L3Event:
+        if seq >= self.seq:
+            raise IndexError('L3 event index out of range')
+        self._check(seq)
+
+        slot = seq % self.capacity
+        return L3Event(seq, _KINDS[self.kind[slot]], self.order_id[slot],
+                       SIDES[self.side[slot]], self.price[slot], self.lots[slot])
+
+    def __len__(self) -> int:
+        return min(self.seq, self.capacity)
@@ -1,13 +1,16 @@
 from decimal import Decimal
 from enum import Enum
 
-from typing import Literal, List, Optional, Union, Dict, TYPE_CHECKING
+from typing import Literal, List, NamedTuple, Optional, Tuple, Union, Dict, TYPE_CHECKING
 
-from datetime import datetime
-import uuid
+from src.instrument import Instrument, DEFAULT_INSTRUMENT
 
 if TYPE_CHECKING:
     from orderlogger import OrderLogger
+    from orderbook.price_level import PriceLevel
+
+
+DEFAULT_SYMBOL = ''
 
 
 class OrderErrorMessages(Enum):
@@ -18,6 +21,8 @@ class OrderErrorMessages(Enum):
     CANNOT_EXECUTE = 'Cannot execute {volume}, remaining: {remaining}'
     LOGGER_REQUIRED = 'Need instance of OrderLogger'
     MARKET_GTC_INVALID = 'Market order cannot have GTC. Use IOC or FOK'
+    CANNOT_AMEND = 'Cannot amend {status} order'
+    AMEND_VOLUME_TOO_LOW = 'New volume {volume} must exceed executed volume {executed}'
     
     def format(self, **kwargs) -> str:
         return self.value.format(**kwargs)
@@ -47,8 +52,35 @@ class OrderTIF(Enum): # Time Force
     FOK = 'FOK' # Fill Or Kill. Filled immediately or the whole order is canceled.
     
 
+# Integer codes of the order enums in binary records, the position in the enum
+STATUSES = list(OrderStatus)
+SIDES = list(OrderSide)
+ORDER_TYPES = list(OrderType)
+TIFS = list(OrderTIF)
+
+STATUS_CODES = {v: i for i, v in enumerate(STATUSES)}
+SIDE_CODES = {v: i for i, v in enumerate(SIDES)}
+TYPE_CODES = {v: i for i, v in enumerate(ORDER_TYPES)}
+TIF_CODES = {v: i for i, v in enumerate(TIFS)}
+
+NO_PRICE = -2**63 # Missing price or other integer field in binary records
+
+
+class OrderResult(NamedTuple):
+    '''Outcome of a single order submitted in a batch.'''
+    
+    order_id: Union[int, str]
+    status: OrderStatus
+    executed_volume: Decimal
+    trades: int
+
+
 class Order:
-    '''Order with support for various types and status tracking.'''
+    '''Order with support for various types and status tracking.
+    
+    Prices and volumes are kept as given and, for the books and the
+    matching engine, as integer ticks and lots of the order instrument.
+    '''
     
     __slots__ = (
         'id',
@@ -59,10 +91,16 @@ class Order:
         'order_type',
         'time_in_force',
         'timestamp',
-        'executed_volume',
         'last_execution_price',
         'status',
-        'logger'
+        'logger',
+        'level',
+        'instrument',
+        'price_ticks',
+        'stop_ticks',
+        'volume_lots',
+        'executed_lots',
+        'symbol'
     )
     
     def __init__(self,
@@ -73,10 +111,13 @@ class Order:
                  stop_price: Optional[Decimal]=None,
                  time_in_force: OrderTIF=OrderTIF.GTC,
                  
-                 logger: Optional['OrderLogger']=None
+                 logger: Optional['OrderLogger']=None,
+                 instrument: Instrument=DEFAULT_INSTRUMENT,
+                 symbol: str=DEFAULT_SYMBOL
                 ):
         
         self.side = side
+        self.symbol = symbol
         self.volume = volume
         self.order_type = order_type
         self.time_in_force = time_in_force
@@ -105,27 +146,82 @@ class Order:
             raise ValueError(
                 OrderErrorMessages.VOLUME_MUST_BE_POSITIVE.format(volume=volume)
             )
-    
-        self.timestamp = datetime.now()
-        self.id = str(uuid.uuid4())
         
-        self.executed_volume = 0
+        self.instrument = instrument
+        self.price_ticks = instrument.to_ticks(self.price)
+        self.stop_ticks = instrument.to_ticks(stop_price)
+        self.volume_lots = instrument.to_lots(volume)
+        
+        self.executed_lots = 0
         self.status: OrderStatus = OrderStatus.NEW
         self.last_execution_price: Optional[Decimal] = None
+        self.level: Optional['PriceLevel'] = None
         
         self.logger = logger
         if self.logger is None:
             raise ValueError(
                 OrderErrorMessages.LOGGER_REQUIRED.format()
             )
+        
+        self.id = self.logger.sequencer.next_id()
+        self.timestamp = self.logger.sequencer.now()
         self.logger.add(self)
     
+    @classmethod
+    def restore(cls,
+                id: Union[int, str],
+                timestamp: int,
+                side: OrderSide,
+                volume_lots: int,
+                price_ticks: Optional[int],
+                order_type: OrderType,
+                stop_ticks: Optional[int],
+                time_in_force: OrderTIF,
+                logger: 'OrderLogger',
+                instrument: Instrument=DEFAULT_INSTRUMENT,
+                symbol: str=DEFAULT_SYMBOL,
+                executed_lots: int=0,
+                status: OrderStatus=OrderStatus.NEW) -> 'Order':
+        '''Rebuild an order already validated and sequenced elsewhere.
+        
+        Nothing is checked, logged or taken from the sequencer.
+        '''
+        order = cls.__new__(cls)
+        order.id = id
+        order.timestamp = timestamp
+        order.side = side
+        order.symbol = symbol
+        order.order_type = order_type
+        order.time_in_force = time_in_force
+        order.instrument = instrument
+        order.price_ticks = price_ticks
+        order.stop_ticks = stop_ticks
+        order.volume_lots = volume_lots
+        order.price = instrument.to_price(price_ticks)
+        order.stop_price = instrument.to_price(stop_ticks)
+        order.volume = instrument.to_volume(volume_lots)
+        order.executed_lots = executed_lots
+        order.status = status
+        order.last_execution_price = None
+        order.level = None
+        order.logger = logger
+        return order
+    
+    @property
+    def remaining_lots(self) -> int:
+        return self.volume_lots - self.executed_lots
+    
     @property
-    def remaining_volume(self) -> Union[int, Decimal]:
-        return self.volume - self.executed_volume
+    def executed_volume(self) -> Decimal:
+        return self.instrument.to_volume(self.executed_lots)
+    
+    @property
+    def remaining_volume(self) -> Decimal:
+        return self.instrument.to_volume(self.volume_lots - self.executed_lots)
     
     def execute(self, volume: Union[int, Decimal], price: Decimal) -> None:
-        if volume > self.remaining_volume:
+        lots = self.instrument.to_lots(volume)
+        if lots > self.remaining_lots:
             raise ValueError(
                 OrderErrorMessages.CANNOT_EXECUTE.format(
                     volume=volume,
@@ -133,16 +229,71 @@ class Order:
                 )
             )
         
-        self.executed_volume += volume
+        self.fill(lots, price)
+    
+    def fill(self, lots: int, price: Decimal) -> None:
+        '''Execute `lots` already checked against the remaining lots.'''
+        self.executed_lots += lots
+        if self.level is not None:
+            self.level.change_lots(-lots)
         
-        if self.executed_volume == self.volume:
+        if self.executed_lots == self.volume_lots:
             self.status = OrderStatus.FILLED
-        elif self.executed_volume > 0:
+        elif self.executed_lots > 0:
             self.status = OrderStatus.PARTIALLY_FILLED
             
         self.last_execution_price = price
         self.logger.add(self)
     
+    def check_amend(self,
+                    volume: Optional[Union[int, Decimal]]=None,
+                    price: Optional[Decimal]=None,
+                    stop_price: Optional[Decimal]=None) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+        '''Lots, ticks and stop ticks of an amend, without changing the order.
+        
+        Raises ValueError for an amend the order would reject, so a book can
+        check it before taking the order out.
+        '''
+        if self.status in [OrderStatus.FILLED, OrderStatus.CANCELLED]:
+            raise ValueError(
+                OrderErrorMessages.CANNOT_AMEND.format(status=self.status.value)
+            )
+        
+        lots = None
+        if volume is not None:
+            lots = self.instrument.to_lots(volume)
+            if lots <= self.executed_lots:
+                raise ValueError(
+                    OrderErrorMessages.AMEND_VOLUME_TOO_LOW.format(
+                        volume=volume,
+                        executed=self.executed_volume
+                    )
+                )
+        
+        return lots, self.instrument.to_ticks(price), self.instrument.to_ticks(stop_price)
+    
+    def amend(self,
+              volume: Optional[Union[int, Decimal]]=None,
+              price: Optional[Decimal]=None,
+              stop_price: Optional[Decimal]=None) -> None:
+        lots, ticks, stop_ticks = self.check_amend(volume, price, stop_price)
+        
+        if lots is not None:
+            if self.level is not None:
+                self.level.change_lots(lots - self.volume_lots)
+            self.volume = volume
+            self.volume_lots = lots
+        
+        if ticks is not None:
+            self.price = price
+            self.price_ticks = ticks
+        
+        if stop_ticks is not None:
+            self.stop_price = stop_price
+            self.stop_ticks = stop_ticks
+        
+        self.logger.add(self)
+    
     def cancel(self) -> None:
         if self.status not in [OrderStatus.FILLED, OrderStatus.CANCELLED]:
             self.status = OrderStatus.CANCELLED
@@ -151,13 +302,14 @@ class Order:
     def get(self)->dict:
         return {
             'id': self.id,
+            'symbol': self.symbol,
             'side': self.side.value,
             'price': self.price,
             'stop_price': self.stop_price,
             'volume': self.volume,
             'order_type': self.order_type.value,
             'time_in_force': self.time_in_force.value,
-            'timestamp': self.timestamp.isoformat(),
+            'timestamp': self.timestamp,
             'executed_volume': self.executed_volume,
             'remaining_volume': self.remaining_volume,
             'status': self.status.value
@@ -166,5 +318,5 @@ class Order:
     def __repr__(self) -> str:
         price_str = f'${self.price}' if self.price else '[MARKET]'
 #        return f'ORDER: #{self.id[:8]} | {self.side.value} | rem/start vol: {self.remaining_volume} / {self.volume} | {price_str} | {self.status.value}'
-        return f'#{self.id[:8]} | {self.side.value} | {self.remaining_volume} / {self.volume} | {price_str}'
+        return f'#{str(self.id)[:8]} | {self.side.value} | {self.remaining_volume} / {self.volume} | {price_str}'
 
@@ -1,9 +1,14 @@
 from decimal import Decimal
-from typing import List, Optional, Tuple, TYPE_CHECKING
+from typing import Callable, Iterable, List, Optional, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from src.order import Order
+    from src.tradesbook import Trade
 
+from src.instrument import Instrument, DEFAULT_INSTRUMENT
+from src.marketdata import BBO, L2Feed, L3EventBuffer, LevelDelta
+from src.order import OrderResult
+from src.sequencer import Sequencer, DEFAULT_SEQUENCER
 from src.orderbook.limit_orders_stack import AskOrders, BidOrders
 from src.orderbook.orderbook import OrderBook
 
@@ -11,15 +16,99 @@ from src.orderbook.orderbook import OrderBook
 class LimitOrderBook(OrderBook):
     '''Order book matching bids and asks with price-time priority for limit orders.'''
     
-    def __init__(self):
-        super().__init__(AskOrders(), BidOrders())
+    def __init__(self,
+                 instrument: Instrument=DEFAULT_INSTRUMENT,
+                 sequencer: Sequencer=DEFAULT_SEQUENCER):
+        super().__init__(AskOrders(instrument), BidOrders(instrument), sequencer)
+        self.feed: Optional[L2Feed] = None
+        
+        self._top: Tuple = (None, 0, 0, None, 0, 0) # BBO in ticks and lots
+        self.bbo = BBO(None, instrument.to_volume(0), 0, None, instrument.to_volume(0), 0)
+        self._bbo_subscribers: List[Callable[[BBO], None]] = []
+        self.defer_bbo = False # the owner calls refresh_bbo() once per inbound order
     
+    def add(self, order: 'Order') -> List['Trade']:
+        trades = self.me.add(order)
+        if not self.defer_bbo:
+            self.refresh_bbo()
+        return trades
     
-    def get_bid_levels(self, depth: int=5) -> List[Tuple[Decimal, Decimal]]:
-        return self.bids.get_levels(depth)
+    def cancel(self, order_id: str) -> Optional['Order']:
+        order = super().cancel(order_id)
+        if not self.defer_bbo:
+            self.refresh_bbo()
+        return order
     
-    def get_ask_levels(self, depth: int=5) -> List[Tuple[Decimal, Decimal]]:
-        return self.asks.get_levels(depth)
+    def amend(self,
+              order_id: str,
+              volume: Optional[Decimal]=None,
+              price: Optional[Decimal]=None) -> Optional[List['Trade']]:
+        trades = super().amend(order_id, volume=volume, price=price)
+        if not self.defer_bbo:
+            self.refresh_bbo()
+        return trades
+    
+    def subscribe_bbo(self, callback: Callable[[BBO], None]) -> None:
+        '''Call `callback` with the new BBO after every inbound order,
+        cancel or amend that changed it.'''
+        self._bbo_subscribers.append(callback)
+    
+    def refresh_bbo(self) -> None:
+        '''Update the cached BBO from the top levels of the book.
+        
+        Called after every change made through the book unless
+        `defer_bbo` is set, call it after filling the stacks directly.
+        '''
+        bid, ask = self.bids.top(), self.asks.top()
+        top = (
+            None if bid is None else bid.ticks, 0 if bid is None else bid.lots, 0 if bid is None else len(bid),
+            None if ask is None else ask.ticks, 0 if ask is None else ask.lots, 0 if ask is None else len(ask)
+        )
+        if top == self._top:
+            return
+        
+        self._top = top
+        to_price, to_volume = self.instrument.to_price, self.instrument.to_volume
+        self.bbo = BBO(to_price(top[0]), to_volume(top[1]), top[2], to_price(top[3]), to_volume(top[4]), top[5])
+        for callback in self._bbo_subscribers:
+            callback(self.bbo)
+    
+    def subscribe(self, callback: Callable[[LevelDelta], None]) -> int:
+        '''Call `callback` with every price level change from now on.
+        
+        Returns the sequence number of the last delta, the levels of the
+        book read right after subscribing include all deltas up to it.
+        The feed is attached to the book on the first subscription.
+        '''
+        if self.feed is None:
+            self.feed = self.asks.feed = self.bids.feed = L2Feed()
+        
+        self.feed.subscribe(callback)
+        return self.feed.seq
+    
+    def add_many(self, orders: Iterable['Order']) -> Tuple[List['Trade'], List[OrderResult]]:
+        '''Match a batch of orders, returning all trades and a result per order.'''
+        add = self.add
+        trades, results = [], []
+        
+        for order in orders:
+            order_trades = add(order)
+            trades.extend(order_trades)
+            results.append(OrderResult(order.id, order.status, order.executed_volume, len(order_trades)))
+        
+        return trades, results
+    
+    def record_events(self, events: Optional[L3EventBuffer]=None) -> L3EventBuffer:
+        '''Publish order-by-order events to `events`, a new buffer by
+        default. Books sharing a buffer get one sequence over all of them.'''
+        self.me.events = L3EventBuffer() if events is None else events
+        return self.me.events
+    
+    def get_bid_levels(self, depth: int=5, orders_count: bool=False) -> List[Tuple]:
+        return self.bids.get_levels(depth, orders_count)
+    
+    def get_ask_levels(self, depth: int=5, orders_count: bool=False) -> List[Tuple]:
+        return self.asks.get_levels(depth, orders_count)
     
     @property
     def best_ask(self) -> Optional['Order']:
@@ -31,8 +120,9 @@ class LimitOrderBook(OrderBook):
     
     @property
     def spread(self) -> Optional[Decimal]:
-        if self.best_ask and self.best_bid:
-            return self.best_ask.price - self.best_bid.price
+        bid_ticks, ask_ticks = self._top[0], self._top[3]
+        if bid_ticks is not None and ask_ticks is not None:
+            return self.instrument.to_price(ask_ticks - bid_ticks)
         return None
             
     
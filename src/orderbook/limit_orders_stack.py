@@ -1,53 +1,52 @@
 from typing import List, Tuple, Optional, TYPE_CHECKING
 from decimal import Decimal
-import bisect
-from collections import defaultdict
 
 if TYPE_CHECKING:
     from .order import Order
 
+from src.instrument import Instrument, DEFAULT_INSTRUMENT
+from src.order import OrderSide
 from src.orderbook.stack import Stack
 
 
 class LimitOrdersStack(Stack):
     '''Base class for price-sorted order containers (bids/asks).'''
-    
-    def __init__(self):
-        super().__init__()
-    
-    def push(self, order: 'Order') -> None:
-        raise NotImplementedError('Subclasses must implement push()')
-    
-    @property
-    def volume(self) -> Decimal:
-        return sum(o.volume for o in self._orders)
-    
-    def get_levels(self, depth: int=5) -> List[Tuple[Decimal, Decimal]]:
-        levels = defaultdict(Decimal)
-        for o in self._orders:
-            levels[o.price] += o.remaining_volume
-        
-        return list(levels.items())[:depth]
+
+    def __init__(self, instrument: Instrument=DEFAULT_INSTRUMENT):
+        super().__init__(instrument)
+
+    def _price(self, order: 'Order') -> int:
+        return order.price_ticks
+
+    def get_levels(self, depth: int=5, orders_count: bool=False) -> List[Tuple]:
+        '''Best-first (price, volume) pairs, with the number of orders
+        resting at each price appended when `orders_count` is set.'''
+        to_price, to_volume = self.instrument.to_price, self.instrument.to_volume
+        if orders_count:
+            return [(to_price(l.ticks), to_volume(l.lots), len(l)) for l in self.top_levels(depth)]
+
+        return [(to_price(l.ticks), to_volume(l.lots)) for l in self.top_levels(depth)]
 
 
 class AskOrders(LimitOrdersStack):
     '''Ask orders sorted from lowest to highest price.'''
-    
-    def __init__(self):
-        super().__init__()
-    
-    def push(self, order: 'Order') -> None:
-        idx = bisect.bisect_right([-o.price for o in self._orders], -order.price)
-        self._orders.insert(idx, order)
-    
+
+    side = OrderSide.ASK
+
+    def __init__(self, instrument: Instrument=DEFAULT_INSTRUMENT):
+        super().__init__(instrument)
+
+    def _key(self, ticks: int) -> int:
+        return -ticks
+
 
 class BidOrders(LimitOrdersStack):
     '''Bid orders sorted from highest to lowest price.'''
-    
-    def __init__(self):
-        super().__init__()
-    
-    def push(self, order: 'Order') -> None:
-        idx = bisect.bisect_right([o.price for o in self._orders], order.price)
-        self._orders.insert(idx, order)
 
+    side = OrderSide.BID
+
+    def __init__(self, instrument: Instrument=DEFAULT_INSTRUMENT):
+        super().__init__(instrument)
+
+    def _key(self, ticks: int) -> int:
+        return ticks
@@ -1,27 +1,36 @@
 from decimal import Decimal
-from typing import Literal, List, Union, Dict, Tuple, Iterator, TYPE_CHECKING
+from typing import Literal, List, Optional, Union, Dict, Tuple, Iterator, TYPE_CHECKING
 import bisect
 from collections import defaultdict
 
 if TYPE_CHECKING:
-    from src.exchange import Exchange
     from src.order import Order
     from src.orderbook.stop_orders_stack import StopOrdersStack, AskStopOrders, BidStopOrders
     from src.orderbook.limit_orders_stack import OrdersStack, AskOrders, BidOrders
 
+from src.marketdata import L3EventBuffer, L3EventKind
 from src.order import OrderType, OrderSide, OrderTIF
+from src.sequencer import Sequencer, DEFAULT_SEQUENCER
 from src.tradesbook import Trade
 
 
 class MatchingEngine:
+    '''Matches incoming orders against the resting ones.
+    
+    With an `events` buffer every change of a resting order is published
+    to it as an L3 event.
+    '''
     
     def __init__(self,
                  asks: Union['AskOrders', 'AskStopOrders'],
-                 bids: Union['BidOrders', 'BidStopOrders']):
+                 bids: Union['BidOrders', 'BidStopOrders'],
+                 sequencer: Sequencer=DEFAULT_SEQUENCER):
         self.asks = asks
         self.bids = bids
+        self.sequencer = sequencer
+        self.events: Optional[L3EventBuffer] = None
     
-    def add(self, order: 'Order', exchange: 'Exchange'=None) -> None:
+    def add(self, order: 'Order') -> List[Trade]:
         if order.side == OrderSide.ASK:
             opposite_side, same_side = self.bids, self.asks
         else:
@@ -33,58 +42,81 @@ class MatchingEngine:
         if best_opposite:
             if order.time_in_force is OrderTIF.FOK and not self._is_enough_volume(order, opposite_side):
                 order.cancel()
-                return
+                return trades
             
-            while order.remaining_volume \
+            while order.remaining_lots \
                   and opposite_side.peek() \
-                  and self._best_or_equal(order, opposite_side.peek().price):
-                trade = self._execute_matched_orders(order, opposite_side.peek(), opposite_side, exchange)
+                  and self._best_or_equal(order, opposite_side.peek().price_ticks):
+                trade = self._execute_matched_orders(order, opposite_side.peek(), opposite_side)
                 trades.append(trade)
                 
-        if order.remaining_volume > 0 and order.time_in_force not in [OrderTIF.IOC, OrderTIF.FOK]:
+        if order.remaining_lots > 0 and order.time_in_force not in [OrderTIF.IOC, OrderTIF.FOK]:
             same_side.push(order)
+            if self.events is not None:
+                self.events.publish(L3EventKind.ADD, order, order.remaining_lots)
         
         return trades
+    
+    def remove(self, order_id: str) -> Optional['Order']:
+        order = self.asks.remove(order_id) or self.bids.remove(order_id)
+        if order is not None and self.events is not None:
+            self.events.publish(L3EventKind.REMOVE, order, order.remaining_lots)
+        
+        return order
+    
+    def reduce(self, order: 'Order', volume: Decimal) -> None:
+        '''Decrease the volume of a resting order keeping its priority.'''
+        lots = order.volume_lots
+        order.amend(volume=volume)
+        if self.events is not None and lots != order.volume_lots:
+            self.events.publish(L3EventKind.REDUCE, order, lots - order.volume_lots)
 
                 
-    def _is_enough_volume(self, order: 'Order', opposite_side: List['Order']) -> bool:
-        existing_volume = 0
-        for o in reversed(opposite_side):
-            if self._best_or_equal(order, o.price):
-                existing_volume += o.volume
-            else:
+    def _is_enough_volume(self, order: 'Order', opposite_side: 'OrdersStack') -> bool:
+        if order.order_type == OrderType.MARKET:
+            return order.remaining_lots <= opposite_side.volume_lots
+        
+        existing_lots = 0
+        for level in opposite_side.levels():
+            if not self._best_or_equal(order, level.ticks):
                 break
+            
+            existing_lots += level.lots
+            if order.remaining_lots <= existing_lots:
+                return True
 
-        return order.volume <= existing_volume
+        return False
     
     
-    def _best_or_equal(self, order: 'Order', opposite_price: Decimal) -> bool:
+    def _best_or_equal(self, order: 'Order', opposite_ticks: int) -> bool:
         if order.order_type == OrderType.MARKET: return True
         
         if order.side == OrderSide.ASK:
-            return order.price <= opposite_price
+            return order.price_ticks <= opposite_ticks
         else:
-            return order.price >= opposite_price
+            return order.price_ticks >= opposite_ticks
     
     
     def _execute_matched_orders(self,
                                 incoming: 'Order', existing: 'Order',
-                                opposite_side: 'OrdersStack', exchange: 'Exchange'=None) -> Trade:
+                                opposite_side: 'OrdersStack') -> Trade:
         
-        volume = min(incoming.remaining_volume, existing.remaining_volume)
+        lots = min(incoming.remaining_lots, existing.remaining_lots)
         price = existing.price
         
-        incoming.execute(volume=volume, price=price)
-        existing.execute(volume=volume, price=price)
+        incoming.fill(lots, price)
+        existing.fill(lots, price)
         
-        if existing.remaining_volume == 0:
+        if existing.remaining_lots == 0:
             opposite_side.pop()
         
-        trade = Trade(incoming, existing, incoming.side, price, volume)
-        if exchange:
-            exchange.check_stop_orders(trade)
+        if self.events is not None:
+            kind = L3EventKind.FILL if existing.remaining_lots else L3EventKind.DONE
+            self.events.publish(kind, existing, lots)
         
-        return trade
+        return Trade(incoming, existing, incoming.side, price,
+                     existing.instrument.to_volume(lots), self.sequencer,
+                     existing.price_ticks, lots)
             
     def clear(self) -> None:
         self.asks.clear()
@@ -4,14 +4,15 @@ from typing import Union, List, Optional, TYPE_CHECKING
 from itertools import zip_longest
 
 if TYPE_CHECKING:
-    from src.exchange import Exchange
     from src.order import Order
     from src.tradesbook import Trade
     from src.tradesbook import TradesBook
+    from src.instrument import Instrument
     from src.orderbook.stop_orders_stack import AskStopOrders, BidStopOrders
     from src.orderbook.limit_orders_stack import AskOrders, BidOrders
     
 from src.orderbook.matching_engine import MatchingEngine
+from src.sequencer import Sequencer, DEFAULT_SEQUENCER
 
 
 class OrderBook:
@@ -19,12 +20,17 @@ class OrderBook:
     
     def __init__(self,
                  asks: Union['AskOrders', 'AskStopOrders'],
-                 bids: Union['BidOrders', 'BidStopOrders']):
+                 bids: Union['BidOrders', 'BidStopOrders'],
+                 sequencer: Sequencer=DEFAULT_SEQUENCER):
         
-        self.me = MatchingEngine(asks, bids)
+        self.me = MatchingEngine(asks, bids, sequencer)
     
-    def add(self, order: 'Order', exchange: 'Exchange'=None):
-        self.me.add(order, exchange)
+    @property
+    def instrument(self) -> 'Instrument':
+        return self.me.asks.instrument
+    
+    def add(self, order: 'Order') -> List['Trade']:
+        return self.me.add(order)
     
     def clear(self) -> None:
         self.me.clear()
@@ -37,8 +43,42 @@ class OrderBook:
     def bids(self) -> List['Orders']:
         return self.me.bids
     
-    def cancel(self, order: 'Order') -> None:
-        pass
+    def get(self, order_id: str) -> Optional['Order']:
+        return self.asks.get(order_id) or self.bids.get(order_id)
+    
+    def cancel(self, order_id: str) -> Optional['Order']:
+        order = self.me.remove(order_id)
+        if order:
+            order.cancel()
+        
+        return order
+    
+    def amend(self,
+              order_id: str,
+              volume: Optional[Decimal]=None,
+              price: Optional[Decimal]=None) -> Optional[List['Trade']]:
+        '''Amend a resting order.
+        
+        Decreasing the volume keeps the time priority of the order, any
+        other change takes it out of the book and adds it again.
+        '''
+        order = self.get(order_id)
+        if order is None:
+            return None
+        
+        if (price is None or price == order.price) \
+           and (volume is None or volume <= order.volume):
+            self.me.reduce(order, volume)
+            return []
+        
+        order.check_amend(volume, price)
+        self.me.remove(order_id)
+        order.amend(volume=volume, price=price)
+        
+        return self.add(order)
+    
+    def __contains__(self, order_id: str) -> bool:
+        return order_id in self.asks or order_id in self.bids
     
     def __len__(self):
         return len(self.asks) + len(self.bids)
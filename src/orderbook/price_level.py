@@ -0,0 +1,73 @@
+from collections import OrderedDict
+from typing import Iterator, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.order import Order
+    from src.orderbook.stack import Stack
+
+
+class PriceLevel:
+    '''FIFO queue of orders resting at a single price.
+    
+    Orders are keyed by id, so any of them can be taken out of the queue
+    without disturbing the time priority of the others. `ticks` is the
+    price of the level and `lots` its remaining volume, resting orders
+    report their executions and amendments through `change_lots()`, which
+    also keeps the running total of the owning stack and publishes the new
+    lots to its feed.
+    '''
+
+    __slots__ = ('ticks', 'lots', 'stack', '_orders')
+
+    def __init__(self, ticks: int, stack: 'Stack'):
+        self.ticks = ticks
+        self.lots = 0
+        self.stack = stack
+        self._orders: 'OrderedDict[str, Order]' = OrderedDict()
+
+    def append(self, order: 'Order') -> None:
+        self._orders[order.id] = order
+        self.change_lots(order.remaining_lots)
+        order.level = self
+
+    def change_lots(self, delta: int) -> None:
+        self.lots += delta
+        stack = self.stack
+        stack.volume_lots += delta
+        if stack.feed is not None and delta:
+            stack.feed.publish(stack.side, self)
+
+    def peek(self) -> Optional['Order']:
+        return next(iter(self._orders.values()), None)
+
+    def popleft(self) -> 'Order':
+        return self._detach(self._orders.popitem(last=False)[1])
+
+    def get(self, order_id: str) -> Optional['Order']:
+        return self._orders.get(order_id)
+
+    def remove(self, order_id: str) -> 'Order':
+        return self._detach(self._orders.pop(order_id))
+
+    def clear(self) -> None:
+        for o in self._orders.values():
+            o.level = None
+        self._orders.clear()
+        self.change_lots(-self.lots)
+
+    def _detach(self, order: 'Order') -> 'Order':
+        self.change_lots(-order.remaining_lots)
+        order.level = None
+        return order
+
+    def __iter__(self) -> Iterator['Order']:
+        return iter(self._orders.values())
+
+    def __reversed__(self) -> Iterator['Order']:
+        return reversed(self._orders.values())
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __repr__(self) -> str:
+        return f'PriceLevel({self.ticks} | {self.lots} | {len(self._orders)} orders)'
@@ -1,36 +1,151 @@
-from typing import List, Optional, Iterator, TYPE_CHECKING
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Iterator, TYPE_CHECKING
+import bisect
 
 if TYPE_CHECKING:
     from .order import Order
+    from src.marketdata import L2Feed
+
+from src.instrument import Instrument, DEFAULT_INSTRUMENT
+from src.order import OrderSide
+from src.orderbook.price_level import PriceLevel
 
 
 class Stack:
-    ''' Base class for limit and stop orders '''
-    
-    def __init__(self):
-        self._orders: List['Order'] = []
-    
-    def clear(self) -> None:
-        self._orders.clear()
-    
+    ''' Base class for limit and stop orders.
+
+    Orders are grouped into price levels keyed by integer ticks. `_prices`
+    holds the level keys sorted ascending so the best level is always the
+    last one, every level keeps its orders in time priority and `_index`
+    maps an order id to the key of the level it rests in. `volume_lots` is
+    the running total of the remaining lots over all levels.
+
+    Stacks with a `feed` publish every change of a level to it.
+    '''
+
+    side: OrderSide
+
+    def __init__(self, instrument: Instrument=DEFAULT_INSTRUMENT):
+        self.instrument = instrument
+        self._prices: List[int] = []
+        self._levels: Dict[int, PriceLevel] = {}
+        self._index: Dict[str, int] = {}
+        self.volume_lots = 0
+        self.feed: Optional['L2Feed'] = None
+
+    def _price(self, order: 'Order') -> int:
+        raise NotImplementedError('Subclasses must implement _price()')
+
+    def _key(self, ticks: int) -> int:
+        raise NotImplementedError('Subclasses must implement _key()')
+
+    @property
+    def volume(self) -> Decimal:
+        return self.instrument.to_volume(self.volume_lots)
+
+    def push(self, order: 'Order') -> None:
+        ticks = self._price(order)
+        key = self._key(ticks)
+        level = self._levels.get(key)
+        if level is None:
+            level = self._levels[key] = PriceLevel(ticks, self)
+            bisect.insort(self._prices, key)
+
+        level.append(order)
+        self._index[order.id] = key
+
+    def load(self, orders: Iterable['Order']) -> None:
+        '''Rest `orders` in an empty stack, keeping their order within each
+        level, with one sort of the level keys.'''
+        levels, index = self._levels, self._index
+        for order in orders:
+            ticks = self._price(order)
+            key = self._key(ticks)
+            level = levels.get(key)
+            if level is None:
+                level = levels[key] = PriceLevel(ticks, self)
+
+            level.append(order)
+            index[order.id] = key
+
+        self._prices = sorted(levels)
+
+    def top(self) -> Optional[PriceLevel]:
+        return self._levels[self._prices[-1]] if self._prices else None
+
     def peek(self) -> Optional['Order']:
-        return self._orders[-1] if self._orders else None
-    
-    def pop(self) -> None:
-        self._orders.pop()
-    
+        return self._levels[self._prices[-1]].peek() if self._prices else None
+
+    def pop(self) -> 'Order':
+        key = self._prices[-1]
+        level = self._levels[key]
+        order = level.popleft()
+        del self._index[order.id]
+
+        if not level:
+            del self._levels[key]
+            self._prices.pop()
+
+        return order
+
+    def get(self, order_id: str) -> Optional['Order']:
+        key = self._index.get(order_id)
+        return self._levels[key].get(order_id) if key is not None else None
+
+    def remove(self, order_id: str) -> Optional['Order']:
+        key = self._index.pop(order_id, None)
+        if key is None:
+            return None
+
+        level = self._levels[key]
+        order = level.remove(order_id)
+        if not level:
+            del self._levels[key]
+            del self._prices[bisect.bisect_left(self._prices, key)]
+
+        return order
+
+    def _take_worst_levels(self, count: int) -> List[PriceLevel]:
+        keys = self._prices[:count]
+        del self._prices[:count]
+        
+        levels = [self._levels.pop(key) for key in keys]
+        for level in levels:
+            for o in level:
+                del self._index[o.id]
+        
+        return levels
+
+    def levels(self) -> Iterator[PriceLevel]:
+        for idx in range(len(self._prices)-1, -1, -1):
+            yield self._levels[self._prices[idx]]
+
+    def top_levels(self, depth: int) -> List[PriceLevel]:
+        return [self._levels[key] for key in self._prices[-1:-depth-1:-1]] if depth > 0 else []
+
+    def clear(self) -> None:
+        for level in self._levels.values():
+            level.clear()
+        self._prices.clear()
+        self._levels.clear()
+        self._index.clear()
+
+    def __contains__(self, order_id: str) -> bool:
+        return order_id in self._index
+
     def __iter__(self) -> Iterator['Order']:
-        return iter(self._orders)
-    
-    def __reversed__(self):
-        for idx in range(len(self._orders)-1, -1, -1):
-            yield self._orders[idx]
-    
+        for key in self._prices:
+            yield from reversed(self._levels[key])
+
+    def __reversed__(self) -> Iterator['Order']:
+        for idx in range(len(self._prices)-1, -1, -1):
+            yield from self._levels[self._prices[idx]]
+
     def __len__(self) -> int:
-        return len(self._orders)
-    
+        return len(self._index)
+
     def __add__(self, stack: 'Stack') -> List['Orders']:
-        return self._orders + stack._orders
-    
+        return list(self) + list(stack)
+
     def show(self) -> List[dict]:
-        return [o.get() for o in self._orders]
\ No newline at end of file
+        return [o.get() for o in self]
@@ -1,9 +1,14 @@
 from decimal import Decimal
 from typing import List, Optional, TYPE_CHECKING
+import heapq
 
 if TYPE_CHECKING:
-    from .order import Order
+    from src.order import Order
+    from src.tradesbook import Trade
+    from src.orderbook.stop_orders_stack import StopOrdersStack
 
+from src.instrument import Instrument, DEFAULT_INSTRUMENT
+from src.sequencer import Sequencer, DEFAULT_SEQUENCER
 from src.order import OrderSide 
 from src.orderbook.stop_orders_stack import AskStopOrders, BidStopOrders
 from src.orderbook.orderbook import OrderBook
@@ -12,11 +17,13 @@ from src.orderbook.orderbook import OrderBook
 class StopOrderBook(OrderBook):
     '''Order book matching bids and asks with price-time priority for stop orders.'''
     
-    def __init__(self):
-        super().__init__(AskStopOrders(), BidStopOrders())
+    def __init__(self,
+                 instrument: Instrument=DEFAULT_INSTRUMENT,
+                 sequencer: Sequencer=DEFAULT_SEQUENCER):
+        super().__init__(AskStopOrders(instrument), BidStopOrders(instrument), sequencer)
         
-        self._ask_storage = AskStopOrders()
-        self._bid_storage = BidStopOrders()
+        self._ask_storage = AskStopOrders(instrument)
+        self._bid_storage = BidStopOrders(instrument)
     
     def add_to_storage(self, order: 'Order') -> None:
         if order.side == OrderSide.ASK:
@@ -24,12 +31,21 @@ class StopOrderBook(OrderBook):
         else:
             self._bid_storage.push(order)
     
-    def get_activated(self, current_price: Decimal) -> Optional[List['Order']]:
-        activated_asks = self._ask_storage.get_activated(current_price)
-        activated_bids = self._bid_storage.get_activated(current_price)
+    def get_activated(self,
+                      current_price: Decimal,
+                      high_price: Optional[Decimal]=None) -> Optional[List['Order']]:
+        '''Activate stop orders reached by the market.
         
-        activated_orders = activated_asks + activated_bids
-        activated_orders.sort(key=lambda o: o.timestamp)
+        Pass the lowest and the highest price of a matching pass to get the
+        same orders as checking every fill price in between.
+        '''
+        if high_price is None:
+            high_price = current_price
+        
+        activated_asks = self._ask_storage.get_activated(self.instrument.to_ticks(current_price))
+        activated_bids = self._bid_storage.get_activated(self.instrument.to_ticks(high_price))
+        
+        activated_orders = heapq.merge(activated_asks, activated_bids, key=lambda o: o.timestamp)
         
         for o in activated_orders:
             self.add(o)
@@ -42,6 +58,56 @@ class StopOrderBook(OrderBook):
         
         return unexecuted_orders
     
+    def _storage_of(self, order_id: str) -> Optional['StopOrdersStack']:
+        if order_id in self._ask_storage:
+            return self._ask_storage
+        if order_id in self._bid_storage:
+            return self._bid_storage
+        return None
+    
+    def get(self, order_id: str) -> Optional['Order']:
+        storage = self._storage_of(order_id)
+        if storage is None:
+            return super().get(order_id)
+        
+        return storage.get(order_id)
+    
+    def cancel(self, order_id: str) -> Optional['Order']:
+        storage = self._storage_of(order_id)
+        if storage is None:
+            return super().cancel(order_id)
+        
+        order = storage.remove(order_id)
+        order.cancel()
+        return order
+    
+    def amend(self,
+              order_id: str,
+              volume: Optional[Decimal]=None,
+              price: Optional[Decimal]=None,
+              stop_price: Optional[Decimal]=None) -> Optional[List['Trade']]:
+        '''Amend a stored stop order.
+        
+        Only a new stop price moves the order to the back of its new level.
+        '''
+        storage = self._storage_of(order_id)
+        if storage is None:
+            return super().amend(order_id, volume=volume, price=price)
+        
+        order = storage.get(order_id)
+        if stop_price is None or stop_price == order.stop_price:
+            order.amend(volume=volume, price=price)
+        else:
+            order.check_amend(volume, price, stop_price)
+            storage.remove(order_id)
+            order.amend(volume=volume, price=price, stop_price=stop_price)
+            storage.push(order)
+        
+        return []
+    
+    def __contains__(self, order_id: str) -> bool:
+        return self._storage_of(order_id) is not None or super().__contains__(order_id)
+    
     @property
     def storage_len(self) -> int:
         return len(self._ask_storage) + len(self._bid_storage)
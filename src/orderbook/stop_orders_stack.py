@@ -1,66 +1,67 @@
 from typing import List, Tuple, Optional, TYPE_CHECKING
 from decimal import Decimal
+from itertools import chain
 import bisect
-from collections import defaultdict
 
 if TYPE_CHECKING:
     from .order import Order
 
+from src.instrument import Instrument, DEFAULT_INSTRUMENT
 from src.orderbook.stack import Stack
-from src.order import OrderType
+from src.order import OrderSide, OrderType
 
 
 class StopOrdersStack(Stack):
     '''Base class for stop orders.'''
-    
-    def __init__(self):
-        super().__init__()
-    
-    def push(self, order: 'Order') -> None:
-        raise NotImplementedError('Subclasses must implement push()')
-    
-    def get_activated(self, current_price: Decimal) -> List['Order']:
-        raise NotImplementedError('Subclasses must implement get_activated()')
+
+    def __init__(self, instrument: Instrument=DEFAULT_INSTRUMENT):
+        super().__init__(instrument)
+
+    def _price(self, order: 'Order') -> int:
+        return order.stop_ticks
+
+    def get_activated(self, current_ticks: int) -> List['Order']:
+        '''Take out every order whose stop price is reached by `current_ticks`.
+        
+        Triggered levels always form the head of `_prices`, so they are found
+        with one bisect and detached as a slice. Orders are returned sorted
+        by timestamp, as a level is not in timestamp order once an amend has
+        moved an older order to its back.
+        '''
+        count = bisect.bisect_right(self._prices, self._key(current_ticks))
+        if not count:
+            return []
+        
+        levels = self._take_worst_levels(count)
+        activated = sorted(chain.from_iterable(levels), key=lambda o: o.timestamp)
+        for level in levels:
+            level.clear()
         
+        for o in activated:
+            o.order_type = OrderType.LIMIT if o.price_ticks is not None else OrderType.MARKET
+        
+        return activated
+
 
 class AskStopOrders(StopOrdersStack):
-    '''Ask stop orders (sorted?) from lowest to highest price.'''
-    
-    def __init__(self):
-        super().__init__()
-    
-    def get_activated(self, current_price: Decimal) -> List['Order']:
-        activated = []
-        for o in self._orders[:]:
-            if current_price <= o.stop_price:
-                o.order_type = OrderType.LIMIT if o.price else OrderType.MARKET
-                activated.append(o)
-                self._orders.remove(o)
-        return activated
-    
-    def push(self, order: 'Order') -> None:
-        idx = bisect.bisect_right([-o.stop_price for o in self._orders], -order.stop_price)
-        self._orders.insert(idx, order)
+    '''Ask stop orders sorted from lowest to highest stop price.'''
+
+    side = OrderSide.ASK
+
+    def __init__(self, instrument: Instrument=DEFAULT_INSTRUMENT):
+        super().__init__(instrument)
+
+    def _key(self, ticks: int) -> int:
+        return -ticks
 
 
 class BidStopOrders(StopOrdersStack):
-    '''Bid stop orders (sorted?) from highest to lowest price.'''
-    
-    def __init__(self):
-        super().__init__()
-        
-    def get_activated(self, current_price: Decimal) -> List['Order']:
-        activated = []
-        for o in self._orders[:]:
-            if current_price >= o.stop_price:
-                o.order_type = OrderType.LIMIT if o.price else OrderType.MARKET
-                activated.append(o)
-                self._orders.remove(o)
-                
-        return activated
-    
-    def push(self, order: 'Order') -> None:
-        idx = bisect.bisect_right([o.stop_price for o in self._orders], order.stop_price)
-        self._orders.insert(idx, order)
-    
-    
\ No newline at end of file
+    '''Bid stop orders sorted from highest to lowest stop price.'''
+
+    side = OrderSide.BID
+
+    def __init__(self, instrument: Instrument=DEFAULT_INSTRUMENT):
+        super().__init__(instrument)
+
+    def _key(self, ticks: int) -> int:
+        return ticks
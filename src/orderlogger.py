@@ -1,10 +1,16 @@
+from array import array
 from dataclasses import dataclass
-from datetime import datetime
 from decimal import Decimal
-from typing import Literal, List, Optional, Union, Dict, Tuple, Iterator
+from typing import Callable, Literal, List, Optional, Union, Dict, Tuple, Iterator
 from collections import defaultdict
+import threading
 
-from src.order import Order, OrderStatus, OrderType, OrderSide, OrderTIF, OrderErrorMessages
+from src.instrument import Instrument
+from src.order import (
+    Order,
+    STATUSES, SIDES, ORDER_TYPES, TIFS, STATUS_CODES, SIDE_CODES, TYPE_CODES, TIF_CODES, NO_PRICE
+)
+from src.sequencer import Sequencer, DEFAULT_SEQUENCER
 
 
 @dataclass(frozen=True)
@@ -20,10 +26,10 @@ class OrderSnapshot:
     stop_price: Decimal
     executed_volume: Decimal
     remaining_volume: Decimal
-    timestamp: datetime
+    timestamp: int
 
     @classmethod
-    def from_order(cls, order: Order):
+    def from_order(cls, order: Order, timestamp: int):
         return cls(
             status=order.status.value,
             side=order.side.value,
@@ -34,18 +40,23 @@ class OrderSnapshot:
             stop_price=order.stop_price,
             executed_volume=order.executed_volume,
             remaining_volume=order.remaining_volume,
-            timestamp=datetime.now()
+            timestamp=timestamp
         )
 
 
 class OrderLogger:
-    '''Records all order snapshots for audit and analysis.'''
+    '''Records all order snapshots for audit and analysis.
     
-    def __init__(self):
+    The sequencer of the logger also gives ids and timestamps to the
+    orders logged with it.
+    '''
+    
+    def __init__(self, sequencer: Sequencer=DEFAULT_SEQUENCER):
+        self.sequencer = sequencer
         self._logs: defaultdict[str, List[Order]] = defaultdict(list)
     
     def add(self, order: Order):
-        self._logs[order.id].append(OrderSnapshot.from_order(order))
+        self._logs[order.id].append(OrderSnapshot.from_order(order, self.sequencer.now()))
     
     def show_by_id(self, id:str) -> List[Order]:
         return self._logs[id]
@@ -61,5 +72,144 @@ class OrderLogger:
 #                out += f'\t{o}\n'
 #        
 #        return out
+
+
+class ColumnarOrderLogger(OrderLogger):
+    '''Order logger keeping snapshots in fixed-size columnar arrays.
+    
+    Every snapshot is one row of int columns: enums as codes, prices in
+    ticks and volumes in lots of the order instrument, so orders must have
+    integer ids. Instruments are stored as their position in
+    `instruments`, so orders of every market decode with their own tick
+    and lot sizes. The columns form a ring buffer of `capacity` rows. When
+    it is full the retained rows are handed to `sink` as a dict of column
+    arrays, if one is set, and then overwritten.
+    
+    Rows of the same order are chained through the `prev` column and
+    `_index` keeps the latest row of each order still in the buffer. Rows
+    are written under a lock, orders may be logged from several threads.
+    '''
+    
+    BYTE_COLUMNS = ('status', 'side', 'type', 'tif')
+    SHORT_COLUMNS = ('instrument',)
+    INT_COLUMNS = ('order_id', 'prev', 'volume', 'price', 'stop_price', 'executed_volume', 'timestamp')
+    
+    def __init__(self,
+                 capacity: int=1_000_000,
+                 sink: Optional[Callable[[Dict[str, array]], None]]=None,
+                 sequencer: Sequencer=DEFAULT_SEQUENCER):
+        super().__init__(sequencer)
+        self.capacity = capacity
+        self.sink = sink
+        self.instruments: List[Instrument] = []
+        
+        self._columns: Dict[str, array] = {}
+        for name in self.BYTE_COLUMNS:
+            self._columns[name] = array('b', bytes(capacity))
+        for name in self.SHORT_COLUMNS:
+            self._columns[name] = array('H', bytes(2 * capacity))
+        for name in self.INT_COLUMNS:
+            self._columns[name] = array('q', bytes(8 * capacity))
+        
+        self._instrument_codes: Dict[Instrument, int] = {}
+        self._index: Dict[int, int] = {} # order id -> latest row
+        self._seq = 0 # rows written so far
+        self._flushed = 0 # rows handed to the sink so far
+        self._lock = threading.RLock()
     
-        
\ No newline at end of file
+    def add(self, order: Order):
+        with self._lock:
+            seq = self._seq
+            slot = seq % self.capacity
+            c = self._columns
+            
+            if seq >= self.capacity:
+                if self.sink is not None and self._flushed <= seq - self.capacity:
+                    self.flush()
+                
+                evicted_id = c['order_id'][slot]
+                if self._index.get(evicted_id) == seq - self.capacity:
+                    del self._index[evicted_id]
+            
+            instrument = self._instrument_codes.get(order.instrument)
+            if instrument is None:
+                instrument = self._instrument_codes[order.instrument] = len(self.instruments)
+                self.instruments.append(order.instrument)
+            
+            c['status'][slot] = STATUS_CODES[order.status]
+            c['side'][slot] = SIDE_CODES[order.side]
+            c['type'][slot] = TYPE_CODES[order.order_type]
+            c['tif'][slot] = TIF_CODES[order.time_in_force]
+            c['instrument'][slot] = instrument
+            c['order_id'][slot] = order.id
+            c['prev'][slot] = self._index.get(order.id, -1)
+            c['volume'][slot] = order.volume_lots
+            c['price'][slot] = NO_PRICE if order.price_ticks is None else order.price_ticks
+            c['stop_price'][slot] = NO_PRICE if order.stop_ticks is None else order.stop_ticks
+            c['executed_volume'][slot] = order.executed_lots
+            c['timestamp'][slot] = self.sequencer.now()
+            
+            self._index[order.id] = seq
+            self._seq = seq + 1
+    
+    def flush(self) -> None:
+        '''Hand the rows not flushed yet to the sink.'''
+        with self._lock:
+            start = max(self._flushed, self._seq - self.capacity)
+            if self.sink is None or start == self._seq:
+                return
+            
+            first, last = start % self.capacity, (self._seq - 1) % self.capacity + 1
+            if first < last:
+                chunk = {name: column[first:last] for name, column in self._columns.items()}
+            else:
+                chunk = {name: column[first:] + column[:last] for name, column in self._columns.items()}
+            
+            self.sink(chunk)
+            self._flushed = self._seq
+    
+    def show_by_id(self, id: int) -> List[OrderSnapshot]:
+        snapshots = []
+        with self._lock:
+            seq = self._index.get(id, -1)
+            oldest = self._seq - self.capacity
+            
+            while seq >= 0 and seq >= oldest:
+                slot = seq % self.capacity
+                snapshots.append(self._snapshot(slot))
+                seq = self._columns['prev'][slot]
+        
+        snapshots.reverse()
+        return snapshots
+    
+    def show(self) -> Dict[int, List[OrderSnapshot]]:
+        logs = defaultdict(list)
+        with self._lock:
+            for seq in range(max(0, self._seq - self.capacity), self._seq):
+                slot = seq % self.capacity
+                logs[self._columns['order_id'][slot]].append(self._snapshot(slot))
+        
+        return dict(logs)
+    
+    def __len__(self) -> int:
+        return min(self._seq, self.capacity)
+    
+    def _snapshot(self, slot: int) -> OrderSnapshot:
+        c = self._columns
+        instrument = self.instruments[c['instrument'][slot]]
+        to_price, to_volume = instrument.to_price, instrument.to_volume
+        price, stop_price = c['price'][slot], c['stop_price'][slot]
+        volume, executed = c['volume'][slot], c['executed_volume'][slot]
+        
+        return OrderSnapshot(
+            status=STATUSES[c['status'][slot]].value,
+            side=SIDES[c['side'][slot]].value,
+            type=ORDER_TYPES[c['type'][slot]].value,
+            tif=TIFS[c['tif'][slot]].value,
+            volume=to_volume(volume),
+            price=None if price == NO_PRICE else to_price(price),
+            stop_price=None if stop_price == NO_PRICE else to_price(stop_price),
+            executed_volume=to_volume(executed),
+            remaining_volume=to_volume(volume - executed),
+            timestamp=c['timestamp'][slot]
+        )
@@ -0,0 +1,192 @@
+from enum import Enum
+from typing import Callable, Iterator, NamedTuple, Optional, TYPE_CHECKING
+import os
+import struct
+import time
+
+if TYPE_CHECKING:
+    from src.exchange import Exchange
+
+from src.order import (
+    Order, OrderSide, OrderType, OrderTIF,
+    SIDES, ORDER_TYPES, TIFS, SIDE_CODES, TYPE_CODES, TIF_CODES, NO_PRICE
+)
+
+
+PUSH = b'P'
+CANCEL = b'C'
+AMEND = b'A'
+
+SYMBOL_SIZE = 8
+READ_RECORDS = 4096 # records read at a time when iterating
+
+
+class ReplayErrorMessages(Enum):
+    SYMBOL_TOO_LONG = 'Symbol {symbol!r} does not fit in {size} bytes'
+
+    def format(self, **kwargs) -> str:
+        return self.value.format(**kwargs)
+
+
+class Command(NamedTuple):
+    '''Inbound exchange command as stored in the journal.'''
+
+    kind: bytes
+    side: OrderSide
+    order_type: OrderType
+    time_in_force: OrderTIF
+    symbol: str
+    order_id: int
+    timestamp: int
+    price_ticks: Optional[int]
+    stop_ticks: Optional[int]
+    volume_lots: Optional[int]
+
+
+class CommandJournal:
+    '''Append-only binary journal of the commands sent to an exchange.
+
+    An exchange created with `journal=` records every push, cancel and
+    amend before processing it. Pushes are stamped with the order
+    timestamp, cancels and amends with the ingress time read from `clock`.
+    `now` returns the time of the command being recorded or replayed. Used
+    as the clock of the exchange sequencer it stamps trades with the time
+    of the command that caused them, which makes the run reproducible. The
+    exchange processes journaled commands one at a time, across markets,
+    so the clock is not moved by another thread during matching:
+
+        journal = CommandJournal(path)
+        exchange = Exchange(sequencer=Sequencer(clock=journal.now),
+                            logger=OrderLogger(Sequencer()), journal=journal)
+
+    Order ids are recorded, trade ids are replayed from the exchange
+    sequencer, so orders need integer ids from a sequencer of their own.
+    Symbols are stored in `SYMBOL_SIZE` bytes, longer ones are rejected,
+    and prices and volumes in ticks and lots of the market instruments,
+    which the replaying exchange must share.
+
+    Every record is written to the file before its command runs, so it
+    survives a crash of the process. It survives a crash of the machine
+    once synced: by default every record is fsynced, which bounds the
+    command rate by the disk. `sync_every=n` syncs every `n` records and
+    may lose the last `n - 1` commands, `sync_every=0` leaves syncing to
+    the OS. A record torn by a crash is skipped when reading and cut off
+    when the journal is opened again.
+    '''
+
+    # kind, side, type, tif, symbol, order id, timestamp, price, stop price, volume
+    RECORD = struct.Struct(f'<cBBB{SYMBOL_SIZE}sqqqqq')
+
+    def __init__(self,
+                 path: str,
+                 clock: Callable[[], int]=time.monotonic_ns,
+                 sync_every: int=1):
+        self.path = path
+        self.clock = clock
+        self.sync_every = sync_every
+
+        self._file = open(path, 'ab')
+        size = self._file.seek(0, os.SEEK_END)
+        if size % self.RECORD.size:
+            self._file.truncate(size - size % self.RECORD.size)
+        self._unsynced = 0
+        self._now = 0
+
+    def now(self) -> int:
+        return self._now
+
+    def record_push(self, order: Order) -> None:
+        self._record(PUSH, SIDE_CODES[order.side], TYPE_CODES[order.order_type],
+                     TIF_CODES[order.time_in_force], order.symbol, order.id, order.timestamp,
+                     order.price_ticks, order.stop_ticks, order.volume_lots)
+
+    def record_cancel(self, order_id: int, symbol: str) -> None:
+        self._record(CANCEL, 0, 0, 0, symbol, order_id, None, None, None, None)
+
+    def record_amend(self,
+                     order_id: int,
+                     symbol: str,
+                     volume_lots: Optional[int],
+                     price_ticks: Optional[int],
+                     stop_ticks: Optional[int]) -> None:
+        self._record(AMEND, 0, 0, 0, symbol, order_id, None, price_ticks, stop_ticks, volume_lots)
+
+    def _record(self, kind: bytes, side: int, order_type: int, tif: int, symbol: str,
+                order_id: int, timestamp: Optional[int], *values: Optional[int]) -> None:
+        data = symbol.encode()
+        if len(data) > SYMBOL_SIZE:
+            raise ValueError(ReplayErrorMessages.SYMBOL_TOO_LONG.format(symbol=symbol, size=SYMBOL_SIZE))
+
+        self._now = self.clock() if timestamp is None else timestamp
+        self._file.write(self.RECORD.pack(
+            kind, side, order_type, tif, data, order_id, self._now,
+            *(NO_PRICE if v is None else v for v in values)
+        ))
+        self._file.flush()
+
+        self._unsynced += 1
+        if self.sync_every and self._unsynced >= self.sync_every:
+            self.sync()
+
+    def sync(self) -> None:
+        '''Make the recorded commands durable.'''
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def close(self) -> None:
+        if self.sync_every:
+            self.sync()
+        self._file.close()
+
+    def __iter__(self) -> Iterator[Command]:
+        if not os.path.getsize(self.path):
+            return
+
+        with open(self.path, 'rb') as f:
+            while True:
+                chunk = f.read(self.RECORD.size * READ_RECORDS)
+                chunk = chunk[:len(chunk) - len(chunk) % self.RECORD.size] # torn last record
+                if not chunk:
+                    return
+
+                for kind, side, order_type, tif, symbol, order_id, timestamp, *values \
+                        in self.RECORD.iter_unpack(chunk):
+                    yield Command(
+                        kind, SIDES[side], ORDER_TYPES[order_type], TIFS[tif],
+                        symbol.rstrip(b'\0').decode(), order_id, timestamp,
+                        *(None if v == NO_PRICE else v for v in values)
+                    )
+
+    def replay(self, exchange: 'Exchange') -> int:
+        '''Execute the recorded commands on `exchange`, return their number.
+
+        The exchange should use `now` as the clock of its sequencer and
+        must not record into this journal.
+        '''
+        count = 0
+        for count, command in enumerate(self, 1):
+            market = exchange.market(command.symbol)
+            instrument = market.instrument
+            self._now = command.timestamp
+
+            if command.kind == PUSH:
+                order = Order.restore(
+                    command.order_id, command.timestamp, command.side, command.volume_lots,
+                    command.price_ticks, command.order_type, command.stop_ticks,
+                    command.time_in_force, exchange.logger, instrument, command.symbol
+                )
+                exchange.logger.add(order)
+                exchange.push(order)
+            elif command.kind == CANCEL:
+                exchange.cancel(command.order_id, command.symbol)
+            else:
+                exchange.amend(
+                    command.order_id,
+                    volume=None if command.volume_lots is None else instrument.to_volume(command.volume_lots),
+                    price=instrument.to_price(command.price_ticks),
+                    stop_price=instrument.to_price(command.stop_ticks),
+                    symbol=command.symbol
+                )
+
+        return count
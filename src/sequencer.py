@@ -0,0 +1,32 @@
+from itertools import count
+from typing import Callable, Iterator, Optional, Union
+import time
+import uuid
+
+
+class Sequencer:
+    '''Source of ids and timestamps for orders, trades and snapshots.
+    
+    Ids come from a monotonic integer sequence and timestamps from
+    `time.monotonic_ns()` unless other sources are injected.
+    '''
+    
+    def __init__(self,
+                 ids: Optional[Iterator[Union[int, str]]]=None,
+                 clock: Callable[[], int]=time.monotonic_ns):
+        self._ids = count(1) if ids is None else ids
+        self._clock = clock
+    
+    def next_id(self) -> Union[int, str]:
+        return next(self._ids)
+    
+    def now(self) -> int:
+        return self._clock()
+
+
+def uuid_ids() -> Iterator[str]:
+    while True:
+        yield str(uuid.uuid4())
+
+
+DEFAULT_SEQUENCER = Sequencer()
@@ -0,0 +1,208 @@
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple, TYPE_CHECKING
+import asyncio
+import struct
+
+if TYPE_CHECKING:
+    from src.exchange import Exchange
+    from src.tradesbook import Trade
+
+from src.order import (
+    Order, OrderSide, OrderStatus, OrderType, OrderTIF,
+    STATUSES, SIDES, ORDER_TYPES, TIFS, STATUS_CODES, SIDE_CODES, TYPE_CODES, TIF_CODES, NO_PRICE
+)
+
+
+# kind, side, type, tif, symbol, client ref or order id, price, stop price, volume
+REQUEST = struct.Struct('<cBBB8sqqqq')
+# kind, status, client ref, order id, lots, price
+REPORT = struct.Struct('<cBqqqq')
+
+NEW_ORDER = b'N'
+CANCEL = b'C'
+
+ACK = b'A' # submitted order after matching, lots executed so far, last trade price
+FILL = b'F' # trade of a resting order, lots and price of the trade
+CANCELLED = b'X' # cancel request accepted
+REJECT = b'R' # invalid order or unknown order id
+
+
+class Report(NamedTuple):
+    kind: bytes
+    status: OrderStatus
+    ref: int
+    order_id: int
+    lots: int
+    price_ticks: Optional[int]
+
+
+def encode_order(ref: int,
+                 side: OrderSide,
+                 volume_lots: int,
+                 price_ticks: Optional[int]=None,
+                 order_type: OrderType=OrderType.LIMIT,
+                 stop_ticks: Optional[int]=None,
+                 time_in_force: OrderTIF=OrderTIF.GTC,
+                 symbol: str='') -> bytes:
+    return REQUEST.pack(
+        NEW_ORDER,
+        SIDE_CODES[side],
+        TYPE_CODES[order_type],
+        TIF_CODES[time_in_force],
+        symbol.encode(),
+        ref,
+        NO_PRICE if price_ticks is None else price_ticks,
+        NO_PRICE if stop_ticks is None else stop_ticks,
+        volume_lots
+    )
+
+
+def encode_cancel(order_id: int, symbol: str='') -> bytes:
+    return REQUEST.pack(CANCEL, 0, 0, 0, symbol.encode(), order_id, NO_PRICE, NO_PRICE, 0)
+
+
+def decode_reports(data: bytes) -> Iterator[Report]:
+    for kind, status, ref, order_id, lots, price in REPORT.iter_unpack(data):
+        yield Report(kind, STATUSES[status], ref, order_id, lots, None if price == NO_PRICE else price)
+
+
+class OrderServer:
+    '''TCP order entry with fixed-width binary messages.
+
+    Requests and reports are `REQUEST` and `REPORT` records with prices in
+    ticks and volumes in lots of the instrument of the symbol's market,
+    orders the exchange refuses get a REJECT report. Clients may send
+    any number of requests without waiting for reports. Every request gets
+    one ACK, CANCELLED or REJECT report, in the order requests were sent on
+    the connection, and FILL reports of resting orders go to the connection
+    that sent them.
+    '''
+
+    def __init__(self, exchange: 'Exchange', host: str='127.0.0.1', port: int=0):
+        self.exchange = exchange
+        self.host = host
+        self.port = port
+
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._outbox: Dict[asyncio.StreamWriter, bytearray] = {} # pending reports per connection
+        self._handlers: Set[asyncio.Task] = set()
+        self._resting: Dict[int, Tuple[asyncio.StreamWriter, int, Order]] = {} # order id -> writer, ref, order
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._server is None:
+            return
+
+        self._server.close()
+        for writer in self._outbox:
+            writer.close()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        size = REQUEST.size
+        buffer = b''
+        self._outbox[writer] = bytearray()
+        self._handlers.add(asyncio.current_task())
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+
+                buffer += data
+                end = len(buffer) - len(buffer) % size
+                for request in REQUEST.iter_unpack(buffer[:end]):
+                    self._handle(writer, *request)
+                buffer = buffer[end:]
+
+                self._send()
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            del self._outbox[writer]
+            self._handlers.discard(asyncio.current_task())
+            writer.close()
+
+    def _send(self) -> None:
+        '''Write the reports of every connection, one write per connection.'''
+        for writer, out in self._outbox.items():
+            if out and not writer.is_closing():
+                writer.write(out)
+            out.clear()
+
+    def _handle(self,
+                writer: asyncio.StreamWriter,
+                kind: bytes, side: int, order_type: int, tif: int, symbol: bytes,
+                ref: int, price: int, stop_price: int, volume: int) -> None:
+        out = self._outbox[writer]
+        try:
+            symbol = symbol.rstrip(b'\0').decode()
+        except UnicodeDecodeError:
+            symbol = None
+
+        if kind == CANCEL:
+            # An empty symbol leaves the lookup of the order to the exchange
+            order = None if symbol is None else self.exchange.cancel(ref, symbol or None)
+            if order is None:
+                out += REPORT.pack(REJECT, 0, 0, ref, 0, NO_PRICE)
+                return
+
+            self._resting.pop(order.id, None)
+            out += REPORT.pack(CANCELLED, STATUS_CODES[order.status], 0, order.id,
+                               order.executed_lots, NO_PRICE)
+            return
+
+        if symbol is None:
+            out += REPORT.pack(REJECT, 0, ref, 0, 0, NO_PRICE)
+            return
+
+        instrument = self.exchange.market(symbol).instrument
+        to_price = instrument.to_price
+        try:
+            order = Order(
+                side=SIDES[side],
+                volume=instrument.to_volume(volume),
+                price=None if price == NO_PRICE else to_price(price),
+                order_type=ORDER_TYPES[order_type],
+                stop_price=None if stop_price == NO_PRICE else to_price(stop_price),
+                time_in_force=TIFS[tif],
+                logger=self.exchange.logger,
+                instrument=instrument,
+                symbol=symbol
+            )
+        except (ValueError, IndexError):
+            out += REPORT.pack(REJECT, 0, ref, 0, 0, NO_PRICE)
+            return
+
+        try:
+            trades = self.exchange.push(order)
+        except Exception:
+            out += REPORT.pack(REJECT, 0, ref, order.id, 0, NO_PRICE)
+            return
+
+        if order.id in self.exchange:
+            self._resting[order.id] = (writer, ref, order)
+        self._report_fills(order, trades)
+
+        out += REPORT.pack(ACK, STATUS_CODES[order.status], ref, order.id, order.executed_lots,
+                           trades[-1].price_ticks if trades else NO_PRICE)
+
+    def _report_fills(self, order: Order, trades: List['Trade']) -> None:
+        resting = self._resting
+        for trade in trades:
+            for order_id in (trade.bid_order_id, trade.ask_order_id):
+                if order_id == order.id or order_id not in resting:
+                    continue
+
+                writer, ref, filled = resting[order_id]
+                if filled.status is OrderStatus.FILLED:
+                    del resting[order_id]
+                outbox = self._outbox.get(writer)
+                if outbox is not None:
+                    outbox += REPORT.pack(FILL, STATUS_CODES[filled.status], ref, order_id,
+                                          trade.volume_lots, trade.price_ticks)
@@ -0,0 +1,318 @@
+from enum import Enum
+from multiprocessing.connection import Connection
+from typing import Any, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+import multiprocessing
+import os
+
+if TYPE_CHECKING:
+    from multiprocessing.context import BaseContext
+
+from src.exchange import Exchange
+from src.instrument import Instrument
+from src.order import (
+    Order, OrderResult, OrderStatus,
+    STATUSES, SIDES, ORDER_TYPES, TIFS, STATUS_CODES, SIDE_CODES, TYPE_CODES, TIF_CODES
+)
+from src.orderlogger import OrderLogger
+from src.sequencer import Sequencer, DEFAULT_SEQUENCER
+from src.tradesbook import Trade, TradesBook
+
+
+# Worker commands
+_MARKET, _ORDERS, _CANCEL, _STOP = range(4)
+
+
+class ShardedExchangeErrorMessages(Enum):
+    WORKER_EXITED = 'Worker of shard {shard} exited with code {code}'
+
+    def format(self, **kwargs) -> str:
+        return self.value.format(**kwargs)
+
+
+class _WorkerLogger(OrderLogger):
+    '''Logger of the worker copies of orders, which the parent logs.'''
+
+    def add(self, order: Order):
+        pass
+
+
+def _restore_order(message: Tuple, instrument: Instrument, logger: OrderLogger) -> Order:
+    '''Worker copy of an order validated and sequenced by the parent.'''
+    _, id, timestamp, symbol, side, order_type, tif, price_ticks, stop_ticks, volume_lots = message
+    return Order.restore(id, timestamp, SIDES[side], volume_lots, price_ticks, ORDER_TYPES[order_type],
+                         stop_ticks, TIFS[tif], logger, instrument, symbol)
+
+
+def _push_orders(exchange: Exchange, messages: List[Tuple]) -> List[Tuple]:
+    '''Match orders, reporting for each its error or its status, whether it
+    rests, its trades and the activated stops that left the books.'''
+    reports = []
+    for message in messages:
+        try:
+            market = exchange.markets[message[3]]
+            order = _restore_order(message, market.instrument, exchange.logger)
+            with market.lock:
+                trades = market.push(order)
+        except Exception as error:
+            reports.append((message[0], error, 0, False, [], []))
+            continue
+
+        reports.append((
+            message[0],
+            None,
+            STATUS_CODES[order.status],
+            order.id in market,
+            [(t.bid_order_id, t.ask_order_id, SIDE_CODES[t.side], t.price_ticks, t.volume_lots)
+             for t in trades],
+            [o.id for o in market.activated if o.id not in market]
+        ))
+    return reports
+
+
+def _run_shard(conn: Connection, max_cascade_depth: int) -> None:
+    '''Worker loop owning the markets of one shard.
+
+    Every command but `_STOP` gets one reply, the exception it raised when
+    it failed.
+    '''
+    exchange = Exchange(sequencer=Sequencer(), logger=_WorkerLogger(),
+                        max_cascade_depth=max_cascade_depth)
+
+    while True:
+        try:
+            command, payload = conn.recv()
+        except EOFError:
+            return
+        except Exception as error:
+            conn.send(error)
+            continue
+
+        if command == _STOP:
+            conn.close()
+            return
+
+        try:
+            if command == _ORDERS:
+                reply: Any = _push_orders(exchange, payload)
+            elif command == _MARKET:
+                reply = exchange.market(*payload).symbol
+            else:
+                reply = exchange.cancel(payload[1], payload[0]) is not None
+        except Exception as error:
+            reply = error
+        conn.send(reply)
+
+
+class ShardedExchange:
+    '''Exchange with its symbols sharded across worker processes.
+
+    Every worker owns the books of its symbols and matches them in its own
+    process, so symbols on different shards are matched in parallel. A
+    symbol is assigned to the least loaded shard on its first order.
+
+    Orders are built and validated in the parent, which sends them to the
+    workers as tuples of integer fields over pipes. Workers report the
+    final status of each order and its trades. The parent applies the
+    reports shard by shard, in the order the orders were sent, so the
+    trades of every symbol are recorded in sequence. The parent copies of
+    resting orders are filled by the reported trades and dropped once they
+    leave the books, and the trades are kept in one `TradesBook` per
+    symbol. Errors raised in a worker are raised again in the parent.
+    '''
+
+    def __init__(self,
+                 shards: Optional[int]=None,
+                 sequencer: Sequencer=DEFAULT_SEQUENCER,
+                 logger: Optional[OrderLogger]=None,
+                 max_cascade_depth: int=100,
+                 context: Optional['BaseContext']=None):
+        self.sequencer = sequencer
+        self.logger = OrderLogger(sequencer) if logger is None else logger
+        self.tradesbooks: Dict[str, TradesBook] = {}
+
+        self._symbols: Dict[str, int] = {} # symbol -> shard
+        self._load: List[int] = []
+        self._orders: Dict[int, Order] = {} # resting orders by id
+
+        context = multiprocessing.get_context() if context is None else context
+        self._conns: List[Connection] = []
+        self._workers = []
+        for _ in range(shards or os.cpu_count() or 1):
+            conn, worker_conn = context.Pipe()
+            worker = context.Process(target=_run_shard, args=(worker_conn, max_cascade_depth), daemon=True)
+            worker.start()
+            worker_conn.close()
+            self._conns.append(conn)
+            self._workers.append(worker)
+            self._load.append(0)
+
+    @property
+    def shards(self) -> int:
+        return len(self._conns)
+
+    def shard_of(self, symbol: str) -> Optional[int]:
+        return self._symbols.get(symbol)
+
+    def _route(self, order: Order) -> int:
+        shard = self._symbols.get(order.symbol)
+        if shard is None:
+            shard = self._load.index(min(self._load))
+            self._send(shard, _MARKET, (order.symbol, order.instrument))
+            self._receive(shard)
+
+            self._symbols[order.symbol] = shard
+            self._load[shard] += 1
+            self.tradesbooks[order.symbol] = TradesBook(instrument=order.instrument)
+        return shard
+
+    def _send(self, shard: int, command: int, payload: Any) -> None:
+        try:
+            self._conns[shard].send((command, payload))
+        except OSError:
+            raise self._exited(shard) from None
+
+    def _receive(self, shard: int) -> Any:
+        '''Reply of a shard, raising the error of a failed command.'''
+        conn, worker = self._conns[shard], self._workers[shard]
+        while not conn.poll(0.1):
+            if not worker.is_alive():
+                raise self._exited(shard)
+
+        try:
+            reply = conn.recv()
+        except (EOFError, OSError):
+            raise self._exited(shard) from None
+
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    def _exited(self, shard: int) -> RuntimeError:
+        worker = self._workers[shard]
+        worker.join()
+        return RuntimeError(ShardedExchangeErrorMessages.WORKER_EXITED.format(shard=shard, code=worker.exitcode))
+
+    def push(self, order: Order) -> List[Trade]:
+        shard = self._route(order)
+        self._orders[order.id] = order
+        self._send(shard, _ORDERS, [self._message(0, order)])
+
+        (_, error, *report), = self._receive(shard)
+        if error is not None:
+            del self._orders[order.id]
+            raise error
+        return self._apply(order, *report)
+
+    def push_many(self, orders: Iterable[Order]) -> List[OrderResult]:
+        '''Push a batch of orders, one message per shard.
+
+        Shards match their part of the batch at the same time, results
+        follow the order of `orders`. When orders fail, the rest of the
+        batch is still applied and the first error is raised.
+        '''
+        orders = list(orders)
+        batches: Dict[int, List[Tuple]] = {}
+        for idx, order in enumerate(orders):
+            batches.setdefault(self._route(order), []).append(self._message(idx, order))
+            self._orders[order.id] = order
+
+        for shard, batch in batches.items():
+            self._send(shard, _ORDERS, batch)
+
+        results: List[Optional[OrderResult]] = [None] * len(orders)
+        errors = []
+        for shard in batches:
+            for idx, error, *report in self._receive(shard):
+                order = orders[idx]
+                if error is not None:
+                    del self._orders[order.id]
+                    errors.append(error)
+                    continue
+
+                trades = self._apply(order, *report)
+                results[idx] = OrderResult(order.id, order.status, order.executed_volume, len(trades))
+
+        if errors:
+            raise errors[0]
+        return results
+
+    def cancel(self, order_id: int, symbol: Optional[str]=None) -> Optional[Order]:
+        '''Cancel a resting order, in the market of `symbol` when given.'''
+        order = self._orders.get(order_id)
+        if order is None or (symbol is not None and symbol != order.symbol):
+            return None
+
+        shard = self._symbols[order.symbol]
+        self._send(shard, _CANCEL, (order.symbol, order_id))
+        if not self._receive(shard):
+            return None
+
+        del self._orders[order_id]
+        order.cancel()
+        return order
+
+    def close(self) -> None:
+        for conn in self._conns:
+            try:
+                conn.send((_STOP, None))
+            except OSError: # worker already gone
+                pass
+            conn.close()
+        for worker in self._workers:
+            worker.join()
+        self._conns.clear()
+        self._workers.clear()
+
+    def __enter__(self) -> 'ShardedExchange':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @staticmethod
+    def _message(idx: int, order: Order) -> Tuple:
+        return (
+            idx,
+            order.id,
+            order.timestamp,
+            order.symbol,
+            SIDE_CODES[order.side],
+            TYPE_CODES[order.order_type],
+            TIF_CODES[order.time_in_force],
+            order.price_ticks,
+            order.stop_ticks,
+            order.volume_lots
+        )
+
+    def _apply(self,
+               order: Order,
+               status: int,
+               resting: bool,
+               reports: List[Tuple],
+               gone: List[int]) -> List[Trade]:
+        '''Replay the trades reported for `order` on the parent copies and
+        drop the copies of orders no longer resting.'''
+        to_price, to_volume = order.instrument.to_price, order.instrument.to_volume
+        orders = self._orders
+
+        trades = []
+        for bid_id, ask_id, side, ticks, lots in reports:
+            bid, ask = orders[bid_id], orders[ask_id]
+            price = to_price(ticks)
+            bid.fill(lots, price)
+            ask.fill(lots, price)
+            trades.append(Trade(bid, ask, SIDES[side], price, to_volume(lots), self.sequencer, ticks, lots))
+
+            for filled in (bid, ask):
+                if filled.status is OrderStatus.FILLED:
+                    del orders[filled.id]
+
+        if STATUSES[status] is OrderStatus.CANCELLED:
+            order.cancel()
+        if not resting:
+            orders.pop(order.id, None)
+        for order_id in gone:
+            orders.pop(order_id, None)
+
+        self.tradesbooks[order.symbol].add_many(trades)
+        return trades
@@ -0,0 +1,154 @@
+from decimal import Decimal
+from enum import Enum
+from itertools import count
+from typing import BinaryIO, Callable, List, TYPE_CHECKING
+import struct
+import time
+
+if TYPE_CHECKING:
+    from src.market import Market
+
+from src.exchange import Exchange
+from src.instrument import Instrument
+from src.order import (
+    Order,
+    STATUSES, SIDES, ORDER_TYPES, TIFS, STATUS_CODES, SIDE_CODES, TYPE_CODES, TIF_CODES, NO_PRICE
+)
+from src.orderlogger import OrderLogger
+from src.sequencer import Sequencer
+
+
+MAGIC = b'STSN'
+VERSION = 1
+
+# magic, version, last id of the exchange sequencer, last id of the order sequencer, markets
+HEADER = struct.Struct('<4sHqqI')
+# last price, stops fired in total, asks, bids, ask stops, bid stops
+MARKET = struct.Struct('<qqIIII')
+# id, timestamp, side, type, tif, status, price, stop price, volume, executed volume
+ORDER = struct.Struct('<qqBBBBqqqq')
+
+
+class SnapshotErrorMessages(Enum):
+    BAD_MAGIC = 'Not an exchange snapshot: {path}'
+    BAD_VERSION = 'Unsupported snapshot version {version}'
+
+    def format(self, **kwargs) -> str:
+        return self.value.format(**kwargs)
+
+
+def save_snapshot(exchange: Exchange, path: str) -> None:
+    '''Write the resting and stored orders of every market to `path`.
+
+    Orders are written best level first and in time priority within a
+    level, prices and volumes in ticks and lots, so orders need integer
+    ids. The snapshot takes one id from each sequencer to record its
+    position. Trades are not part of the snapshot.
+    '''
+    trade_id = exchange.sequencer.next_id()
+    order_sequencer = exchange.logger.sequencer
+    order_id = trade_id if order_sequencer is exchange.sequencer else order_sequencer.next_id()
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, trade_id, order_id, len(exchange.markets)))
+        for market in exchange.markets.values():
+            _write_market(f, market)
+
+
+def load_snapshot(path: str,
+                  clock: Callable[[], int]=time.monotonic_ns,
+                  max_cascade_depth: int=100) -> Exchange:
+    '''Exchange with the state saved in `path`.
+
+    Orders are put straight into their books without matching. Sequencers
+    continue after the ids recorded in the snapshot and read time from
+    `clock`.
+    '''
+    with open(path, 'rb') as f:
+        magic, version, trade_id, order_id, markets = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(SnapshotErrorMessages.BAD_MAGIC.format(path=path))
+        if version != VERSION:
+            raise ValueError(SnapshotErrorMessages.BAD_VERSION.format(version=version))
+
+        sequencer = Sequencer(ids=count(trade_id + 1), clock=clock)
+        if order_id == trade_id:
+            logger = OrderLogger(sequencer)
+        else:
+            logger = OrderLogger(Sequencer(ids=count(order_id + 1), clock=clock))
+
+        exchange = None
+        for _ in range(markets):
+            symbol = _read_str(f)
+            instrument = Instrument(Decimal(_read_str(f)), Decimal(_read_str(f)))
+            if exchange is None:
+                exchange = Exchange(instrument, sequencer, logger, max_cascade_depth=max_cascade_depth)
+            _read_market(f, exchange.market(symbol, instrument), logger)
+
+    if exchange is None:
+        return Exchange(sequencer=sequencer, logger=logger)
+
+    exchange.reindex()
+    return exchange
+
+
+def _write_market(f: BinaryIO, market: 'Market') -> None:
+    limit_orderbook, stop_orderbook = market.limit_orderbook, market.stop_orderbook
+    stacks = (limit_orderbook.asks, limit_orderbook.bids,
+              stop_orderbook.ask_storage, stop_orderbook.bid_storage)
+
+    for value in (market.symbol, str(market.instrument.tick_size), str(market.instrument.lot_size)):
+        _write_str(f, value)
+
+    last_ticks = market.instrument.to_ticks(market.last_price)
+    f.write(MARKET.pack(NO_PRICE if last_ticks is None else last_ticks, market.stops_fired_total,
+                        *(len(stack) for stack in stacks)))
+
+    for stack in stacks:
+        f.write(b''.join(
+            ORDER.pack(
+                o.id, o.timestamp,
+                SIDE_CODES[o.side], TYPE_CODES[o.order_type], TIF_CODES[o.time_in_force],
+                STATUS_CODES[o.status],
+                NO_PRICE if o.price_ticks is None else o.price_ticks,
+                NO_PRICE if o.stop_ticks is None else o.stop_ticks,
+                o.volume_lots, o.executed_lots
+            )
+            for o in reversed(stack)
+        ))
+
+
+def _read_market(f: BinaryIO, market: 'Market', logger: OrderLogger) -> None:
+    last_ticks, market.stops_fired_total, *sizes = MARKET.unpack(f.read(MARKET.size))
+    market.last_price = None if last_ticks == NO_PRICE else market.instrument.to_price(last_ticks)
+
+    limit_orderbook, stop_orderbook = market.limit_orderbook, market.stop_orderbook
+    stacks = (limit_orderbook.asks, limit_orderbook.bids,
+              stop_orderbook.ask_storage, stop_orderbook.bid_storage)
+
+    for stack, size in zip(stacks, sizes):
+        stack.load(_read_orders(f.read(size * ORDER.size), market, logger))
+    limit_orderbook.refresh_bbo()
+
+
+def _read_orders(data: bytes, market: 'Market', logger: OrderLogger) -> List[Order]:
+    instrument, symbol = market.instrument, market.symbol
+    return [
+        Order.restore(
+            id, timestamp, SIDES[side], volume, None if price == NO_PRICE else price, ORDER_TYPES[order_type],
+            None if stop_price == NO_PRICE else stop_price, TIFS[tif], logger, instrument, symbol,
+            executed, STATUSES[status]
+        )
+        for id, timestamp, side, order_type, tif, status, price, stop_price, volume, executed
+        in ORDER.iter_unpack(data)
+    ]
+
+
+def _write_str(f: BinaryIO, value: str) -> None:
+    data = value.encode()
+    f.write(struct.pack('<H', len(data)) + data)
+
+
+def _read_str(f: BinaryIO) -> str:
+    size, = struct.unpack('<H', f.read(2))
+    return f.read(size).decode()
@@ -0,0 +1,175 @@
+from decimal import Decimal
+from typing import Iterable, Iterator, Optional, TYPE_CHECKING
+import mmap
+import os
+import struct
+
+if TYPE_CHECKING:
+    from src.tradesbook import Trade
+
+from src.instrument import Instrument, InstrumentErrorMessages, DEFAULT_INSTRUMENT
+from src.order import OrderSide, SIDES, SIDE_CODES
+
+
+class TradeRecord:
+    '''Read-only view of one journal record.
+
+    Fields are read straight from the memory-mapped file, prices and
+    volumes are converted to `Decimal` on access.
+    '''
+
+    __slots__ = ('_fields', '_instrument')
+
+    def __init__(self, fields: memoryview, instrument: Instrument):
+        self._fields = fields
+        self._instrument = instrument
+
+    @property
+    def id(self) -> int:
+        return self._fields[0]
+
+    @property
+    def timestamp(self) -> int:
+        return self._fields[1]
+
+    @property
+    def bid_order_id(self) -> int:
+        return self._fields[2]
+
+    @property
+    def ask_order_id(self) -> int:
+        return self._fields[3]
+
+    @property
+    def side(self) -> OrderSide:
+        return SIDES[self._fields[4]]
+
+    @property
+    def price_ticks(self) -> int:
+        return self._fields[5]
+
+    @property
+    def volume_lots(self) -> int:
+        return self._fields[6]
+
+    @property
+    def price(self) -> Decimal:
+        return self._instrument.to_price(self._fields[5])
+
+    @property
+    def volume(self) -> Decimal:
+        return self._instrument.to_volume(self._fields[6])
+
+    def __str__(self):
+        return f'#{self.id} | {self.timestamp} | {self.bid_order_id} | {self.ask_order_id} ' \
+               f'| {self.side.value} | {self.price} | {self.volume}'
+
+
+class TradeJournal:
+    '''Append-only file of fixed-size binary trade records.
+
+    A record is seven little-endian int64: id, timestamp, bid order id, ask
+    order id, aggressor side code, price in ticks and volume in lots, so
+    trades need integer ids. Appended trades are buffered and written every
+    `batch_size` records, reads go through a memory map of the file and
+    return `TradeRecord` views without copying the record. Records decode
+    with `instrument`, by default the one of the trades book the journal
+    backs.
+    '''
+
+    FIELDS = ('id', 'timestamp', 'bid_order_id', 'ask_order_id', 'side', 'price', 'volume')
+    RECORD = struct.Struct('<7q')
+
+    def __init__(self,
+                 path: str,
+                 instrument: Optional[Instrument]=None,
+                 batch_size: int=4096):
+        self.path = path
+        self.instrument = DEFAULT_INSTRUMENT if instrument is None else instrument
+        self.batch_size = batch_size
+        self._instrument = instrument # given explicitly
+
+        self._file = open(path, 'ab')
+        self._written = os.path.getsize(path) // self.RECORD.size
+        self._pending = bytearray()
+        self._pending_count = 0
+
+        self._mmap: Optional[mmap.mmap] = None
+        self._records: Optional[memoryview] = None
+        self._mapped = 0
+
+    def bind(self, instrument: Instrument) -> None:
+        '''Decode records with the instrument of the trades book the
+        journal backs, unless another one was given explicitly.'''
+        if self._instrument is not None and instrument != self._instrument:
+            raise ValueError(InstrumentErrorMessages.MISMATCH.format(instrument=instrument, other=self._instrument))
+        self.instrument = instrument
+
+    def append(self, trade: 'Trade') -> None:
+        self._pending += self.RECORD.pack(
+            trade.id,
+            trade.timestamp,
+            trade.bid_order_id,
+            trade.ask_order_id,
+            SIDE_CODES[trade.side],
+            trade.price_ticks,
+            trade.volume_lots
+        )
+        self._pending_count += 1
+
+        if self._pending_count >= self.batch_size:
+            self.flush()
+
+    def extend(self, trades: Iterable['Trade']) -> None:
+        for trade in trades:
+            self.append(trade)
+
+    def flush(self) -> None:
+        if not self._pending_count:
+            return
+
+        self._file.write(self._pending)
+        self._file.flush()
+        self._written += self._pending_count
+        self._pending.clear()
+        self._pending_count = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+        self._records = None
+        self._mmap = None
+
+    def _map(self) -> memoryview:
+        '''Flat int64 view over all written records, remapped as the file grows.'''
+        self.flush()
+        if self._mapped != self._written:
+            # Views handed out earlier keep the previous map alive
+            with open(self.path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), self._written * self.RECORD.size,
+                                       access=mmap.ACCESS_READ)
+            self._records = memoryview(self._mmap).cast('q')
+            self._mapped = self._written
+
+        return self._records
+
+    def __getitem__(self, idx: int) -> TradeRecord:
+        count = len(self)
+        if idx < 0:
+            idx += count
+        if not 0 <= idx < count:
+            raise IndexError('trade journal index out of range')
+
+        width = len(self.FIELDS)
+        return TradeRecord(self._map()[idx*width:(idx+1)*width], self.instrument)
+
+    def __iter__(self) -> Iterator[TradeRecord]:
+        if not len(self):
+            return
+
+        records, width = self._map(), len(self.FIELDS)
+        for idx in range(self._written):
+            yield TradeRecord(records[idx*width:(idx+1)*width], self.instrument)
+
+    def __len__(self) -> int:
+        return self._written + self._pending_count
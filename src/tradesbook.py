@@ -1,44 +1,191 @@
+from array import array
 from decimal import Decimal
-from datetime import datetime
-import uuid
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union, TYPE_CHECKING
+import bisect
 
+if TYPE_CHECKING:
+    from src.bars import BarBuilder
+
+from src.instrument import Instrument, InstrumentErrorMessages, DEFAULT_INSTRUMENT
 from src.order import Order, OrderSide
+from src.sequencer import Sequencer, DEFAULT_SEQUENCER
+from src.tradejournal import TradeJournal, TradeRecord
 
 
 class Trade:
     '''Single executed trade between two orders.'''
     
+    __slots__ = (
+        'id',
+        'bid_order_id',
+        'ask_order_id',
+        'side',
+        'price',
+        'volume',
+        'price_ticks',
+        'volume_lots',
+        'timestamp'
+    )
+    
     def __init__(self,
                  order_a: Order, order_b: Order,
                  aggressor_side: OrderSide,
-                 price: Decimal, volume: Decimal):
+                 price: Decimal, volume: Decimal,
+                 sequencer: Sequencer=DEFAULT_SEQUENCER,
+                 price_ticks: Optional[int]=None,
+                 volume_lots: Optional[int]=None):
         
         self.bid_order_id = order_a.id if order_a.side == OrderSide.BID else order_b.id
         self.ask_order_id = order_a.id if order_a.side == OrderSide.ASK else order_b.id
         self.side = aggressor_side
         self.price = price
         self.volume = volume
+        self.price_ticks = order_a.instrument.to_ticks(price) if price_ticks is None else price_ticks
+        self.volume_lots = order_a.instrument.to_lots(volume) if volume_lots is None else volume_lots
         
-        self.id = str(uuid.uuid4())
-        self.timestamp = datetime.now()
+        self.id = sequencer.next_id()
+        self.timestamp = sequencer.now()
     
     def __str__(self):
-        return f'#{self.id[:8]} | {datetime.fromtimestamp(timestamp)} \
-                 | {self.bid_order_id[:8]} | {self.ask_order_id[:8]} \
-                 | {self.aggressor_side} | {self.price} | {self.volume}'
+        return f'#{str(self.id)[:8]} | {self.timestamp} ' \
+               f'| {str(self.bid_order_id)[:8]} | {str(self.ask_order_id)[:8]} ' \
+               f'| {self.side.value} | {self.price} | {self.volume}'
     
 
 class TradesBook:
-    '''Collection of all executed trades with query methods.'''
+    '''Collection of all executed trades with query methods.
+    
+    With a `journal` trades are written to it instead of being kept in
+    memory, and reads return `TradeRecord` views of the journal.
+    
+    Without an `instrument` the book takes the one of its journal, and a
+    market recording into the book binds it to the market instrument. The
+    instrument is passed on to the journal.
     
-    def __init__(self):
-        self._trades = []
+    Trades are indexed as they are added: timestamps in a sorted array,
+    running sums of lots and notional (ticks * lots) for window aggregates
+    and positions of the trades of every order. Trades are expected to
+    arrive in timestamp order, as they do from a monotonic clock.
+    
+    The index lives in arrays of machine ints, so it does not grow the
+    Python heap per trade. Notional sums overflow int64 within a few trades
+    at fine tick and lot sizes, they are kept as two 64-bit words. Every
+    trade has a bid and an ask slot, each slot holds the previous slot of
+    the same order and only the last slot of every order is kept in a dict.
+    '''
+    
+    def __init__(self,
+                 journal: Optional[TradeJournal]=None,
+                 instrument: Optional[Instrument]=None):
+        self.journal = journal
+        self._instrument = instrument # given explicitly
+        if instrument is not None:
+            self.instrument = instrument
+            if journal is not None:
+                journal.bind(instrument)
+        else:
+            self.instrument = DEFAULT_INSTRUMENT if journal is None else journal.instrument
+        self._trades = [] if journal is None else journal
+        
+        self._timestamps = array('q')
+        self._cum_lots = array('q', [0])
+        self._cum_notional_high = array('q', [0]) # notional // 2**64
+        self._cum_notional_low = array('Q', [0]) # notional % 2**64
+        self._prev_slot = array('q') # bid slot 2*idx, ask slot 2*idx+1 -> previous slot of the order
+        self._last_slot: Dict[Union[int, str], int] = {} # order id -> its last slot
+        self._bar_builders: List['BarBuilder'] = []
+        
+        for trade in self._trades:
+            self._index(trade)
+    
+    def bind(self, instrument: Instrument) -> None:
+        '''Use the instrument of the market recording into the book, unless
+        another one was given explicitly.'''
+        if self._instrument is not None and instrument != self._instrument:
+            raise ValueError(InstrumentErrorMessages.MISMATCH.format(instrument=instrument, other=self._instrument))
+        
+        if self.journal is not None:
+            self.journal.bind(instrument)
+        for builder in self._bar_builders:
+            builder.bind(instrument)
+        self.instrument = instrument
     
     def add(self, trade: Trade) -> None:
         self._trades.append(trade)
+        self._index(trade)
+    
+    def add_many(self, trades: Iterable[Trade]) -> None:
+        trades = list(trades)
+        self._trades.extend(trades)
+        for trade in trades:
+            self._index(trade)
+    
+    def attach(self, builder: 'BarBuilder') -> None:
+        '''Feed every trade added from now on to a bar builder, which takes
+        the instrument of the book.'''
+        builder.bind(self.instrument)
+        self._bar_builders.append(builder)
+    
+    def between(self, start: int, end: int) -> List[Union[Trade, TradeRecord]]:
+        '''Trades with `start <= timestamp < end`.'''
+        lo, hi = self._window(start, end)
+        return [self._trades[idx] for idx in range(lo, hi)]
+    
+    def by_order(self, order_id: Union[int, str]) -> List[Union[Trade, TradeRecord]]:
+        slots, prev = [], self._prev_slot
+        slot = self._last_slot.get(order_id, -1)
+        while slot >= 0:
+            slots.append(slot)
+            slot = prev[slot]
+        
+        return [self._trades[slot >> 1] for slot in reversed(slots)]
+    
+    def last(self, n: int) -> List[Union[Trade, TradeRecord]]:
+        total = len(self._timestamps)
+        return [self._trades[idx] for idx in range(max(0, total - n), total)]
+    
+    def volume(self, start: Optional[int]=None, end: Optional[int]=None) -> Decimal:
+        lo, hi = self._window(start, end)
+        return self.instrument.to_volume(self._cum_lots[hi] - self._cum_lots[lo])
+    
+    def vwap(self, start: Optional[int]=None, end: Optional[int]=None) -> Optional[Decimal]:
+        lo, hi = self._window(start, end)
+        lots = self._cum_lots[hi] - self._cum_lots[lo]
+        if not lots:
+            return None
+        
+        high, low = self._cum_notional_high, self._cum_notional_low
+        notional = ((high[hi] - high[lo]) << 64) + low[hi] - low[lo]
+        return Decimal(notional) / lots * self.instrument.tick_size
+    
+    def _index(self, trade: Union[Trade, TradeRecord]) -> None:
+        slot = 2 * len(self._timestamps)
+        self._timestamps.append(trade.timestamp)
+        self._cum_lots.append(self._cum_lots[-1] + trade.volume_lots)
+        
+        low = self._cum_notional_low[-1] + trade.price_ticks * trade.volume_lots
+        self._cum_notional_high.append(self._cum_notional_high[-1] + (low >> 64))
+        self._cum_notional_low.append(low & 0xFFFF_FFFF_FFFF_FFFF)
+        
+        last = self._last_slot
+        self._prev_slot.append(last.get(trade.bid_order_id, -1))
+        self._prev_slot.append(last.get(trade.ask_order_id, -1))
+        last[trade.bid_order_id] = slot
+        last[trade.ask_order_id] = slot + 1
+        
+        for builder in self._bar_builders:
+            builder.add(trade)
+    
+    def _window(self, start: Optional[int], end: Optional[int]) -> Tuple[int, int]:
+        lo = 0 if start is None else bisect.bisect_left(self._timestamps, start)
+        hi = len(self._timestamps) if end is None else bisect.bisect_left(self._timestamps, end)
+        return lo, max(lo, hi)
+    
+    def __getitem__(self, idx: int) -> Union[Trade, TradeRecord]:
+        return self._trades[idx]
+    
+    def __iter__(self) -> Iterator[Union[Trade, TradeRecord]]:
+        return iter(self._trades)
     
     def __len__(self):
         return len(self._trades)
-    
-
-
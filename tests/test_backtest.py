@@ -0,0 +1,88 @@
+import pytest
+from decimal import Decimal
+
+from src.order import *
+from src.exchange import *
+from src.instrument import Instrument
+from src.backtest import *
+
+
+ORDER_FLOW = '''side,order_type,time_in_force,price,stop_price,volume
+ask,limit,GTC,101,,5
+ask,limit,GTC,102,,5
+bid,limit,GTC,99,,5
+ask,stop,GTC,98,100,2
+bid,market,IOC,,,7
+ask,limit,IOC,99,,6
+'''
+
+
+def test_backtest_csv(tmp_path):
+    path = tmp_path / 'orders.csv'
+    path.write_text(ORDER_FLOW)
+    
+    instrument = Instrument(tick_size=Decimal('0.01'), lot_size=Decimal('1'))
+    chunks = list(csv_chunks(str(path), instrument, chunk_size=4))
+    assert [len(c.side) for c in chunks] == [4, 2]
+    assert chunks[1].price_ticks == [NO_PRICE, 9900]
+    
+    exchange = Exchange(instrument)
+    report = Backtest(exchange).run(chunks)
+    
+    assert report.orders == 6
+    assert report.trades == 3
+    assert (report.filled, report.partially_filled, report.cancelled, report.resting) == (1, 1, 0, 2)
+    assert report.volume == Decimal('12')
+    assert report.vwap == exchange.tradesbook.vwap()
+    assert round(report.vwap, 2) == Decimal('100.33')
+    assert report.orders_per_second > 0
+
+
+def test_backtest_arrays():
+    columns = {
+        'side': [1, 0, 0],
+        'order_type': [0, 0, 0],
+        'time_in_force': [0, 0, 1],
+        'price_ticks': [100, 100, 101],
+        'stop_ticks': [NO_PRICE] * 3,
+        'volume_lots': [3, 1, 5],
+    }
+    
+    report = Backtest().run(array_chunks(columns, chunk_size=2))
+    
+    assert report.trades == 2
+    assert report.volume == Decimal('0.00000003')
+    assert (report.filled, report.partially_filled, report.resting) == (1, 1, 0)
+    
+    with pytest.raises(ValueError):
+        list(array_chunks({'side': []}))
+
+
+@pytest.mark.parametrize('row', [
+    (0, 0, 0, NO_PRICE, NO_PRICE, 1),
+    (0, 1, 0, NO_PRICE, NO_PRICE, 1),
+    (0, 0, 0, 100, NO_PRICE, 0),
+    (0, 2, 0, 100, NO_PRICE, 1),
+    (0, 0, 0, 100, 100, 1),
+    (2, 0, 0, 100, NO_PRICE, 1),
+])
+def test_backtest_invalid_rows(row):
+    valid = (0, 0, 0, 100, NO_PRICE, 1)
+    columns = dict(zip(COLUMNS, ([v, v, w] for v, w in zip(valid, row))))
+    
+    backtest = Backtest()
+    with pytest.raises(ValueError, match='row 2'):
+        backtest.run(array_chunks(columns, chunk_size=2))
+    assert len(backtest.exchange.limit_orderbook) == 2
+
+
+def test_backtest_npz(tmp_path):
+    numpy = pytest.importorskip('numpy')
+    
+    path = str(tmp_path / 'orders.npz')
+    numpy.savez(path, side=numpy.array([1, 0]), order_type=numpy.array([0, 0]),
+                time_in_force=numpy.array([0, 0]), price_ticks=numpy.array([100, 100]),
+                stop_ticks=numpy.full(2, NO_PRICE), volume_lots=numpy.array([1, 1]))
+    
+    report = Backtest().run(npz_chunks(path))
+    assert report.trades == 1
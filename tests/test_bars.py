@@ -0,0 +1,89 @@
+import pytest
+from decimal import Decimal
+
+from src.bars import *
+from src.order import *
+from src.orderlogger import *
+from src.sequencer import *
+from src.tradesbook import *
+
+
+logger = OrderLogger()
+
+order_bid = Order(side=OrderSide.BID, price=Decimal('10'), volume=100, logger=logger)
+order_ask = Order(side=OrderSide.ASK, price=Decimal('10'), volume=100, logger=logger)
+
+def _trades(rows):
+    timestamps = iter([t for t, _, _ in rows])
+    sequencer = Sequencer(clock=timestamps.__next__)
+    return [
+        Trade(order_ask, order_bid, OrderSide.BID, Decimal(price), Decimal(volume), sequencer)
+        for _, price, volume in rows
+    ]
+
+
+def test_time_bars():
+    tb = TradesBook()
+    builder = TimeBarBuilder(interval=60, retention=1)
+    tb.attach(builder)
+    
+    for trade in _trades([
+        (0, '10.0', '1'), (30, '12.0', '1'), (59, '9.0', '2'),
+        (60, '11.0', '1'),
+        (250, '8.0', '3'), (260, '8.5', '1'),
+    ]):
+        tb.add(trade)
+    
+    bars = builder.bars()
+    
+    assert [b.start for b in bars] == [60, 240]
+    assert builder.current == bars[-1]
+    assert bars[-1] == Bar(start=240, open=Decimal('8'), high=Decimal('8.5'), low=Decimal('8'),
+                           close=Decimal('8.5'), volume=Decimal('4'), vwap=Decimal('8.125'), trades=2)
+
+
+def test_volume_bars():
+    builder = VolumeBarBuilder(volume=Decimal('3'))
+    
+    for trade in _trades([(1, '10.0', '1'), (2, '12.0', '1'), (3, '9.0', '2'), (4, '11.0', '1')]):
+        builder.add(trade)
+    
+    first, second = builder.bars()
+    
+    assert (first.start, first.open, first.high, first.low, first.close) == \
+           (1, Decimal('10'), Decimal('12'), Decimal('9'), Decimal('9'))
+    assert first.volume == Decimal('4')
+    assert first.vwap == Decimal('10')
+    assert second.start == 4
+    assert second.trades == 1
+
+
+def test_bars_take_tradesbook_instrument():
+    from src.exchange import Exchange
+    from src.instrument import Instrument
+    
+    btc = Instrument(tick_size=Decimal('0.5'), lot_size=Decimal('0.001'))
+    tb = TradesBook()
+    builder = VolumeBarBuilder(volume=Decimal('0.5'))
+    tb.attach(builder)
+    exchange = Exchange(btc, sequencer=Sequencer(), tradesbook=tb)
+    
+    assert builder.instrument is btc
+    assert builder.volume_lots == 500
+    
+    for side, time_in_force in ((OrderSide.ASK, OrderTIF.GTC), (OrderSide.BID, OrderTIF.IOC)):
+        exchange.push(Order(
+            side=side,
+            price=Decimal('100.5'),
+            volume=Decimal('0.25'),
+            order_type=OrderType.LIMIT,
+            time_in_force=time_in_force,
+            logger=exchange.logger,
+            instrument=btc
+        ))
+    
+    bar, = builder.bars()
+    assert (bar.open, bar.volume, bar.vwap) == (Decimal('100.5'), Decimal('0.25'), Decimal('100.5'))
+    
+    with pytest.raises(ValueError):
+        tb.attach(TimeBarBuilder(interval=60, instrument=DEFAULT_INSTRUMENT))
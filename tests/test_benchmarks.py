@@ -0,0 +1,41 @@
+import pytest
+
+from benchmarks.micro import *
+from benchmarks import scaling
+
+
+def test_micro_benchmarks(tmp_path):
+    results = run(size=100, seed=1)
+    
+    assert [r.name for r in results] == ['insert', 'cancel', 'sweep', 'stop_cascade', 'depth']
+    assert [r.ops for r in results] == [100, 100, 10, 10, 100]
+    assert all(r.p50 <= r.p90 <= r.p99 <= r.max for r in results)
+    
+    path = str(tmp_path / 'baseline.json')
+    save_baseline(results, path)
+    baseline = load_baseline(path)
+    
+    assert baseline['insert'] == results[0]
+    assert [(name, ratio, regressed) for name, ratio, regressed in compare(results, baseline)] == [
+        (r.name, 1.0, False) for r in results
+    ]
+    
+    slower = [r._replace(p50=r.p50 * 2) for r in results]
+    assert all(regressed for _, _, regressed in compare(slower, baseline))
+
+
+def test_scaling_benchmark(tmp_path):
+    rows = scaling.run(sizes=(100, 400), levels=(5,), seed=1, samples=50)
+    
+    assert [(r.orders, r.levels) for r in rows] == [(100, 5), (400, 5)]
+    assert all(r.insert_p50 <= r.insert_p99 and r.match_p50 <= r.match_p99 for r in rows)
+    assert all(r.order_bytes > 0 and r.snapshot_bytes > 0 and r.book_bytes > 0 for r in rows)
+    assert [level_count for level_count, _ in scaling.growth(rows)] == [5]
+    
+    path = str(tmp_path / 'scaling.csv')
+    scaling.write_csv(rows, path)
+    with open(path) as f:
+        lines = f.read().splitlines()
+    
+    assert lines[0] == ','.join(scaling.ScalingRow._fields)
+    assert len(lines) == 3
@@ -9,3 +9,296 @@ def test_exchange_creation():
     exchange = Exchange()
     
     assert exchange.status() is True
+
+
+def test_exchange_cancel():
+    exchange = Exchange()
+    
+    limit_order = Order(
+        side=OrderSide.BID,
+        price=Decimal('100.00'),
+        volume=Decimal('10'),
+        order_type=OrderType.LIMIT,
+        time_in_force=OrderTIF.GTC,
+        logger=exchange.logger
+    )
+    stop_order = Order(
+        side=OrderSide.ASK,
+        stop_price=Decimal('90.00'),
+        volume=Decimal('10'),
+        order_type=OrderType.STOP,
+        time_in_force=OrderTIF.GTC,
+        logger=exchange.logger
+    )
+    
+    exchange.push(limit_order)
+    exchange.push(stop_order)
+    
+    assert exchange.amend(limit_order.id, price=Decimal('101.00')) is limit_order
+    assert exchange.limit_orderbook.best_bid.price == Decimal('101.00')
+    
+    assert exchange.cancel(limit_order.id) is limit_order
+    assert exchange.cancel(stop_order.id) is stop_order
+    assert exchange.cancel(stop_order.id) is None
+    assert len(exchange.limit_orderbook) == 0
+    assert exchange.stop_orderbook.storage_len == 0
+
+
+def test_exchange_rejected_amend():
+    exchange = Exchange(Instrument(tick_size=Decimal('0.01'), lot_size=Decimal('1')))
+    
+    ask = Order(
+        side=OrderSide.ASK,
+        price=Decimal('101.00'),
+        volume=Decimal('10'),
+        order_type=OrderType.LIMIT,
+        time_in_force=OrderTIF.GTC,
+        logger=exchange.logger,
+        instrument=exchange.instrument
+    )
+    stop = Order(
+        side=OrderSide.ASK,
+        stop_price=Decimal('90.00'),
+        volume=Decimal('10'),
+        order_type=OrderType.STOP,
+        time_in_force=OrderTIF.GTC,
+        logger=exchange.logger,
+        instrument=exchange.instrument
+    )
+    exchange.push(ask)
+    exchange.push(stop)
+    exchange.push(Order(
+        side=OrderSide.BID,
+        price=Decimal('101.00'),
+        volume=Decimal('4'),
+        order_type=OrderType.LIMIT,
+        time_in_force=OrderTIF.IOC,
+        logger=exchange.logger,
+        instrument=exchange.instrument
+    ))
+    
+    with pytest.raises(ValueError):
+        exchange.amend(ask.id, volume=Decimal('3'), price=Decimal('102.00'))
+    with pytest.raises(ValueError):
+        exchange.amend(ask.id, price=Decimal('102.001'))
+    with pytest.raises(ValueError):
+        exchange.amend(stop.id, stop_price=Decimal('89.001'))
+    
+    assert (ask.price, ask.volume, ask.status) == (Decimal('101.00'), Decimal('10'), OrderStatus.PARTIALLY_FILLED)
+    assert exchange.limit_orderbook.best_ask is ask
+    assert stop.stop_price == Decimal('90.00')
+    assert exchange.stop_orderbook.storage_len == 1
+    assert exchange.cancel(ask.id) is ask
+    assert exchange.cancel(stop.id) is stop
+
+def _stop_cascade_exchange(max_cascade_depth):
+    exchange = Exchange(max_cascade_depth=max_cascade_depth)
+    
+    for price in ['100.00', '99.00', '98.00']:
+        exchange.push(
+            Order(
+                side=OrderSide.BID,
+                price=Decimal(price),
+                volume=Decimal('10'),
+                order_type=OrderType.LIMIT,
+                time_in_force=OrderTIF.GTC,
+                logger=exchange.logger
+            )
+        )
+    
+    for stop_price, price in [('100.00', '99.00'), ('99.00', '98.00')]:
+        exchange.push(
+            Order(
+                side=OrderSide.ASK,
+                stop_price=Decimal(stop_price),
+                price=Decimal(price),
+                volume=Decimal('10'),
+                order_type=OrderType.STOP,
+                time_in_force=OrderTIF.GTC,
+                logger=exchange.logger
+            )
+        )
+    
+    return exchange
+
+
+def test_exchange_stop_cascade():
+    exchange = _stop_cascade_exchange(max_cascade_depth=100)
+    
+    trades = exchange.push(
+        Order(
+            side=OrderSide.ASK,
+            price=Decimal('100.00'),
+            volume=Decimal('10'),
+            order_type=OrderType.LIMIT,
+            time_in_force=OrderTIF.GTC,
+            logger=exchange.logger
+        )
+    )
+    
+    assert [t.price for t in trades] == [Decimal('100.00'), Decimal('99.00'), Decimal('98.00')]
+    assert len(exchange.tradesbook) == 3
+    assert exchange.stops_fired == 2
+    assert exchange.last_price == Decimal('98.00')
+    assert exchange.stop_orderbook.storage_len == 0
+    assert len(exchange.limit_orderbook) == 0
+
+
+def test_exchange_stop_cascade_depth_limit():
+    exchange = _stop_cascade_exchange(max_cascade_depth=1)
+    
+    trades = exchange.push(
+        Order(
+            side=OrderSide.ASK,
+            price=Decimal('100.00'),
+            volume=Decimal('10'),
+            order_type=OrderType.LIMIT,
+            time_in_force=OrderTIF.GTC,
+            logger=exchange.logger
+        )
+    )
+    
+    assert len(trades) == 2
+    assert exchange.stops_fired == 1
+    assert exchange.last_price == Decimal('99.00')
+    assert exchange.stop_orderbook.storage_len == 1
+
+
+def test_exchange_stop_activation_over_sweep():
+    exchange = Exchange()
+    
+    for price in ['100.00', '99.00']:
+        exchange.push(
+            Order(
+                side=OrderSide.BID,
+                price=Decimal(price),
+                volume=Decimal('10'),
+                order_type=OrderType.LIMIT,
+                time_in_force=OrderTIF.GTC,
+                logger=exchange.logger
+            )
+        )
+    
+    # Reached only by the first fill of the sweep
+    stop_buy = Order(
+        side=OrderSide.BID,
+        stop_price=Decimal('100.00'),
+        price=Decimal('90.00'),
+        volume=Decimal('10'),
+        order_type=OrderType.STOP,
+        time_in_force=OrderTIF.GTC,
+        logger=exchange.logger
+    )
+    exchange.push(stop_buy)
+    
+    exchange.push(
+        Order(
+            side=OrderSide.ASK,
+            price=Decimal('99.00'),
+            volume=Decimal('20'),
+            order_type=OrderType.LIMIT,
+            time_in_force=OrderTIF.GTC,
+            logger=exchange.logger
+        )
+    )
+    
+    assert exchange.stops_fired == 1
+    assert exchange.limit_orderbook.best_bid is stop_buy
+
+
+def test_exchange_push_many():
+    exchange = Exchange()
+    
+    orders = [
+        Order(
+            side=side,
+            price=Decimal(price),
+            volume=Decimal(volume),
+            order_type=OrderType.LIMIT,
+            time_in_force=OrderTIF.GTC,
+            logger=exchange.logger
+        ) for side, price, volume in [
+            (OrderSide.ASK, '100.00', '10'),
+            (OrderSide.ASK, '101.00', '10'),
+            (OrderSide.BID, '101.00', '15'),
+            (OrderSide.BID, '99.00', '5'),
+        ]
+    ]
+    orders.insert(1, Order(
+        side=OrderSide.BID,
+        stop_price=Decimal('101.00'),
+        price=Decimal('99.00'),
+        volume=Decimal('10'),
+        order_type=OrderType.STOP,
+        time_in_force=OrderTIF.GTC,
+        logger=exchange.logger
+    ))
+    
+    results = exchange.push_many(orders)
+    
+    assert [r.order_id for r in results] == [o.id for o in orders]
+    assert [r.status for r in results] == [
+        OrderStatus.NEW, OrderStatus.NEW, OrderStatus.NEW,
+        OrderStatus.FILLED, OrderStatus.NEW
+    ]
+    assert results[3].executed_volume == Decimal('15')
+    assert results[3].trades == 2
+    assert len(exchange.tradesbook) == 2
+    assert exchange.stops_fired == 1
+    assert exchange.limit_orderbook.get_bid_levels() == [(Decimal('99.00'), Decimal('15'))]
+
+
+def test_exchange_symbols():
+    from concurrent.futures import ThreadPoolExecutor
+    
+    exchange = Exchange()
+    btc = Instrument(tick_size=Decimal('0.01'), lot_size=Decimal('0.001'))
+    
+    def order(symbol, side, price):
+        return Order(
+            side=side,
+            price=Decimal(price),
+            volume=Decimal('1'),
+            order_type=OrderType.LIMIT,
+            time_in_force=OrderTIF.GTC,
+            logger=exchange.logger,
+            instrument=btc if symbol == 'BTC' else DEFAULT_INSTRUMENT,
+            symbol=symbol
+        )
+    
+    orders = [
+        order('BTC', OrderSide.ASK, '100.00'),
+        order('ETH', OrderSide.ASK, '10'),
+        order('ETH', OrderSide.BID, '10'),
+        order('BTC', OrderSide.BID, '99.00'),
+    ]
+    
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = exchange.push_many(orders, executor=executor)
+    
+    assert [r.order_id for r in results] == [o.id for o in orders]
+    assert [r.trades for r in results] == [0, 0, 1, 0]
+    
+    assert set(exchange.markets) == {'', 'BTC', 'ETH'}
+    assert exchange.market('BTC').instrument is btc
+    assert exchange.market('BTC').limit_orderbook.spread == Decimal('1')
+    assert len(exchange.market('ETH').tradesbook) == 1
+    assert len(exchange.tradesbook) == 0
+    
+    assert orders[0].id in exchange
+    assert orders[1].id not in exchange and orders[2].id not in exchange
+    assert exchange.cancel(orders[0].id, symbol='ETH') is None
+    assert exchange.cancel(orders[0].id) is orders[0]
+    assert orders[0].id not in exchange
+    assert exchange.amend(orders[3].id, volume=Decimal('0.5')) is orders[3]
+    
+    with pytest.raises(ValueError):
+        exchange.push(Order(
+            side=OrderSide.ASK,
+            price=Decimal('100'),
+            volume=Decimal('1'),
+            order_type=OrderType.LIMIT,
+            time_in_force=OrderTIF.GTC,
+            logger=exchange.logger,
+            symbol='BTC'
+        ))
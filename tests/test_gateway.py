@@ -0,0 +1,91 @@
+import asyncio
+import pytest
+from decimal import Decimal
+
+from src.order import *
+from src.exchange import *
+from src.gateway import *
+
+
+def test_gateway_reports():
+    exchange = Exchange()
+    
+    def order(side, volume):
+        return Order(
+            side=side,
+            price=Decimal('100'),
+            volume=Decimal(volume),
+            order_type=OrderType.LIMIT,
+            time_in_force=OrderTIF.GTC,
+            logger=exchange.logger
+        )
+    
+    async def run():
+        gateway = Gateway(exchange, maxsize=2, batch_size=4)
+        gateway.start()
+        
+        asks = [order(OrderSide.ASK, '1') for _ in range(5)]
+        bid = order(OrderSide.BID, '3')
+        
+        seller = gateway.connect('seller')
+        await asyncio.gather(*(gateway.submit('seller', o) for o in asks))
+        await gateway.submit('buyer', bid)
+        await gateway.stop()
+        
+        acks = [seller.get_nowait() for _ in range(5)]
+        fills = [seller.get_nowait() for _ in range(3)]
+        buyer = gateway.connect('buyer').get_nowait()
+        
+        return gateway, asks, bid, acks, fills, buyer
+    
+    gateway, asks, bid, acks, fills, buyer = asyncio.run(run())
+    
+    assert [r.order_id for r in acks] == [o.id for o in asks]
+    assert all(r.status == OrderStatus.NEW and r.latency >= 0 for r in acks)
+    
+    assert [r.order_id for r in fills] == [o.id for o in asks[:3]]
+    assert all(r.status == OrderStatus.FILLED and r.latency is None for r in fills)
+    
+    assert buyer.order_id == bid.id
+    assert buyer.status == OrderStatus.FILLED
+    assert len(buyer.trades) == 3
+    
+    assert len(gateway.latencies) == 6
+    assert gateway.latency_percentile(50) <= gateway.latency_percentile(99)
+
+
+def test_gateway_rejects():
+    from src.instrument import Instrument
+    
+    exchange = Exchange()
+    
+    def order(time_in_force, instrument=DEFAULT_INSTRUMENT):
+        return Order(
+            side=OrderSide.BID,
+            price=Decimal('100'),
+            volume=Decimal('1'),
+            order_type=OrderType.LIMIT,
+            time_in_force=time_in_force,
+            logger=exchange.logger,
+            instrument=instrument
+        )
+    
+    async def run():
+        gateway = Gateway(exchange)
+        gateway.start()
+        
+        bad = order(OrderTIF.GTC, Instrument(tick_size=Decimal('0.5'), lot_size=Decimal('1')))
+        ioc = order(OrderTIF.IOC)
+        await gateway.submit('client', bad)
+        await gateway.submit('client', ioc)
+        await asyncio.wait_for(gateway.stop(), timeout=5)
+        
+        reports = gateway.connect('client')
+        return gateway, bad, ioc, [reports.get_nowait() for _ in range(2)]
+    
+    gateway, bad, ioc, reports = asyncio.run(run())
+    
+    assert reports[0].order_id == bad.id
+    assert isinstance(reports[0].error, ValueError)
+    assert (reports[1].order_id, reports[1].error) == (ioc.id, None)
+    assert gateway._resting == {}
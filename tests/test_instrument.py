@@ -0,0 +1,106 @@
+import pytest
+from decimal import Decimal
+
+from src.instrument import *
+from src.order import *
+from src.orderbook.limit_orderbook import *
+from src.orderlogger import *
+
+
+logger = OrderLogger()
+
+def test_conversions():
+    instrument = Instrument(tick_size=Decimal('0.05'), lot_size=Decimal('10'))
+    
+    assert instrument.to_ticks(Decimal('100.15')) == 2003
+    assert instrument.to_ticks(10.5) == 210
+    assert instrument.to_ticks(None) is None
+    assert instrument.to_lots(150) == 15
+    
+    assert instrument.to_price(2003) == Decimal('100.15')
+    assert instrument.to_volume(15) == Decimal('150')
+    assert str(DEFAULT_INSTRUMENT.to_volume(3000000000)) == '30'
+    
+    with pytest.raises(ValueError, match=InstrumentErrorMessages.PRICE_OFF_TICK.format(value='100.12', size='0.05')):
+        instrument.to_ticks(Decimal('100.12'))
+    
+    with pytest.raises(ValueError, match=InstrumentErrorMessages.VOLUME_OFF_LOT.format(value=15, size=10)):
+        instrument.to_lots(15)
+
+
+def test_order_in_ticks():
+    instrument = Instrument(tick_size=Decimal('0.01'), lot_size=Decimal('1'))
+    
+    order = Order(
+        side=OrderSide.BID,
+        price=Decimal('100.50'),
+        stop_price=Decimal('101.00'),
+        volume=Decimal('100'),
+        order_type=OrderType.STOP,
+        logger=logger,
+        instrument=instrument
+    )
+    
+    assert order.price_ticks == 10050
+    assert order.stop_ticks == 10100
+    assert order.volume_lots == 100
+    
+    order.execute(volume=Decimal('40'), price=Decimal('100.50'))
+    
+    assert order.executed_lots == 40
+    assert order.remaining_lots == 60
+    assert order.remaining_volume == Decimal('60')
+    
+    with pytest.raises(ValueError, match=InstrumentErrorMessages.PRICE_OFF_TICK.format(value='100.505', size='0.01')):
+        Order(side=OrderSide.BID, price=Decimal('100.505'), volume=100, logger=logger, instrument=instrument)
+
+
+def test_orderbook_in_ticks():
+    instrument = Instrument(tick_size=Decimal('0.5'), lot_size=Decimal('0.1'))
+    ob = LimitOrderBook(instrument)
+    
+    for price, volume in [(Decimal('100.5'), Decimal('1.5')), (Decimal('101'), Decimal('2.5'))]:
+        ob.add(
+            Order(
+                side=OrderSide.ASK,
+                price=price,
+                volume=volume,
+                order_type=OrderType.LIMIT,
+                time_in_force=OrderTIF.GTC,
+                logger=logger,
+                instrument=instrument
+            )
+        )
+    
+    ob.add(
+        Order(
+            side=OrderSide.BID,
+            price=Decimal('99.5'),
+            volume=Decimal('0.7'),
+            order_type=OrderType.LIMIT,
+            time_in_force=OrderTIF.GTC,
+            logger=logger,
+            instrument=instrument
+        )
+    )
+    
+    assert ob.spread == Decimal('1')
+    
+    trades = ob.add(
+        Order(
+            side=OrderSide.BID,
+            price=Decimal('101'),
+            volume=Decimal('2'),
+            order_type=OrderType.LIMIT,
+            time_in_force=OrderTIF.IOC,
+            logger=logger,
+            instrument=instrument
+        )
+    )
+    
+    assert [(t.price, t.volume) for t in trades] == [
+        (Decimal('100.5'), Decimal('1.5')),
+        (Decimal('101'), Decimal('0.5'))
+    ]
+    assert ob.get_ask_levels() == [(Decimal('101'), Decimal('2'))]
+    assert ob.asks.volume == Decimal('2')
@@ -403,4 +403,228 @@ def test_clear_LimitOrderBook():
     ob.clear()
     assert len(ob) == 0
     
-    
\ No newline at end of file
+    
+
+def test_time_priority_within_level():
+    ob = LimitOrderBook()
+    
+    first, second, third = [
+        Order(
+            side=OrderSide.ASK,
+            price=Decimal('100.00'),
+            volume=Decimal(10),
+            order_type=OrderType.LIMIT,
+            time_in_force=OrderTIF.GTC,
+            logger=logger
+        ) for _ in range(3)
+    ]
+    
+    better = Order(
+        side=OrderSide.ASK,
+        price=Decimal('99.00'),
+        volume=Decimal(10),
+        order_type=OrderType.LIMIT,
+        time_in_force=OrderTIF.GTC,
+        logger=logger
+    )
+    
+    for o in [first, second, third, better]:
+        ob.add(o)
+    
+    assert ob.best_ask is better
+    assert list(reversed(ob.asks)) == [better, first, second, third]
+    
+    ob.add(
+        Order(
+            side=OrderSide.BID,
+            price=Decimal('100.00'),
+            volume=Decimal(25),
+            order_type=OrderType.LIMIT,
+            time_in_force=OrderTIF.GTC,
+            logger=logger
+        )
+    )
+    
+    assert len(ob) == 2
+    assert first.status == OrderStatus.FILLED
+    assert second.status == OrderStatus.PARTIALLY_FILLED
+    assert ob.best_ask is second
+    assert third.remaining_volume == Decimal(10)
+
+
+def test_cancel_and_amend():
+    ob = LimitOrderBook()
+    
+    first, second, third = [
+        Order(
+            side=OrderSide.BID,
+            price=Decimal('100.00'),
+            volume=Decimal(10),
+            order_type=OrderType.LIMIT,
+            time_in_force=OrderTIF.GTC,
+            logger=logger
+        ) for _ in range(3)
+    ]
+    
+    for o in [first, second, third]:
+        ob.add(o)
+    
+    assert ob.cancel(second.id) is second
+    assert second.status == OrderStatus.CANCELLED
+    assert second.id not in ob
+    assert ob.cancel(second.id) is None
+    assert list(reversed(ob.bids)) == [first, third]
+    
+    # Decreasing volume keeps time priority
+    assert ob.amend(first.id, volume=Decimal(5)) == []
+    assert ob.best_bid is first
+    assert first.remaining_volume == Decimal(5)
+    
+    # Increasing volume sends the order to the back of the level
+    ob.amend(first.id, volume=Decimal(20))
+    assert list(reversed(ob.bids)) == [third, first]
+    
+    # New price may cross the book
+    ob.add(
+        Order(
+            side=OrderSide.ASK,
+            price=Decimal('105.00'),
+            volume=Decimal(15),
+            order_type=OrderType.LIMIT,
+            time_in_force=OrderTIF.GTC,
+            logger=logger
+        )
+    )
+    trades = ob.amend(third.id, price=Decimal('105.00'))
+    
+    assert len(trades) == 1
+    assert third.status == OrderStatus.FILLED
+    assert ob.best_ask.remaining_volume == Decimal(5)
+    assert ob.best_bid is first
+    assert len(ob) == 2
+    
+    with pytest.raises(ValueError, match=OrderErrorMessages.CANNOT_AMEND.format(status='filled')):
+        third.amend(volume=Decimal(30))
+
+
+def test_market_depth():
+    ob = LimitOrderBook()
+    
+    orders = [
+        (Decimal('100.00'), Decimal(5)),
+        (Decimal('105.00'), Decimal(10)),
+        (Decimal('100.00'), Decimal(20)),
+        (Decimal('110.00'), Decimal(30)),
+        (Decimal('100.00'), Decimal(50)),
+    ]
+    
+    asks = []
+    for price, volume in orders:
+        asks.append(
+            Order(
+                side=OrderSide.ASK,
+                price=price,
+                volume=volume,
+                order_type=OrderType.LIMIT,
+                time_in_force=OrderTIF.GTC,
+                logger=logger
+            )
+        )
+        ob.add(asks[-1])
+    
+    assert ob.get_ask_levels(2) == [(Decimal('100.00'), Decimal(75)), (Decimal('105.00'), Decimal(10))]
+    assert ob.get_ask_levels(orders_count=True) == [
+        (Decimal('100.00'), Decimal(75), 3),
+        (Decimal('105.00'), Decimal(10), 1),
+        (Decimal('110.00'), Decimal(30), 1),
+    ]
+    assert ob.get_bid_levels() == []
+    
+    ob.add(
+        Order(
+            side=OrderSide.BID,
+            price=Decimal('100.00'),
+            volume=Decimal(15),
+            order_type=OrderType.LIMIT,
+            time_in_force=OrderTIF.IOC,
+            logger=logger
+        )
+    )
+    assert ob.get_ask_levels(1, orders_count=True) == [(Decimal('100.00'), Decimal(60), 2)]
+    
+    ob.cancel(asks[4].id)
+    ob.amend(asks[2].id, volume=Decimal(12))
+    assert ob.get_ask_levels(1, orders_count=True) == [(Decimal('100.00'), Decimal(2), 1)]
+    
+    ob.cancel(asks[2].id)
+    assert ob.get_ask_levels(1) == [(Decimal('105.00'), Decimal(10))]
+
+
+def test_side_volume():
+    ob = LimitOrderBook()
+    
+    for price, volume in [(Decimal('100.00'), Decimal(30)), (Decimal('105.00'), Decimal(20))]:
+        ob.add(
+            Order(
+                side=OrderSide.ASK,
+                price=price,
+                volume=volume,
+                order_type=OrderType.LIMIT,
+                time_in_force=OrderTIF.GTC,
+                logger=logger
+            )
+        )
+    
+    assert ob.asks.volume == Decimal(50)
+    assert ob.bids.volume == 0
+    
+    ob.add(
+        Order(
+            side=OrderSide.BID,
+            volume=Decimal(20),
+            order_type=OrderType.MARKET,
+            time_in_force=OrderTIF.IOC,
+            logger=logger
+        )
+    )
+    assert ob.asks.volume == Decimal(30)
+    
+    # FOK sees only the remaining volume of partially filled orders
+    fok = Order(
+        side=OrderSide.BID,
+        price=Decimal('100.00'),
+        volume=Decimal(15),
+        order_type=OrderType.LIMIT,
+        time_in_force=OrderTIF.FOK,
+        logger=logger
+    )
+    ob.add(fok)
+    
+    assert fok.status == OrderStatus.CANCELLED
+    assert ob.asks.volume == Decimal(30)
+    
+    ob.clear()
+    assert ob.asks.volume == 0
+
+
+def test_add_many():
+    ob = LimitOrderBook()
+    
+    orders = [
+        Order(
+            side=side,
+            price=Decimal('100.00'),
+            volume=Decimal(volume),
+            order_type=OrderType.LIMIT,
+            time_in_force=OrderTIF.GTC,
+            logger=logger
+        ) for side, volume in [(OrderSide.ASK, 10), (OrderSide.ASK, 10), (OrderSide.BID, 15)]
+    ]
+    
+    trades, results = ob.add_many(orders)
+    
+    assert len(trades) == 2
+    assert [(r.status, r.trades) for r in results] == [
+        (OrderStatus.NEW, 0), (OrderStatus.NEW, 0), (OrderStatus.FILLED, 2)
+    ]
+    assert ob.best_ask.remaining_volume == Decimal(5)
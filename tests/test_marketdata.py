@@ -0,0 +1,170 @@
+import pytest
+from decimal import Decimal
+
+from src.order import *
+from src.instrument import Instrument
+from src.marketdata import *
+from src.orderbook.limit_orderbook import *
+from src.orderlogger import *
+
+
+logger = OrderLogger()
+instrument = Instrument(tick_size=Decimal('1'), lot_size=Decimal('1'))
+
+
+def _order(side, price, volume, time_in_force=OrderTIF.GTC):
+    return Order(
+        side=side,
+        price=Decimal(price),
+        volume=Decimal(volume),
+        order_type=OrderType.LIMIT,
+        time_in_force=time_in_force,
+        logger=logger,
+        instrument=instrument
+    )
+
+
+def _levels(ob):
+    return (
+        [(int(p), int(v)) for p, v in ob.get_bid_levels(depth=100)],
+        [(int(p), int(v)) for p, v in ob.get_ask_levels(depth=100)]
+    )
+
+
+def test_l2_feed_deltas():
+    ob = LimitOrderBook(instrument)
+    ob.add(_order(OrderSide.ASK, '101', '5'))
+    ob.add(_order(OrderSide.BID, '99', '5'))
+    
+    deltas = []
+    seq = ob.subscribe(deltas.append)
+    
+    book = L2Book(seq)
+    bids, asks = _levels(ob)
+    book.bids.update(bids)
+    book.asks.update(asks)
+    
+    ob.add(_order(OrderSide.ASK, '101', '3'))
+    ob.add(_order(OrderSide.ASK, '102', '4'))
+    resting = _order(OrderSide.BID, '98', '2')
+    ob.add(resting)
+    ob.add(_order(OrderSide.BID, '101', '6', OrderTIF.IOC))
+    ob.amend(resting.id, volume=Decimal('1'))
+    ob.cancel(resting.id)
+    
+    assert [(d.side, d.price_ticks, d.volume_lots) for d in deltas] == [
+        (OrderSide.ASK, 101, 8),
+        (OrderSide.ASK, 102, 4),
+        (OrderSide.BID, 98, 2),
+        (OrderSide.ASK, 101, 3),
+        (OrderSide.ASK, 101, 2),
+        (OrderSide.BID, 98, 1),
+        (OrderSide.BID, 98, 0),
+    ]
+    assert [d.seq for d in deltas] == list(range(1, 8))
+    
+    for delta in deltas:
+        book.apply(delta)
+    
+    assert (book.bid_levels(100), book.ask_levels(100)) == _levels(ob)
+
+
+def test_l3_events():
+    ob = LimitOrderBook(instrument)
+    events = ob.record_events(L3EventBuffer(capacity=8))
+    
+    first = _order(OrderSide.ASK, '101', '5')
+    second = _order(OrderSide.ASK, '101', '3')
+    ob.add(first)
+    ob.add(second)
+    ob.add(_order(OrderSide.BID, '101', '6', OrderTIF.IOC))
+    ob.amend(second.id, volume=Decimal('2'))
+    bid = _order(OrderSide.BID, '99', '4')
+    ob.add(bid)
+    ob.cancel(bid.id)
+    
+    assert [(e.kind, e.order_id, e.lots) for e in (events[seq] for seq in range(events.seq))] == [
+        (L3EventKind.ADD, first.id, 5),
+        (L3EventKind.ADD, second.id, 3),
+        (L3EventKind.DONE, first.id, 5),
+        (L3EventKind.FILL, second.id, 1),
+        (L3EventKind.REDUCE, second.id, 1),
+        (L3EventKind.ADD, bid.id, 4),
+        (L3EventKind.REMOVE, bid.id, 4),
+    ]
+    
+    runs = events.read(5)
+    assert [(seq, list(columns['order_id'])) for seq, columns in runs] == [(5, [bid.id, bid.id])]
+    
+    for _ in range(3):
+        ob.add(_order(OrderSide.BID, '98', '1'))
+    
+    runs = events.read(5)
+    assert [(seq, len(columns['kind'])) for seq, columns in runs] == [(5, 3), (8, 2)]
+    assert runs[1][1]['price'][0] == 98
+    
+    with pytest.raises(IndexError):
+        events.read(1)
+
+
+def test_bbo_notifications():
+    ob = LimitOrderBook(instrument)
+    updates = []
+    ob.subscribe_bbo(updates.append)
+    
+    assert ob.bbo == BBO(None, Decimal('0'), 0, None, Decimal('0'), 0)
+    
+    ask = _order(OrderSide.ASK, '101', '5')
+    ob.add(ask)
+    ob.add(_order(OrderSide.ASK, '102', '5'))
+    ob.add(_order(OrderSide.BID, '99', '2'))
+    ob.add(_order(OrderSide.BID, '98', '2'))
+    ob.add(_order(OrderSide.ASK, '101', '1'))
+    ob.add(_order(OrderSide.BID, '101', '6', OrderTIF.IOC))
+    
+    assert updates == [
+        BBO(None, Decimal('0'), 0, Decimal('101'), Decimal('5'), 1),
+        BBO(Decimal('99'), Decimal('2'), 1, Decimal('101'), Decimal('5'), 1),
+        BBO(Decimal('99'), Decimal('2'), 1, Decimal('101'), Decimal('6'), 2),
+        BBO(Decimal('99'), Decimal('2'), 1, Decimal('102'), Decimal('5'), 1),
+    ]
+    assert ob.spread == Decimal('3')
+    
+    ob.cancel(ob.best_bid.id)
+    assert updates[-1] == BBO(Decimal('98'), Decimal('2'), 1, Decimal('102'), Decimal('5'), 1)
+    assert ob.bbo is updates[-1]
+    assert len(updates) == 5
+
+
+def test_bbo_once_per_stop_cascade():
+    from src.exchange import Exchange
+    
+    exchange = Exchange(instrument)
+    ob = exchange.limit_orderbook
+    updates = []
+    ob.subscribe_bbo(updates.append)
+    
+    for price, volume in (('100', '1'), ('101', '1'), ('102', '5')):
+        exchange.push(_order(OrderSide.ASK, price, volume))
+    for stop_price, price in (('100', '101'), ('101', '102')):
+        exchange.push(Order(
+            side=OrderSide.BID,
+            price=Decimal(price),
+            volume=Decimal('1'),
+            order_type=OrderType.STOP,
+            stop_price=Decimal(stop_price),
+            time_in_force=OrderTIF.GTC,
+            logger=logger,
+            instrument=instrument
+        ))
+    del updates[:]
+    
+    exchange.push(_order(OrderSide.BID, '100', '1', OrderTIF.IOC))
+    
+    assert exchange.stops_fired == 2
+    assert len(exchange.tradesbook) == 3
+    assert updates == [BBO(None, Decimal('0'), 0, Decimal('102'), Decimal('4'), 1)]
+    
+    exchange.cancel(ob.best_ask.id)
+    assert updates[-1] == BBO(None, Decimal('0'), 0, None, Decimal('0'), 0)
+    assert len(updates) == 2
@@ -32,7 +32,7 @@ def test_order_creation_limit():
     assert order.time_in_force == OrderTIF.GTC
     assert order.remaining_volume == 100
     assert order.id is not None
-    assert isinstance(order.timestamp, datetime)
+    assert isinstance(order.timestamp, int)
 
 
 def test_order_creation_market():
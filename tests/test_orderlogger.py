@@ -0,0 +1,120 @@
+import pytest
+from decimal import Decimal
+
+from src.order import *
+from src.orderlogger import *
+from src.exchange import *
+from src.sequencer import *
+
+
+def test_order_logger():
+    logger = OrderLogger()
+    
+    order = Order(side=OrderSide.BID, price=Decimal('100.00'), volume=100, logger=logger)
+    order.execute(volume=30, price=Decimal('100.00'))
+    
+    snapshots = logger.show_by_id(order.id)
+    
+    assert [s.status for s in snapshots] == ['new', 'partially_filled']
+    assert snapshots[-1].remaining_volume == Decimal(70)
+
+
+def test_columnar_order_logger():
+    logger = ColumnarOrderLogger(capacity=8, sequencer=Sequencer())
+    exchange = Exchange(logger=logger, sequencer=logger.sequencer)
+    
+    ask = Order(
+        side=OrderSide.ASK,
+        price=Decimal('100.50'),
+        volume=Decimal('10'),
+        order_type=OrderType.LIMIT,
+        time_in_force=OrderTIF.GTC,
+        logger=logger
+    )
+    bid = Order(
+        side=OrderSide.BID,
+        volume=Decimal('4'),
+        order_type=OrderType.MARKET,
+        time_in_force=OrderTIF.IOC,
+        logger=logger
+    )
+    exchange.push(ask)
+    exchange.push(bid)
+    
+    snapshots = logger.show_by_id(ask.id)
+    
+    assert len(logger) == 4
+    assert [s.status for s in snapshots] == ['new', 'partially_filled']
+    assert snapshots[0].side == 'ask'
+    assert snapshots[0].tif == 'GTC'
+    assert snapshots[0].price == Decimal('100.50')
+    assert snapshots[0].stop_price is None
+    assert snapshots[1].executed_volume == Decimal('4')
+    assert snapshots[1].remaining_volume == Decimal('6')
+    assert logger.show_by_id(bid.id)[-1].price is None
+    assert set(logger.show()) == {ask.id, bid.id}
+
+
+def test_columnar_order_logger_retention():
+    chunks = []
+    logger = ColumnarOrderLogger(capacity=4, sink=chunks.append, sequencer=Sequencer())
+    
+    orders = [Order(side=OrderSide.BID, price=100, volume=10, logger=logger) for _ in range(3)]
+    for o in orders:
+        o.cancel()
+    
+    assert len(logger) == 4
+    assert len(chunks) == 1
+    assert list(chunks[0]['order_id']) == [1, 2, 3, 1]
+    assert list(chunks[0]['status']) == [0, 0, 0, 3]
+    
+    # Only the latest rows are kept
+    assert [s.status for s in logger.show_by_id(orders[0].id)] == ['cancelled']
+    assert [s.status for s in logger.show_by_id(orders[2].id)] == ['new', 'cancelled']
+    
+    logger.flush()
+    assert len(chunks) == 2
+    assert list(chunks[1]['order_id']) == [2, 3]
+    
+    logger.flush()
+    assert len(chunks) == 2
+    
+    # Evicting the latest row of an order drops it from the index
+    for _ in range(4):
+        Order(side=OrderSide.BID, price=100, volume=10, logger=logger)
+    
+    assert logger.show_by_id(orders[2].id) == []
+    assert orders[2].id not in logger._index
+
+
+def test_columnar_order_logger_instruments():
+    from concurrent.futures import ThreadPoolExecutor
+    from src.instrument import Instrument
+    
+    logger = ColumnarOrderLogger(capacity=1024, sequencer=Sequencer())
+    exchange = Exchange(logger=logger, sequencer=logger.sequencer)
+    btc = Instrument(tick_size=Decimal('0.5'), lot_size=Decimal('0.001'))
+    
+    def order(symbol, instrument):
+        return Order(
+            side=OrderSide.BID,
+            price=Decimal('100.5'),
+            volume=Decimal('0.25') if instrument is btc else Decimal('2'),
+            order_type=OrderType.LIMIT,
+            time_in_force=OrderTIF.GTC,
+            logger=logger,
+            instrument=instrument,
+            symbol=symbol
+        )
+    
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        orders = list(executor.map(
+            lambda i: order('BTC', btc) if i % 2 else order('ETH', DEFAULT_INSTRUMENT), range(200)
+        ))
+    exchange.push_many(orders)
+    
+    assert len(logger) == 200
+    assert sorted(logger.show()) == sorted(o.id for o in orders)
+    assert logger.show_by_id(orders[1].id)[0].volume == Decimal('0.25')
+    assert logger.show_by_id(orders[1].id)[0].price == Decimal('100.5')
+    assert logger.show_by_id(orders[0].id)[0].volume == Decimal('2')
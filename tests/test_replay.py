@@ -0,0 +1,159 @@
+import pytest
+from decimal import Decimal
+
+from src.order import *
+from src.exchange import *
+from src.orderlogger import OrderLogger
+from src.replay import *
+from src.sequencer import Sequencer
+
+
+def _journaled_exchange(journal, record=True):
+    return Exchange(
+        sequencer=Sequencer(clock=journal.now),
+        logger=OrderLogger(Sequencer()),
+        journal=journal if record else None
+    )
+
+
+def _trades(exchange):
+    return [(t.id, t.timestamp, t.bid_order_id, t.ask_order_id, t.side, t.price, t.volume)
+            for t in exchange.tradesbook]
+
+
+def test_replay_reproduces_trades(tmp_path):
+    path = str(tmp_path / 'commands.bin')
+    journal = CommandJournal(path)
+    exchange = _journaled_exchange(journal)
+    
+    def order(side, price, volume, **kwargs):
+        return Order(
+            side=side,
+            price=None if price is None else Decimal(price),
+            volume=Decimal(volume),
+            logger=exchange.logger,
+            **kwargs
+        )
+    
+    exchange.push_many([
+        order(OrderSide.ASK, '101', '5'),
+        order(OrderSide.ASK, '102', '5'),
+        order(OrderSide.BID, '99', '5'),
+        order(OrderSide.ASK, '98', '2', stop_price=Decimal('100'), order_type=OrderType.STOP),
+    ])
+    resting = order(OrderSide.BID, '98', '3')
+    exchange.push(resting)
+    exchange.amend(resting.id, volume=Decimal('4'))
+    exchange.push(order(OrderSide.BID, None, '7', order_type=OrderType.MARKET, time_in_force=OrderTIF.IOC))
+    exchange.cancel(resting.id)
+    exchange.push(order(OrderSide.ASK, '99', '6'))
+    journal.close()
+    
+    replay_journal = CommandJournal(path)
+    replayed = _journaled_exchange(replay_journal, record=False)
+    
+    assert replay_journal.replay(replayed) == 9
+    assert len(exchange.tradesbook) == 3
+    assert exchange.stops_fired_total == 1
+    assert _trades(replayed) == _trades(exchange)
+    assert replayed.limit_orderbook.get_bid_levels() == exchange.limit_orderbook.get_bid_levels()
+    assert replayed.limit_orderbook.get_ask_levels() == exchange.limit_orderbook.get_ask_levels()
+    assert replayed.stops_fired_total == 1
+
+
+def test_journal_records_before_processing(tmp_path):
+    path = str(tmp_path / 'commands.bin')
+    journal = CommandJournal(path, sync_every=2)
+    exchange = _journaled_exchange(journal)
+    
+    def order(symbol):
+        return Order(
+            side=OrderSide.BID,
+            price=Decimal('100'),
+            volume=Decimal('1'),
+            logger=exchange.logger,
+            symbol=symbol
+        )
+    
+    exchange.push(order('BTCUSDT'))
+    
+    # Readable by another journal without closing this one
+    assert [c.symbol for c in CommandJournal(path)] == ['BTCUSDT']
+    
+    with pytest.raises(ValueError):
+        exchange.push(order('BTCUSDT.P'))
+    
+    assert len(exchange.market('BTCUSDT.P').limit_orderbook) == 0
+    assert len(list(CommandJournal(path))) == 1
+    journal.close()
+
+
+def test_journal_torn_record(tmp_path):
+    path = str(tmp_path / 'commands.bin')
+    journal = CommandJournal(path)
+    exchange = _journaled_exchange(journal)
+    
+    def order(price):
+        return Order(
+            side=OrderSide.BID,
+            price=Decimal(price),
+            volume=Decimal('1'),
+            logger=exchange.logger,
+            symbol='BTC'
+        )
+    
+    for price in ['100', '101', '102']:
+        exchange.push(order(price))
+    journal.close()
+    
+    with open(path, 'ab') as f:
+        f.write(b'PAB')
+    
+    assert len(list(CommandJournal(path))) == 3
+    replayed = _journaled_exchange(CommandJournal(path), record=False)
+    assert CommandJournal(path).replay(replayed) == 3
+    assert len(replayed.market('BTC').limit_orderbook) == 3
+    
+    journal = CommandJournal(path)
+    exchange = _journaled_exchange(journal)
+    exchange.push(order('103'))
+    journal.close()
+    
+    assert [(c.kind, c.symbol, c.price_ticks) for c in CommandJournal(path)][-2:] == [
+        (PUSH, 'BTC', exchange.instrument.to_ticks(Decimal('102'))),
+        (PUSH, 'BTC', exchange.instrument.to_ticks(Decimal('103'))),
+    ]
+
+
+def test_replay_after_parallel_push(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    
+    path = str(tmp_path / 'commands.bin')
+    journal = CommandJournal(path, sync_every=0)
+    exchange = _journaled_exchange(journal)
+    
+    def order(symbol, side, price):
+        return Order(
+            side=side,
+            price=Decimal(price),
+            volume=Decimal('1'),
+            logger=exchange.logger,
+            symbol=symbol
+        )
+    
+    symbols = ['A', 'B', 'C', 'D']
+    orders = [order(symbol, side, '100') for _ in range(200)
+              for symbol in symbols for side in (OrderSide.ASK, OrderSide.BID)]
+    with ThreadPoolExecutor(max_workers=len(symbols)) as executor:
+        exchange.push_many(orders, executor=executor)
+    journal.close()
+    
+    replay_journal = CommandJournal(path)
+    replayed = _journaled_exchange(replay_journal, record=False)
+    
+    assert replay_journal.replay(replayed) == len(orders)
+    for symbol in symbols:
+        trades = [(t.timestamp, t.bid_order_id, t.ask_order_id) for t in exchange.market(symbol).tradesbook]
+        assert len(trades) == 200
+        assert [(t.timestamp, t.bid_order_id, t.ask_order_id)
+                for t in replayed.market(symbol).tradesbook] == trades
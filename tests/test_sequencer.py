@@ -0,0 +1,49 @@
+import pytest
+from decimal import Decimal
+from itertools import count
+
+from src.sequencer import *
+from src.order import *
+from src.exchange import *
+
+
+def test_sequencer_defaults():
+    sequencer = Sequencer()
+    
+    assert [sequencer.next_id() for _ in range(3)] == [1, 2, 3]
+    
+    first, second = sequencer.now(), sequencer.now()
+    assert isinstance(first, int)
+    assert first <= second
+
+
+def test_uuid_ids():
+    sequencer = Sequencer(ids=uuid_ids())
+    
+    first, second = sequencer.next_id(), sequencer.next_id()
+    assert isinstance(first, str)
+    assert first != second
+
+
+def test_exchange_injected_sequencer():
+    ticks = count(1000)
+    exchange = Exchange(sequencer=Sequencer(clock=lambda: next(ticks)))
+    
+    for side in [OrderSide.ASK, OrderSide.BID]:
+        exchange.push(
+            Order(
+                side=side,
+                price=Decimal('100.00'),
+                volume=Decimal('10'),
+                order_type=OrderType.LIMIT,
+                time_in_force=OrderTIF.GTC,
+                logger=exchange.logger
+            )
+        )
+    
+    trade = exchange.tradesbook[0]
+    
+    assert (trade.ask_order_id, trade.bid_order_id) == (1, 2)
+    assert trade.id == 3
+    assert [s.timestamp for s in exchange.logger.show_by_id(1)] == [1001, 1005]
+    assert str(trade).startswith('#3 | 1006 | 2 | 1 | bid')
@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+from decimal import Decimal
+
+from src.order import *
+from src.exchange import *
+from src.instrument import Instrument
+from src.server import *
+
+
+def test_server_pipelined_orders():
+    exchange = Exchange(instrument=Instrument(tick_size=Decimal('0.01'), lot_size=Decimal('1')))
+    
+    async def run():
+        server = OrderServer(exchange)
+        await server.start()
+        
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+        writer.write(
+            encode_order(1, OrderSide.ASK, 5, price_ticks=10000)
+            + encode_order(2, OrderSide.ASK, 5, price_ticks=10100)
+            + encode_order(3, OrderSide.BID, 7, order_type=OrderType.MARKET, time_in_force=OrderTIF.IOC)
+            + encode_order(4, OrderSide.BID, 1)
+            + encode_order(5, OrderSide.BID, 1, price_ticks=9000, time_in_force=OrderTIF.IOC)
+        )
+        await writer.drain()
+        reports = list(decode_reports(await reader.readexactly(7 * REPORT.size)))
+        resting = set(server._resting)
+        
+        writer.write(encode_cancel(reports[1].order_id) + encode_cancel(reports[1].order_id))
+        await writer.drain()
+        reports += decode_reports(await reader.readexactly(2 * REPORT.size))
+        
+        writer.write_eof()
+        rest = await reader.read()
+        writer.close()
+        await server.close()
+        return reports, resting, rest
+    
+    reports, resting, rest = asyncio.run(run())
+    
+    assert [(r.kind, r.ref) for r in reports[:2]] == [(ACK, 1), (ACK, 2)]
+    assert [(r.kind, r.ref, r.lots, r.price_ticks) for r in reports[2:4]] == [
+        (FILL, 1, 5, 10000),
+        (FILL, 2, 2, 10100)
+    ]
+    assert reports[2].status == OrderStatus.FILLED
+    assert reports[3].status == OrderStatus.PARTIALLY_FILLED
+    
+    assert reports[4].kind == ACK
+    assert reports[4].status == OrderStatus.FILLED
+    assert (reports[4].lots, reports[4].price_ticks) == (7, 10100)
+    
+    assert (reports[5].kind, reports[5].ref) == (REJECT, 4)
+    assert (reports[6].kind, reports[6].ref, reports[6].status) == (ACK, 5, OrderStatus.NEW)
+    
+    # Only the partially filled ask rests, the unfilled IOC bid is not kept
+    assert resting == {reports[1].order_id}
+    
+    assert reports[7].kind == CANCELLED
+    assert reports[7].status == OrderStatus.CANCELLED
+    assert (reports[8].kind, reports[8].ref, reports[8].order_id) == (REJECT, 0, reports[1].order_id)
+    assert rest == b''
+    assert exchange.limit_orderbook.best_ask is None
+
+
+def test_server_symbols():
+    exchange = Exchange(instrument=Instrument(tick_size=Decimal('0.01'), lot_size=Decimal('1')))
+    btc = exchange.market('BTC', Instrument(tick_size=Decimal('0.5'), lot_size=Decimal('0.001')))
+    
+    async def run():
+        server = OrderServer(exchange)
+        await server.start()
+        
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+        writer.write(
+            encode_order(1, OrderSide.ASK, 5, price_ticks=10000)
+            + encode_order(2, OrderSide.ASK, 1500, price_ticks=200, symbol='BTC')
+            + REQUEST.pack(CANCEL, 0, 0, 0, b'\xff', 1, NO_PRICE, NO_PRICE, 0)
+            + REQUEST.pack(NEW_ORDER, 0, 0, 0, b'\xff', 3, 100, NO_PRICE, 1)
+        )
+        await writer.drain()
+        reports = list(decode_reports(await reader.readexactly(4 * REPORT.size)))
+        
+        writer.close()
+        await server.close()
+        return reports
+    
+    reports = asyncio.run(run())
+    
+    assert [(r.kind, r.ref) for r in reports] == [(ACK, 1), (ACK, 2), (REJECT, 0), (REJECT, 3)]
+    assert btc.limit_orderbook.best_ask.price == Decimal('100')
+    assert btc.limit_orderbook.best_ask.volume == Decimal('1.5')
+    assert exchange.limit_orderbook.best_ask.price == Decimal('100')
@@ -0,0 +1,86 @@
+import pytest
+from decimal import Decimal
+
+from src.order import *
+from src.orderlogger import OrderLogger
+from src.sharded_exchange import *
+
+
+logger = OrderLogger()
+
+
+def test_sharded_exchange_symbols():
+    with ShardedExchange(shards=2, logger=logger) as exchange:
+        def order(symbol, side, price, volume='1'):
+            return Order(
+                side=side,
+                price=Decimal(price),
+                volume=Decimal(volume),
+                order_type=OrderType.LIMIT,
+                time_in_force=OrderTIF.GTC,
+                logger=logger,
+                symbol=symbol
+            )
+        
+        ask_a = order('A', OrderSide.ASK, '100', '2')
+        ask_b = order('B', OrderSide.ASK, '50')
+        bid_a = order('A', OrderSide.BID, '101')
+        bid_b = order('B', OrderSide.BID, '49')
+        
+        results = exchange.push_many([ask_a, ask_b, bid_a, bid_b])
+        
+        assert exchange.shard_of('A') != exchange.shard_of('B')
+        assert [r.order_id for r in results] == [ask_a.id, ask_b.id, bid_a.id, bid_b.id]
+        assert [r.trades for r in results] == [0, 0, 1, 0]
+        
+        assert bid_a.status == OrderStatus.FILLED
+        assert ask_a.status == OrderStatus.PARTIALLY_FILLED
+        assert ask_a.executed_volume == Decimal('1')
+        assert len(exchange.tradesbooks['A']) == 1
+        assert len(exchange.tradesbooks['B']) == 0
+        
+        trades = exchange.push(order('A', OrderSide.BID, '100'))
+        assert [t.price for t in trades] == [Decimal('100')]
+        assert ask_a.status == OrderStatus.FILLED
+        
+        assert exchange.cancel(bid_b.id, symbol='A') is None
+        assert exchange.cancel(bid_b.id, symbol='B') is bid_b
+        assert bid_b.status == OrderStatus.CANCELLED
+
+
+def test_sharded_exchange_errors():
+    from src.sharded_exchange import _CANCEL
+    
+    with ShardedExchange(shards=2, logger=logger) as exchange:
+        def order(symbol, side, time_in_force=OrderTIF.GTC):
+            return Order(
+                side=side,
+                price=Decimal('100'),
+                volume=Decimal('1'),
+                order_type=OrderType.LIMIT,
+                time_in_force=time_in_force,
+                logger=logger,
+                symbol=symbol
+            )
+        
+        ask = order('A', OrderSide.ASK)
+        ioc = order('A', OrderSide.ASK, OrderTIF.IOC)
+        bid = order('A', OrderSide.BID)
+        exchange.push_many([ask, ioc])
+        exchange.push(bid)
+        
+        # Only resting orders are kept
+        assert exchange._orders == {}
+        
+        shard = exchange.shard_of('A')
+        exchange._conns[shard].send((_CANCEL, None))
+        with pytest.raises(TypeError):
+            exchange._receive(shard)
+        
+        resting = order('A', OrderSide.BID)
+        exchange.push(resting)
+        assert exchange.cancel(resting.id) is resting
+        
+        exchange._workers[shard].terminate()
+        with pytest.raises(RuntimeError):
+            exchange.push(order('A', OrderSide.BID))
@@ -0,0 +1,73 @@
+import pytest
+from decimal import Decimal
+
+from src.order import *
+from src.exchange import *
+from src.instrument import Instrument
+from src.snapshot import *
+
+
+def _state(exchange):
+    state = {}
+    for symbol, market in exchange.markets.items():
+        stacks = (market.limit_orderbook.asks, market.limit_orderbook.bids,
+                  market.stop_orderbook.ask_storage, market.stop_orderbook.bid_storage)
+        state[symbol] = (
+            market.instrument,
+            market.last_price,
+            market.stops_fired_total,
+            [[(o.id, o.timestamp, o.side, o.order_type, o.status, o.price, o.stop_price,
+               o.volume, o.executed_volume) for o in reversed(stack)] for stack in stacks]
+        )
+    return state
+
+
+def test_snapshot_roundtrip(tmp_path):
+    exchange = Exchange()
+    btc = Instrument(tick_size=Decimal('0.01'), lot_size=Decimal('0.001'))
+    
+    def order(side, price, volume, symbol='', **kwargs):
+        return Order(
+            side=side,
+            price=Decimal(price),
+            volume=Decimal(volume),
+            logger=exchange.logger,
+            instrument=btc if symbol else DEFAULT_INSTRUMENT,
+            symbol=symbol,
+            **kwargs
+        )
+    
+    exchange.push_many([
+        order(OrderSide.ASK, '101', '5'),
+        order(OrderSide.ASK, '101', '3'),
+        order(OrderSide.ASK, '102', '1'),
+        order(OrderSide.BID, '99', '4'),
+        order(OrderSide.BID, '101', '2'),
+        order(OrderSide.ASK, '97', '1', stop_price=Decimal('98'), order_type=OrderType.STOP),
+        order(OrderSide.BID, '50.25', '0.5', symbol='BTC'),
+    ])
+    
+    path = str(tmp_path / 'snapshot.bin')
+    save_snapshot(exchange, path)
+    restored = load_snapshot(path)
+    
+    assert _state(restored) == _state(exchange)
+    assert restored.limit_orderbook.get_ask_levels(orders_count=True) == [
+        (Decimal('101'), Decimal('6'), 2),
+        (Decimal('102'), Decimal('1'), 1)
+    ]
+    
+    new_order = Order(side=OrderSide.BID, price=Decimal('101'), volume=Decimal('4'), logger=restored.logger)
+    assert new_order.id > max(o.id for o in exchange.limit_orderbook.asks)
+    
+    trades = restored.push(new_order)
+    assert [t.ask_order_id for t in trades] == [o.id for o in reversed(exchange.limit_orderbook.asks)][:2]
+    assert trades[0].id > new_order.id
+
+
+def test_snapshot_bad_file(tmp_path):
+    path = tmp_path / 'snapshot.bin'
+    path.write_bytes(b'\0' * HEADER.size)
+    
+    with pytest.raises(ValueError):
+        load_snapshot(str(path))
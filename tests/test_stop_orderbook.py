@@ -85,4 +85,83 @@ def test_orders_execution():
     
     assert ob.storage_len == 10
     assert len(ob.get_activated(Decimal('100.00'))) == 4
-    assert ob.storage_len == 2
\ No newline at end of file
+    assert ob.storage_len == 2
+
+def test_orders_cancel():
+    ob = StopOrderBook()
+    
+    orders = [
+        Order(
+            side=OrderSide.ASK,
+            stop_price=Decimal('100.00'),
+            volume=Decimal('20'),
+            order_type=OrderType.STOP,
+            time_in_force=OrderTIF.GTC,
+            logger=logger
+        ) for _ in range(3)
+    ]
+    
+    for o in orders:
+        ob.add_to_storage(o)
+    
+    assert ob.cancel(orders[1].id) is orders[1]
+    assert orders[1].status == OrderStatus.CANCELLED
+    assert ob.storage_len == 2
+    
+    ob.amend(orders[0].id, stop_price=Decimal('90.00'))
+    assert len(ob.get_activated(Decimal('95.00'))) == 1
+    assert ob.storage_len == 1
+    assert orders[0].id in ob
+
+
+def test_activated_in_timestamp_order():
+    storage = AskStopOrders()
+    
+    orders = [
+        Order(
+            side=OrderSide.ASK,
+            stop_price=Decimal(stop_price),
+            volume=Decimal('20'),
+            order_type=OrderType.STOP,
+            time_in_force=OrderTIF.GTC,
+            logger=logger
+        ) for stop_price in ['95.00', '100.00', '90.00', '110.00', '100.00']
+    ]
+    
+    for o in orders:
+        storage.push(o)
+    
+    activated = storage.get_activated(storage.instrument.to_ticks(Decimal('100.00')))
+    
+    assert activated == [orders[1], orders[3], orders[4]]
+    assert all(o.order_type == OrderType.MARKET for o in activated)
+    assert len(storage) == 2
+    assert orders[1].id not in storage
+    assert storage.get_activated(storage.instrument.to_ticks(Decimal('100.00'))) == []
+    assert storage.get_activated(storage.instrument.to_ticks(Decimal('90.00'))) == [orders[0], orders[2]]
+    assert len(storage) == 0
+
+
+def test_activated_in_timestamp_order_after_amend():
+    storage = AskStopOrders()
+    
+    orders = [
+        Order(
+            side=OrderSide.ASK,
+            stop_price=Decimal(stop_price),
+            volume=Decimal('20'),
+            order_type=OrderType.STOP,
+            time_in_force=OrderTIF.GTC,
+            logger=logger
+        ) for stop_price in ['90.00', '100.00', '100.00']
+    ]
+    
+    for o in orders:
+        storage.push(o)
+    
+    # moved the way StopOrderBook.amend does it, to the back of the new level
+    storage.remove(orders[0].id)
+    orders[0].amend(stop_price=Decimal('100.00'))
+    storage.push(orders[0])
+    
+    assert storage.get_activated(storage.instrument.to_ticks(Decimal('100.00'))) == orders
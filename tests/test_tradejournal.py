@@ -0,0 +1,94 @@
+import os
+import pytest
+from decimal import Decimal
+
+from src.order import *
+from src.exchange import *
+from src.tradejournal import *
+from src.sequencer import *
+
+
+def _fill(exchange, price, volume):
+    exchange.push(
+        Order(
+            side=OrderSide.ASK,
+            price=Decimal(price),
+            volume=Decimal(volume),
+            order_type=OrderType.LIMIT,
+            time_in_force=OrderTIF.GTC,
+            logger=exchange.logger
+        )
+    )
+    exchange.push(
+        Order(
+            side=OrderSide.BID,
+            price=Decimal(price),
+            volume=Decimal(volume),
+            order_type=OrderType.LIMIT,
+            time_in_force=OrderTIF.IOC,
+            logger=exchange.logger
+        )
+    )
+
+
+def test_trade_journal(tmp_path):
+    path = str(tmp_path / 'trades.bin')
+    journal = TradeJournal(path, batch_size=2)
+    exchange = Exchange(sequencer=Sequencer(), tradesbook=TradesBook(journal))
+    
+    for price, volume in [('100.25', '10'), ('100.50', '0.5'), ('99.75', '3')]:
+        _fill(exchange, price, volume)
+    
+    assert len(exchange.tradesbook) == 3
+    assert os.path.getsize(path) == 2 * TradeJournal.RECORD.size
+    
+    record = exchange.tradesbook[-1]
+    
+    assert os.path.getsize(path) == 3 * TradeJournal.RECORD.size
+    assert record.price == Decimal('99.75')
+    assert record.volume == Decimal('3')
+    assert record.side == OrderSide.BID
+    assert (record.ask_order_id, record.bid_order_id) == (7, 8)
+    assert [r.id for r in exchange.tradesbook] == [3, 6, 9]
+    
+    with pytest.raises(IndexError):
+        exchange.tradesbook[3]
+    
+    journal.close()
+    
+    # Reopened journals continue the existing file
+    journal = TradeJournal(path)
+    assert len(journal) == 3
+    assert journal[1].price == Decimal('100.50')
+    
+    tb = TradesBook(journal)
+    assert tb.by_order(8)[0].id == 9
+    assert tb.volume() == Decimal('13.5')
+    journal.close()
+
+
+def test_trade_journal_instrument(tmp_path):
+    from src.instrument import Instrument
+    
+    btc = Instrument(tick_size=Decimal('0.5'), lot_size=Decimal('0.001'))
+    journal = TradeJournal(str(tmp_path / 'trades.bin'))
+    exchange = Exchange(btc, sequencer=Sequencer(), tradesbook=TradesBook(journal))
+    
+    for side, time_in_force in ((OrderSide.ASK, OrderTIF.GTC), (OrderSide.BID, OrderTIF.IOC)):
+        exchange.push(Order(
+            side=side,
+            price=Decimal('100.5'),
+            volume=Decimal('0.25'),
+            order_type=OrderType.LIMIT,
+            time_in_force=time_in_force,
+            logger=exchange.logger,
+            instrument=btc
+        ))
+    
+    assert journal.instrument is btc
+    assert (exchange.tradesbook[0].price, exchange.tradesbook[0].volume) == (Decimal('100.5'), Decimal('0.25'))
+    assert exchange.tradesbook.volume() == Decimal('0.25')
+    journal.close()
+    
+    with pytest.raises(ValueError):
+        TradesBook(TradeJournal(str(tmp_path / 'other.bin'), instrument=btc), instrument=DEFAULT_INSTRUMENT)
@@ -7,6 +7,7 @@ import uuid
 from src.order import *
 from src.tradesbook import *
 from src.orderlogger import *
+from src.sequencer import *
 
 
 logger = OrderLogger()
@@ -34,7 +35,7 @@ def test_trade_creation():
         Decimal('10.54'), Decimal('100')
     )
     
-    assert isinstance(trade.timestamp, datetime)
+    assert isinstance(trade.timestamp, int)
     assert trade.price == Decimal('10.54')
     assert trade.side is not OrderSide.ASK
     assert trade.volume == Decimal('100')
@@ -54,4 +55,47 @@ def test_tradebook_creation():
     assert tb is not None
     assert len(tb) == 3
         
-    
\ No newline at end of file
+    
+
+def test_tradebook_queries():
+    tb = TradesBook()
+    sequencer = Sequencer(clock=iter(range(100, 200, 10)).__next__)
+    
+    trades = [
+        Trade(order_ask, order_bid, OrderSide.BID, Decimal(price), Decimal(volume), sequencer)
+        for price, volume in [('10.00', '1'), ('11.00', '3'), ('12.00', '2'), ('13.00', '4')]
+    ]
+    tb.add(trades[0])
+    tb.add_many(trades[1:])
+    
+    assert [t.timestamp for t in trades] == [100, 110, 120, 130]
+    assert tb.between(110, 130) == trades[1:3]
+    assert tb.between(131, 200) == []
+    assert tb.last(2) == trades[2:]
+    assert tb.last(10) == trades
+    assert tb.by_order(order_bid.id) == trades
+    assert tb.by_order('unknown') == []
+    
+    assert tb.volume() == Decimal('10')
+    assert tb.volume(105, 125) == Decimal('5')
+    assert tb.vwap(105, 125) == Decimal('11.4')
+    assert tb.vwap() == Decimal('11.9')
+    assert tb.vwap(200) is None
+
+
+def test_tradebook_index_overflow():
+    tb = TradesBook()
+    other_bid = Order(side=OrderSide.BID, price=10.54, volume=100, order_type=OrderType.LIMIT, logger=logger)
+    
+    # Notional of a single trade is far beyond int64 at the default tick and lot sizes
+    trades = [
+        Trade(order_ask, bid, OrderSide.BID, Decimal(price), Decimal('1000000'))
+        for bid, price in [(order_bid, '1000000'), (other_bid, '3000000'), (order_bid, '2000000')]
+    ]
+    tb.add_many(trades)
+    
+    assert tb.vwap() == Decimal('2000000')
+    assert tb.volume() == Decimal('3000000')
+    assert tb.by_order(order_ask.id) == trades
+    assert tb.by_order(order_bid.id) == [trades[0], trades[2]]
+    assert tb.by_order(other_bid.id) == [trades[1]]